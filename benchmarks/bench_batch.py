@@ -0,0 +1,64 @@
+"""
+Benchmark of serializing 2000 apartments from rows of column values, through
+Apartment objects and through an ApartmentBatch.
+
+Usage (from the repository root): python -m benchmarks.bench_batch
+"""
+import time
+from typing import get_args, get_type_hints
+
+import django
+from django.conf import settings
+
+settings.configure(USE_TZ=True)
+django.setup()
+
+from django_oikotie.batch import SEPARATOR, ApartmentBatch  # noqa: E402
+from django_oikotie.xml_models.apartment import Apartment  # noqa: E402
+from tests.factories.apartment import ApartmentFactory  # noqa: E402
+
+COUNT = 2000
+REPEAT = 5
+
+COLUMNS = ApartmentBatch.from_models(ApartmentFactory.build_batch(COUNT)).columns
+NAMES = tuple(COLUMNS)
+ROWS = list(zip(*COLUMNS.values()))
+
+
+def objects():
+    hints = get_type_hints(Apartment)
+    nested_classes = {}
+    for name in NAMES:
+        field_name = name.partition(SEPARATOR)[0]
+        if field_name != name:
+            # Optional[Model] or Model
+            nested_classes[field_name] = (get_args(hints[field_name]) or [None])[0]
+            nested_classes[field_name] = nested_classes[field_name] or hints[field_name]
+    for row in ROWS:
+        values = {}
+        nested = {}
+        for name, value in zip(NAMES, row):
+            field_name, _, sub_name = name.partition(SEPARATOR)
+            if sub_name:
+                nested.setdefault(field_name, {})[sub_name] = value
+            else:
+                values[field_name] = value
+        for name, sub_values in nested.items():
+            if any(value is not None for value in sub_values.values()):
+                values[name] = nested_classes[name](**sub_values)
+        Apartment(**values).to_etree()
+
+
+def batch():
+    for _ in ApartmentBatch.from_rows(NAMES, ROWS).iter_etrees():
+        pass
+
+
+if __name__ == "__main__":
+    for name, func in (("Apartment objects", objects), ("ApartmentBatch", batch)):
+        elapsed = []
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            func()
+            elapsed.append(time.perf_counter() - start)
+        print(f"{name:18} {min(elapsed):6.2f} s / {COUNT} apartments")
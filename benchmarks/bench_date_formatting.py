@@ -0,0 +1,35 @@
+"""
+Micro-benchmark for the memoized date formatting used by the model formatters.
+
+Usage (from the repository root): python -m benchmarks.bench_date_formatting
+"""
+import random
+import timeit
+from datetime import date, timedelta
+
+from django_oikotie.utils import format_date
+
+# A batch of 100k values drawn from a few hundred distinct dates, which is
+# typical for availability and completion dates of new-development projects.
+DISTINCT_DATES = [date(2024, 1, 1) + timedelta(days=i) for i in range(300)]
+BATCH = [random.choice(DISTINCT_DATES) for _ in range(100_000)]
+FORMAT = "%d.%m.%Y"
+
+
+def strftime_batch():
+    for value in BATCH:
+        value.strftime(FORMAT)
+
+
+def format_date_batch():
+    for value in BATCH:
+        format_date(value, FORMAT)
+
+
+if __name__ == "__main__":
+    for name, func in (
+        ("strftime", strftime_batch),
+        ("format_date", format_date_batch),
+    ):
+        best = min(timeit.repeat(func, number=1, repeat=5))
+        print(f"{name:12} {best * 1000:8.1f} ms / {len(BATCH)} dates")
@@ -0,0 +1,63 @@
+"""
+Benchmark of writing an APT file of 100k apartments with the stdlib
+ElementTree.write path the builders used to take and with the feed writers.
+
+Usage (from the repository root): python -m benchmarks.bench_writers [COUNT]
+"""
+import os
+import sys
+import tempfile
+import time
+from itertools import cycle, islice
+from xml.etree.ElementTree import ElementTree
+
+import django
+from django.conf import settings
+
+settings.configure(USE_TZ=True)
+django.setup()
+
+from lxml import etree  # noqa: E402
+
+from django_oikotie.writers import FeedWriter, IncrementalWriter  # noqa: E402
+from tests.factories.apartment import ApartmentFactory  # noqa: E402
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+# Building the models is not measured; a thousand distinct apartments are
+# cycled through.
+APARTMENTS = ApartmentFactory.build_batch(1000)
+
+
+def iter_apartments():
+    return islice(cycle(APARTMENTS), COUNT)
+
+
+def legacy(file):
+    root = etree.Element("Apartments")
+    for apartment in iter_apartments():
+        root.append(apartment.to_etree())
+    ElementTree(root).write(file, encoding="utf-8", xml_declaration=True)
+
+
+def writer(writer_class):
+    def write(file):
+        with writer_class(file, "Apartments") as writer:
+            for apartment in iter_apartments():
+                writer.write(apartment.to_etree())
+
+    return write
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        file = os.path.join(folder, "APT.xml")
+        for name, func in (
+            ("ElementTree.write", legacy),
+            ("FeedWriter", writer(FeedWriter)),
+            ("IncrementalWriter", writer(IncrementalWriter)),
+        ):
+            start = time.perf_counter()
+            func(file)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(file) / 1024 / 1024
+            print(f"{name:18} {elapsed:6.2f} s  {size:6.1f} MiB / {COUNT} apartments")
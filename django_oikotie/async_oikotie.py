@@ -0,0 +1,194 @@
+import asyncio
+import ftplib
+from os import path
+from typing import BinaryIO, Optional, Tuple
+
+from django.conf import settings
+
+DEFAULT_TIMEOUT = 60
+# Larger than ftplib's 8 KiB to amortize reading each block in a thread
+BLOCKSIZE = 65536
+
+
+class AsyncFTP:
+    """
+    Minimal asyncio FTP client implementing the commands needed for pushing
+    feed files (login, binary STOR, rename). Errors are reported with the
+    exception classes of `ftplib`, every network operation is bounded by
+    `timeout` and cancelling a task using the session closes its connections.
+
+    Example::
+
+        >>> async with AsyncFTP(host, user, passwd) as session:
+        >>>     with open(file_path, "rb") as f:
+        >>>         await session.storbinary("STOR temp/file.xml.temp", f)
+        >>>     await session.rename("temp/file.xml.temp", "data/file.xml")
+    """
+
+    encoding = "utf-8"
+
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        passwd: str,
+        port: int = 21,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ):
+        self.host = host
+        self.user = user
+        self.passwd = passwd
+        self.port = port
+        self.timeout = timeout
+        self.welcome = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def __aenter__(self) -> "AsyncFTP":
+        try:
+            await self.connect()
+            await self.login()
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.quit()
+        else:
+            self.close()
+
+    async def _wait(self, awaitable):
+        return await asyncio.wait_for(awaitable, self.timeout)
+
+    async def connect(self) -> str:
+        self._reader, self._writer = await self._wait(
+            asyncio.open_connection(self.host, self.port)
+        )
+        self.welcome = await self._get_response()
+        return self.welcome
+
+    async def _get_line(self) -> str:
+        line = await self._wait(self._reader.readline())
+        if not line:
+            raise EOFError("Connection closed by the FTP server")
+        return line.decode(self.encoding, errors="replace").rstrip("\r\n")
+
+    async def _get_response(self) -> str:
+        response = await self._get_line()
+        if response[3:4] == "-":
+            # Multiline response, ends with a line starting with the same code
+            code = response[:3]
+            while True:
+                line = await self._get_line()
+                response += "\n" + line
+                if line[:3] == code and line[3:4] != "-":
+                    break
+
+        if response[:1] in ("1", "2", "3"):
+            return response
+        if response[:1] == "4":
+            raise ftplib.error_temp(response)
+        if response[:1] == "5":
+            raise ftplib.error_perm(response)
+        raise ftplib.error_proto(response)
+
+    async def _send_command(self, command: str) -> str:
+        self._writer.write(f"{command}\r\n".encode(self.encoding))
+        await self._wait(self._writer.drain())
+        return await self._get_response()
+
+    async def _void_command(self, command: str) -> str:
+        response = await self._send_command(command)
+        if response[:1] != "2":
+            raise ftplib.error_reply(response)
+        return response
+
+    async def login(self) -> str:
+        response = await self._send_command(f"USER {self.user}")
+        if response[:1] == "3":
+            response = await self._send_command(f"PASS {self.passwd}")
+        if response[:1] != "2":
+            raise ftplib.error_reply(response)
+        return response
+
+    async def _open_data_connection(
+        self,
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        response = await self._send_command("PASV")
+        if response[:3] != "227":
+            raise ftplib.error_reply(response)
+        # Like ftplib, connect to the control connection's host rather than the
+        # address returned by the server.
+        _, port = ftplib.parse227(response)
+        host = self._writer.get_extra_info("peername")[0]
+        return await self._wait(asyncio.open_connection(host, port))
+
+    async def storbinary(
+        self, command: str, fp: BinaryIO, blocksize: int = BLOCKSIZE
+    ) -> str:
+        await self._void_command("TYPE I")
+        _, data_writer = await self._open_data_connection()
+        try:
+            response = await self._send_command(command)
+            if response[:1] != "1":
+                raise ftplib.error_reply(response)
+
+            loop = asyncio.get_running_loop()
+            while True:
+                # Read in a thread so that the disk reads don't block the loop
+                block = await loop.run_in_executor(None, fp.read, blocksize)
+                if not block:
+                    break
+                data_writer.write(block)
+                await self._wait(data_writer.drain())
+        finally:
+            data_writer.close()
+        await self._wait(data_writer.wait_closed())
+
+        response = await self._get_response()
+        if response[:1] != "2":
+            raise ftplib.error_reply(response)
+        return response
+
+    async def rename(self, fromname: str, toname: str) -> str:
+        response = await self._send_command(f"RNFR {fromname}")
+        if response[:1] != "3":
+            raise ftplib.error_reply(response)
+        return await self._void_command(f"RNTO {toname}")
+
+    async def quit(self) -> str:
+        try:
+            return await self._void_command("QUIT")
+        finally:
+            self.close()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+
+
+def get_async_session() -> AsyncFTP:
+    return AsyncFTP(
+        host=settings.OIKOTIE_FTP_HOST,
+        user=settings.OIKOTIE_USER,
+        passwd=settings.OIKOTIE_PASSWORD,
+        port=getattr(settings, "OIKOTIE_FTP_PORT", 21),
+        timeout=getattr(settings, "OIKOTIE_FTP_TIMEOUT", DEFAULT_TIMEOUT),
+    )
+
+
+async def async_send_items(file_path, filename):
+    """
+    asyncio version of `oikotie.send_items`. Several files can be uploaded
+    concurrently with `asyncio.gather`.
+    """
+    async with get_async_session() as session:
+        with open(path.join(file_path, filename), "rb") as f:
+            await session.storbinary("STOR temp/{}.temp".format(filename), f)
+        await session.rename(
+            "temp/{}.temp".format(filename), "data/{}".format(filename)
+        )
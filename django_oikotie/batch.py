@@ -0,0 +1,369 @@
+"""
+Columnar batches of records, serialized without building a model object per
+record.
+
+A batch holds one sequence of values per field of its model. The fields of a
+nested model are given as sub-columns named `<field>__<nested field>`, e.g.
+`living_area__area` and `living_area__unit`; the nested model is left out of
+the records whose sub-column values are all None. A column named after the
+nested field itself holds ready model objects instead. Nested
+TextElementModels are built from what their get_parts() returns for a view of
+the sub-columns, without a model object per record.
+
+The columns are formatted in one pass each with the formatter of their field
+(decimal columns with utils.format_decimals()) before the elements of the
+records are built, in the field order of XMLModel.to_etree().
+"""
+import inspect
+from dataclasses import MISSING, Field, fields
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    get_type_hints,
+)
+
+from lxml import etree
+
+from .formatters import format_value
+from .oikotie import iter_shards
+from .utils import format_decimals, is_required_field, unwrap_optional
+from .xml_models import TextElementModel, XMLModel, append_value
+from .xml_models.apartment import Apartment
+
+DEFAULT_CHUNK_SIZE = 2000
+
+SEPARATOR = "__"
+
+# Kinds of the fields of a builder plan
+_TEXT, _METHOD, _NESTED = "text", "method", "nested"
+
+# Nested model classes by (model class, field name), None for other fields
+_nested_classes: Dict[Tuple[type, str], Optional[type]] = {}
+
+
+class _RowView:
+    """
+    Stand-in for the model object of one record, passed to the format_<key>
+    methods and get_parts() of the model. Fields are read from the columns of
+    the batch, fields without a column have their default (a default_factory
+    is called once per batch) and the other attributes of the model class,
+    e.g. its methods, are bound to the view.
+    """
+
+    def __init__(self, model_class: type, columns: Mapping[str, list]):
+        self._model_class = model_class
+        self._columns = columns
+        self._index = 0
+        self.Meta = model_class.Meta
+        self._field_names = set()
+        split = {name.partition(SEPARATOR)[0] for name in columns}
+        for f in fields(model_class):
+            self._field_names.add(f.name)
+            if f.name in split:
+                continue
+            if f.default is not MISSING:
+                setattr(self, f.name, f.default)
+            elif f.default_factory is not MISSING:
+                setattr(self, f.name, f.default_factory())
+
+    def __getattr__(self, name: str):
+        column = self._columns.get(name)
+        if column is not None:
+            return column[self._index]
+        if name in self._field_names:
+            # Split to sub-columns, the class only has its default
+            raise AttributeError(name)
+        try:
+            attribute = inspect.getattr_static(self._model_class, name)
+        except AttributeError:
+            raise AttributeError(name) from None
+        if hasattr(attribute, "__get__"):
+            attribute = attribute.__get__(self, self._model_class)
+        # Bound once, the binding stays valid as the index moves
+        setattr(self, name, attribute)
+        return attribute
+
+
+def _nested_class(model_class: type, name: str) -> type:
+    key = (model_class, name)
+    if key not in _nested_classes:
+        hint = unwrap_optional(get_type_hints(model_class).get(name))
+        if isinstance(hint, type) and issubclass(hint, XMLModel):
+            _nested_classes[key] = hint
+        else:
+            _nested_classes[key] = None
+    nested_class = _nested_classes[key]
+    if nested_class is None:
+        raise ValueError(f"{model_class.__name__}.{name} is not a nested model")
+    return nested_class
+
+
+def _group_columns(
+    model_class: type, columns: Mapping[str, list]
+) -> Dict[str, Union[list, Dict[str, list]]]:
+    """
+    Group the columns by the fields of the model: a field maps to its column,
+    or to the sub-columns of a nested model by nested field name.
+    """
+    field_names = {f.name for f in fields(model_class)}
+    grouped = {}
+    for name, column in columns.items():
+        field_name, _, sub_name = name.partition(SEPARATOR)
+        if field_name not in field_names:
+            raise ValueError(f"{model_class.__name__} has no field {field_name}")
+        if sub_name:
+            group = grouped.setdefault(field_name, {})
+            if not isinstance(group, dict):
+                raise ValueError(f"{field_name} is given both as a column and split")
+            group[sub_name] = column
+        elif field_name in grouped:
+            raise ValueError(f"{field_name} is given both as a column and split")
+        else:
+            grouped[field_name] = column
+    return grouped
+
+
+def _check_required(model_class: type, grouped: Mapping[str, Any]):
+    for f in fields(model_class):
+        required = is_required_field(f)
+        if required and f.name not in grouped:
+            raise ValueError(f"Column of the required field {f.name} is missing")
+
+
+def _check_class(model_class: type, nested: bool):
+    name = model_class.__name__
+    if hasattr(model_class, "__post_init__"):
+        raise ValueError(
+            f"{name} has __post_init__() and can't be serialized from columns"
+        )
+    if model_class.to_etree is XMLModel.to_etree:
+        if model_class.get_formatted_value is not XMLModel.get_formatted_value:
+            raise ValueError(
+                f"{name} has its own get_formatted_value() and can't be "
+                "serialized from columns"
+            )
+    elif not (nested and issubclass(model_class, TextElementModel)):
+        # Nested TextElementModels are built from their get_parts()
+        raise ValueError(
+            f"{name} has its own to_etree() and can't be serialized from columns"
+        )
+
+
+def _check_model(model_class: type, grouped: Mapping[str, Any], nested=False):
+    _check_class(model_class, nested)
+    _check_required(model_class, grouped)
+    for f in fields(model_class):
+        if isinstance(grouped.get(f.name), dict):
+            nested_class = _nested_class(model_class, f.name)
+            _check_model(
+                nested_class, _group_columns(nested_class, grouped[f.name]), True
+            )
+
+
+def _format_column(f: Field, column: list, formatter: Callable) -> list:
+    constraints = f.metadata.get("constraints")
+    if constraints and constraints.date_format is None and constraints.decimals:
+        return format_decimals(column, constraints.decimals, constraints.pad)
+    return [None if value is None else formatter(value) for value in column]
+
+
+def _compile_builder(
+    model_class: type, columns: Mapping[str, list]
+) -> Callable[[int], etree._Element]:
+    """
+    Return a function building the element of the record at an index. The
+    columns are formatted when the function is compiled.
+    """
+    grouped = _group_columns(model_class, columns)
+    methods, constraints = model_class._get_formatters()
+    attributes = getattr(model_class.Meta, "attributes", [])
+    row = _RowView(model_class, columns)
+
+    # (element name, is attribute, kind, values, function) of the fields with
+    # a column, in field order
+    plan = []
+    for f in fields(model_class):
+        name = f.name
+        column = grouped.get(name)
+        if column is None:
+            continue
+        element_name = model_class.get_element_name(model_class, name)
+        is_attribute = name in attributes
+        if isinstance(column, dict):
+            nested_class = _nested_class(model_class, name)
+            present, build = _compile_nested_builder(nested_class, column)
+            plan.append((element_name, False, _NESTED, present, build))
+        elif name in methods:
+            plan.append((element_name, is_attribute, _METHOD, column, methods[name]))
+        else:
+            formatter = constraints.get(name, format_value)
+            values = _format_column(f, column, formatter)
+            plan.append((element_name, is_attribute, _TEXT, values, None))
+
+    root_name = model_class.Meta.element_name
+
+    def build(i: int) -> etree._Element:
+        root = etree.Element(root_name)
+        for element_name, is_attribute, kind, values, function in plan:
+            value = values[i]
+            if value is None:
+                continue
+            if kind is _NESTED:
+                root.append(function(i))
+                continue
+            if kind is _METHOD:
+                row._index = i
+                value = function(row)
+            elif value.__class__ is str:
+                if is_attribute:
+                    root.set(element_name, value)
+                else:
+                    etree.SubElement(root, element_name).text = value
+                continue
+            append_value(root, element_name, is_attribute, value)
+        return root
+
+    return build
+
+
+def _compile_nested_builder(
+    nested_class: type, columns: Mapping[str, list]
+) -> Tuple[list, Callable[[int], etree._Element]]:
+    """
+    Return the builder of the nested model elements and a list telling the
+    records which have the nested model: True, or None for the records whose
+    sub-column values are all None.
+    """
+    width = len(columns)
+    present = [
+        True if values.count(None) != width else None
+        for values in zip(*columns.values())
+    ]
+    if nested_class.to_etree is XMLModel.to_etree:
+        return present, _compile_builder(nested_class, columns)
+
+    # A TextElementModel (see _check_class()): the element is built from the
+    # parts its get_parts() returns for a view of the sub-columns, without a
+    # model object per record.
+    row = _RowView(nested_class, columns)
+    get_parts = nested_class.get_parts
+
+    def build(i: int) -> etree._Element:
+        row._index = i
+        element_name, attributes, text = get_parts(row)
+        element = etree.Element(element_name, attributes)
+        element.text = text
+        return element
+
+    return present, build
+
+
+class ModelBatch:
+    """
+    Columnar batch of records of `model`, see the module docstring.
+
+    Example::
+
+        >>> batch = ApartmentBatch(
+        >>>     {
+        >>>         "key": ["a1", "a2"],
+        >>>         "living_area__area": [54.5, None],
+        >>>         "living_area__unit": ["m2", None],
+        >>>         ...
+        >>>     }
+        >>> )
+        >>> elements = batch.to_etrees()
+    """
+
+    model: type = None
+
+    def __init__(self, columns: Mapping[str, Sequence]):
+        self.columns = {name: list(column) for name, column in columns.items()}
+        sizes = {len(column) for column in self.columns.values()}
+        if len(sizes) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(sizes)}")
+        self.size = sizes.pop() if sizes else 0
+        _check_model(self.model, _group_columns(self.model, self.columns))
+
+    def __len__(self) -> int:
+        return self.size
+
+    @classmethod
+    def from_rows(
+        cls, names: Sequence[str], rows: Sequence[Sequence], **constants
+    ) -> "ModelBatch":
+        """
+        Batch of rows of values, in the order of the column `names`, e.g. a
+        chunk of `QuerySet.values_list()`. `constants` are values shared by
+        all the records.
+        """
+        columns = dict(zip(names, zip(*rows))) if rows else {n: [] for n in names}
+        for name, value in constants.items():
+            columns[name] = [value] * len(rows)
+        return cls(columns)
+
+    @classmethod
+    def from_values_list(
+        cls,
+        queryset,
+        lookups: Mapping[str, str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **constants,
+    ) -> Iterator["ModelBatch"]:
+        """
+        Yield batches of `chunk_size` records from the `values_list()` of the
+        queryset. `lookups` maps the column names to the queryset lookups.
+
+        Example::
+
+            >>> batches = ApartmentBatch.from_values_list(
+            >>>     Unit.objects.order_by("pk"),
+            >>>     {"key": "uuid", "city__value": "building__city__name", ...},
+            >>>     type=ApartmentType.BLOCK_OF_FLATS,
+            >>> )
+        """
+        names = tuple(lookups)
+        rows = queryset.values_list(*lookups.values()).iterator(chunk_size=chunk_size)
+        for chunk in iter_shards(rows, chunk_size):
+            yield cls.from_rows(names, chunk, **constants)
+
+    @classmethod
+    def from_models(cls, models: Iterable[XMLModel]) -> "ModelBatch":
+        """Batch of model objects, with the nested models split to sub-columns."""
+        models = list(models)
+        columns = {}
+        for f in fields(cls.model):
+            column = [getattr(model, f.name) for model in models]
+            if any(isinstance(value, XMLModel) for value in column):
+                nested_class = _nested_class(cls.model, f.name)
+                for nested in fields(nested_class):
+                    columns[f"{f.name}{SEPARATOR}{nested.name}"] = [
+                        None if value is None else getattr(value, nested.name)
+                        for value in column
+                    ]
+            else:
+                columns[f.name] = column
+        return cls(columns)
+
+    def iter_etrees(self) -> Iterator[etree._Element]:
+        """Serialize the records, giving the same elements as to_etree()."""
+        if self.size:
+            build = _compile_builder(self.model, self.columns)
+            for i in range(self.size):
+                yield build(i)
+
+    def to_etrees(self) -> List[etree._Element]:
+        return list(self.iter_etrees())
+
+
+class ApartmentBatch(ModelBatch):
+    model = Apartment
@@ -0,0 +1,544 @@
+"""
+Generate XMLModel dataclasses from a RelaxNG schema (XML syntax).
+
+The generated module has one dataclass per element with attributes or child
+elements: the field constraints (xml_field()) come from the schema's data type
+parameters and value choices, Meta holds the element names, and to_etree() is
+a straight-line serializer that doesn't look anything up at runtime. Elements
+which need a hand-written shape can be mapped to an existing class with
+`overrides`; the generated models then import and use that class.
+
+Example::
+
+    >>> source = generate_models("oikotie-apartments-batch.rng",
+    >>>     overrides={"Picture": "django_oikotie.xml_models.apartment.Picture"})
+"""
+import json
+import keyword
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from os import path
+from typing import Dict, List, Optional, Tuple
+
+from lxml import etree
+
+from .enums import Case
+from .utils import transform_name
+
+RNG_NS = "http://relaxng.org/ns/structure/1.0"
+
+_INT_TYPES = {
+    "int",
+    "integer",
+    "long",
+    "short",
+    "byte",
+    "positiveInteger",
+    "negativeInteger",
+    "nonNegativeInteger",
+    "nonPositiveInteger",
+    "unsignedInt",
+    "unsignedLong",
+    "unsignedShort",
+    "unsignedByte",
+}
+_DATE_FORMATS = {"date": "%Y-%m-%d", "dateTime": "%Y-%m-%dT%H:%M:%S"}
+
+
+def _number_literal(value: Optional[str], kind: str) -> Optional[str]:
+    """Python literal of a numeric facet value, None if it isn't a number."""
+    if value is None:
+        return None
+    try:
+        number = int(value) if kind == "int" else Decimal(value)
+    except (ValueError, InvalidOperation):
+        return None
+    if isinstance(number, Decimal) and not number.is_finite():
+        return None
+    return str(number)
+
+
+@dataclass
+class ValueSpec:
+    """Type and formatting constraints of a text value."""
+
+    kind: str = "str"
+    max_length: Optional[int] = None
+    decimals: Optional[int] = None
+    min_value: Optional[str] = None
+    max_value: Optional[str] = None
+    choices: Tuple[str, ...] = ()
+
+    @property
+    def py_type(self) -> str:
+        if self.kind == "literal":
+            return f"Literal[{', '.join(_quote(c) for c in self.choices)}]"
+        return {
+            "str": "str",
+            "int": "int",
+            "float": "float",
+            "decimal": "Decimal",
+            "date": "date",
+            "datetime": "datetime",
+            "yes_no": "bool",
+            "bool": "bool",
+        }[self.kind]
+
+    def constraint_args(self) -> List[str]:
+        args = []
+        if self.kind == "str" and self.max_length is not None:
+            args.append(f"max_length={self.max_length}")
+        if self.kind == "decimal":
+            args.append(f"decimals={self.decimals}")
+        if self.kind == "date":
+            args.append(f'date_format="{_DATE_FORMATS["date"]}"')
+        if self.kind == "datetime":
+            args.append(f'date_format="{_DATE_FORMATS["dateTime"]}"')
+        if self.kind == "yes_no":
+            args.append("yes_no=True")
+        if self.min_value is not None:
+            args.append(f"min_value={self.min_value}")
+        if self.max_value is not None:
+            args.append(f"max_value={self.max_value}")
+        return args
+
+    def format_expression(self, value: str) -> str:
+        """Python expression formatting the value named by `value` as text."""
+        if self.kind == "str":
+            if self.max_length is not None:
+                return f"{value}[:{self.max_length}]"
+            return value
+        if self.kind == "literal":
+            return f"str({value})"
+        if self.kind in ("int", "float"):
+            return f"str({value})"
+        if self.kind == "decimal":
+            return f"format_decimal({value}, {self.decimals})"
+        if self.kind == "date":
+            return f'format_date({value}, "{_DATE_FORMATS["date"]}")'
+        if self.kind == "datetime":
+            return f'format_date({value}, "{_DATE_FORMATS["dateTime"]}")'
+        if self.kind == "yes_no":
+            return f"yes_no_bool({value})"
+        return f'"true" if {value} else "false"'
+
+
+@dataclass
+class FieldSpec:
+    xml_name: str
+    name: str
+    # "attribute", "text", "element" (simple child) or "model"
+    kind: str
+    required: bool = True
+    repeated: bool = False
+    value: Optional[ValueSpec] = None
+    model: Optional["ModelSpec"] = None
+
+    @property
+    def py_type(self) -> str:
+        py_type = self.model.class_name if self.model else self.value.py_type
+        if self.repeated:
+            py_type = f"List[{py_type}]"
+        if not self.required:
+            py_type = f"Optional[{py_type}]"
+        return py_type
+
+
+@dataclass
+class ModelSpec:
+    xml_name: str
+    class_name: str
+    fields: List[FieldSpec] = field(default_factory=list)
+    # Dotted path of the hand-written class used instead of a generated one
+    override: Optional[str] = None
+
+    def signature(self) -> tuple:
+        return tuple(
+            (f.xml_name, f.kind, f.required, f.repeated, f.py_type) for f in self.fields
+        )
+
+
+@dataclass
+class _Content:
+    attributes: List[Tuple[etree._Element, bool]] = field(default_factory=list)
+    elements: List[Tuple[etree._Element, bool, bool]] = field(default_factory=list)
+    text: Optional[ValueSpec] = None
+
+
+def _quote(text: str) -> str:
+    return json.dumps(text, ensure_ascii=False)
+
+
+def _tag(node) -> str:
+    return etree.QName(node).localname
+
+
+def _children(node) -> List[etree._Element]:
+    return [
+        child
+        for child in node
+        if isinstance(child.tag, str) and etree.QName(child).namespace == RNG_NS
+    ]
+
+
+def _field_name(xml_name: str) -> str:
+    name = re.sub(r"[^0-9a-zA-Z]+", "_", xml_name)
+    name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", name).lower().strip("_")
+    if keyword.iskeyword(name) or not name:
+        name += "_"
+    return name
+
+
+def _class_name(xml_name: str) -> str:
+    return "".join(part[:1].upper() + part[1:] for part in re.split(r"[-_.]", xml_name))
+
+
+class _SchemaReader:
+    def __init__(self, schema_path: str, overrides: Dict[str, str]):
+        self.root = etree.parse(schema_path).getroot()
+        self.defines = {}
+        for define in self.root.iter(f"{{{RNG_NS}}}define"):
+            # combine="choice"/"interleave" definitions are merged into a group
+            self.defines.setdefault(define.get("name"), []).extend(_children(define))
+        self.overrides = overrides
+        self.models: Dict[str, ModelSpec] = {}
+        self._refs = []
+
+    def get_start(self) -> List[etree._Element]:
+        if _tag(self.root) == "element":
+            return [self.root]
+        start = self.root.find(f"{{{RNG_NS}}}start")
+        if start is None:
+            raise ValueError("The schema has no start pattern")
+        content = _Content()
+        for child in _children(start):
+            self._collect(child, True, False, content)
+        return [element for element, _, _ in content.elements]
+
+    def get_name(self, node) -> str:
+        name = node.get("name")
+        if name is None:
+            name_node = node.find(f"{{{RNG_NS}}}name")
+            if name_node is None:
+                raise ValueError(f"Unsupported <{_tag(node)}> without a name")
+            name = name_node.text.strip()
+        return name
+
+    def _collect(self, node, required, repeated, content: _Content):
+        tag = _tag(node)
+        if tag == "element":
+            content.elements.append((node, required, repeated))
+        elif tag == "attribute":
+            content.attributes.append((node, required))
+        elif tag == "optional":
+            for child in _children(node):
+                self._collect(child, False, repeated, content)
+        elif tag in ("zeroOrMore", "oneOrMore"):
+            for child in _children(node):
+                self._collect(child, required and tag == "oneOrMore", True, content)
+        elif tag in ("group", "interleave", "mixed", "div"):
+            if tag == "mixed":
+                content.text = ValueSpec()
+            for child in _children(node):
+                self._collect(child, required, repeated, content)
+        elif tag == "choice":
+            children = _children(node)
+            if all(_tag(child) == "value" for child in children):
+                content.text = self.get_value(node)
+            else:
+                for child in children:
+                    if _tag(child) != "empty":
+                        self._collect(child, False, repeated, content)
+        elif tag == "ref":
+            name = node.get("name")
+            if name in self._refs:
+                raise ValueError(f"Recursive reference to {name} is not supported")
+            self._refs.append(name)
+            try:
+                for child in self.defines[name]:
+                    self._collect(child, required, repeated, content)
+            finally:
+                self._refs.pop()
+        elif tag in ("text", "data", "value", "list"):
+            content.text = self.get_value(node)
+        elif tag not in ("empty", "notAllowed"):
+            raise ValueError(f"Unsupported RelaxNG pattern <{tag}>")
+
+    def get_value(self, node) -> ValueSpec:
+        tag = _tag(node)
+        if tag == "ref":
+            (child,) = self.defines[node.get("name")]
+            return self.get_value(child)
+        if tag == "choice":
+            choices = tuple(child.text or "" for child in _children(node))
+            if set(choices) == {"K", "E"}:
+                return ValueSpec("yes_no")
+            return ValueSpec("literal", choices=choices)
+        if tag == "value":
+            return ValueSpec("literal", choices=(node.text or "",))
+        if tag == "data":
+            return self._data_value(node)
+        return ValueSpec()
+
+    def _data_value(self, node) -> ValueSpec:
+        data_type = node.get("type")
+        params = {
+            param.get("name"): param.text.strip()
+            for param in _children(node)
+            if _tag(param) == "param"
+        }
+        if data_type in _INT_TYPES:
+            spec = ValueSpec("int")
+        elif data_type in ("decimal", "float", "double"):
+            if "fractionDigits" in params:
+                spec = ValueSpec("decimal", decimals=int(params["fractionDigits"]))
+            else:
+                spec = ValueSpec("float")
+        elif data_type == "date":
+            spec = ValueSpec("date")
+        elif data_type == "dateTime":
+            spec = ValueSpec("datetime")
+        elif data_type == "boolean":
+            spec = ValueSpec("bool")
+        else:
+            length = params.get("maxLength", params.get("length"))
+            spec = ValueSpec(max_length=int(length) if length else None)
+        # Bounds of other types (e.g. dates) are not checked
+        if spec.kind in ("int", "float", "decimal"):
+            spec.min_value = _number_literal(params.get("minInclusive"), spec.kind)
+            spec.max_value = _number_literal(params.get("maxInclusive"), spec.kind)
+        return spec
+
+    def read_element(self, node, parent: Optional[ModelSpec]) -> FieldSpec:
+        xml_name = self.get_name(node)
+        content = _Content()
+        for child in _children(node):
+            if _tag(child) not in ("name", "anyName", "nsName"):
+                self._collect(child, True, False, content)
+
+        if xml_name in self.overrides:
+            model = self.add_model(
+                ModelSpec(
+                    xml_name,
+                    self.overrides[xml_name].rsplit(".", 1)[1],
+                    override=self.overrides[xml_name],
+                ),
+                parent,
+            )
+            return FieldSpec(xml_name, _field_name(xml_name), "model", model=model)
+
+        if not content.attributes and not content.elements:
+            return FieldSpec(
+                xml_name,
+                _field_name(xml_name),
+                "element",
+                value=content.text or ValueSpec(),
+            )
+
+        model = ModelSpec(xml_name, _class_name(xml_name))
+        names = set()
+        for attribute, required in content.attributes:
+            attribute_name = self.get_name(attribute)
+            value_nodes = _children(attribute)
+            value = self.get_value(value_nodes[0]) if value_nodes else ValueSpec()
+            names.add(_field_name(attribute_name))
+            model.fields.append(
+                FieldSpec(
+                    attribute_name,
+                    _field_name(attribute_name),
+                    "attribute",
+                    required,
+                    value=value,
+                )
+            )
+        for element, required, repeated in content.elements:
+            spec = self.read_element(element, model)
+            spec.required = required
+            spec.repeated = repeated
+            names.add(spec.name)
+            model.fields.append(spec)
+        if content.text is not None:
+            name = "value" if "value" not in names else "text_value"
+            model.fields.append(FieldSpec("", name, "text", value=content.text))
+        model = self.add_model(model, parent)
+        return FieldSpec(xml_name, _field_name(xml_name), "model", model=model)
+
+    def add_model(self, model: ModelSpec, parent: Optional[ModelSpec]) -> ModelSpec:
+        existing = self.models.get(model.class_name)
+        if existing is None:
+            self.models[model.class_name] = model
+            return model
+        if existing.signature() == model.signature():
+            return existing
+        # Elements with the same name but a different content
+        model.class_name = f"{parent.class_name if parent else ''}{model.class_name}"
+        return self.add_model(model, None)
+
+
+def read_schema(
+    schema_path: str, overrides: Optional[Dict[str, str]] = None
+) -> List[ModelSpec]:
+    """
+    Read the models of the record elements of a feed schema: the child
+    elements of the root element, and the elements nested in them.
+    """
+    reader = _SchemaReader(schema_path, overrides or {})
+    for root in reader.get_start():
+        content = _Content()
+        for child in _children(root):
+            reader._collect(child, True, False, content)
+        records = [element for element, _, _ in content.elements] or [root]
+        for record in records:
+            reader.read_element(record, None)
+    return list(reader.models.values())
+
+
+def _guess_case(model: ModelSpec) -> Case:
+    def matches(case):
+        return sum(
+            transform_name(f.name, case) == f.xml_name
+            for f in model.fields
+            if f.kind != "text"
+        )
+
+    return max((Case.PASCAL, Case.CAMEL, Case.KEBAB), key=matches)
+
+
+def _generate_model(model: ModelSpec) -> List[str]:
+    case = _guess_case(model)
+    fields = model.fields
+    attributes = [f.name for f in fields if f.kind == "attribute"]
+    name_overrides = {
+        f.name: f.xml_name
+        for f in fields
+        if f.kind != "text" and transform_name(f.name, case) != f.xml_name
+    }
+
+    lines = ["@dataclass", f"class {model.class_name}(XMLModel):"]
+    # Dataclass fields without a default come first
+    for f in sorted(fields, key=lambda f: not f.required):
+        args = [] if f.model or f.repeated else f.value.constraint_args()
+        if args:
+            if not f.required:
+                args.append("default=None")
+            default = f" = xml_field({', '.join(args)})"
+        else:
+            default = "" if f.required else " = None"
+        lines.append(f"    {f.name}: {f.py_type}{default}")
+
+    lines += [
+        "",
+        "    class Meta:",
+        f'        element_name = "{model.xml_name}"',
+        f"        case = Case.{case.name}",
+    ]
+    if attributes:
+        lines.append(f"        attributes = [{', '.join(map(_quote, attributes))}]")
+    if name_overrides:
+        lines.append("        element_name_overrides = {")
+        lines += [f'            "{k}": "{v}",' for k, v in name_overrides.items()]
+        lines.append("        }")
+
+    lines += [
+        "",
+        "    def to_etree(self, overrides=None) -> etree._Element:",
+        "        if overrides:",
+        "            return replace(self, **overrides).to_etree()",
+        "",
+        f'        root = etree.Element("{model.xml_name}")',
+    ]
+    for f in fields:
+        lines += _generate_field(f)
+    lines.append("        return root")
+    return lines
+
+
+def _generate_field(f: FieldSpec) -> List[str]:
+    value = f"self.{f.name}"
+    if f.kind == "attribute":
+        body = [f'root.set("{f.xml_name}", {f.value.format_expression(value)})']
+    elif f.kind == "text":
+        body = [f"root.text = {f.value.format_expression(value)}"]
+    elif f.repeated:
+        item = "item"
+        if f.model:
+            append = [f"root.append({item}.to_etree())"]
+        else:
+            append = [
+                f'etree.SubElement(root, "{f.xml_name}").text = '
+                f"{f.value.format_expression(item)}"
+            ]
+        body = [f"for {item} in {value}:"] + [f"    {line}" for line in append]
+    elif f.model:
+        body = [f"root.append({value}.to_shared_etree())"]
+    else:
+        body = [
+            f'etree.SubElement(root, "{f.xml_name}").text = '
+            f"{f.value.format_expression(value)}"
+        ]
+
+    if f.required:
+        return [f"        {line}" for line in body]
+    return [f"        if {value} is not None:"] + [
+        f"            {line}" for line in body
+    ]
+
+
+# Names the generated code may use, by module, in import order
+_IMPORTS = [
+    [
+        ("dataclasses", ("dataclass", "replace")),
+        ("datetime", ("date", "datetime")),
+        ("decimal", ("Decimal",)),
+        ("typing", ("List", "Literal", "Optional")),
+    ],
+    [("lxml", ("etree",))],
+    [
+        ("django_oikotie.enums", ("Case",)),
+        ("django_oikotie.utils", ("format_date", "format_decimal", "yes_no_bool")),
+        ("django_oikotie.xml_models", ("XMLModel", "xml_field")),
+    ],
+]
+
+
+def _generate_imports(code: str) -> List[str]:
+    lines = []
+    for group in _IMPORTS:
+        group_lines = []
+        for module, names in group:
+            used = [name for name in names if re.search(rf"\b{name}\b", code)]
+            if used:
+                group_lines.append(f"from {module} import {', '.join(used)}")
+        if group_lines:
+            lines += group_lines + [""]
+    return lines
+
+
+def generate_models(
+    schema_path: str, overrides: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Return the source of a module with the XMLModel dataclasses of the record
+    elements in the RelaxNG schema. `overrides` maps element names to the
+    dotted paths of hand-written classes used instead of generated ones.
+    """
+    models = read_schema(schema_path, overrides)
+    body = []
+    override_imports = []
+    for model in models:
+        if model.override:
+            module, class_name = model.override.rsplit(".", 1)
+            override_imports.append(f"from {module} import {class_name}")
+            continue
+        body += ["", ""] + _generate_model(model)
+    code = "\n".join(body)
+
+    imports = _generate_imports(code)
+    if override_imports:
+        imports += sorted(set(override_imports)) + [""]
+    header = (
+        f"# Generated from {path.basename(schema_path)} by django_oikotie.codegen, "
+        "do not edit."
+    )
+    return "\n".join([header] + imports[:-1]) + "\n" + code + "\n"
@@ -0,0 +1,120 @@
+import os
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from lxml import etree
+
+from .enums import ApartmentAction, DeltaStatus
+from .oikotie import get_filename, send_items
+from .state import PushStateStore, record_hash
+from .writers import get_writer
+from .xml_models import shared_fragments
+from .xml_models.apartment import ApartmentRemoval
+
+_SENTINEL = object()
+
+
+@dataclass
+class DeltaResult:
+    # None if nothing changed since the last push
+    filename: Optional[str]
+    counts: Dict[DeltaStatus, int] = field(
+        default_factory=lambda: dict.fromkeys(DeltaStatus, 0)
+    )
+
+
+def _check_order(items: Iterable, name: str) -> Iterator:
+    previous = _SENTINEL
+    for item in items:
+        key = item[0]
+        if previous is not _SENTINEL and key <= previous:
+            raise ValueError(f"{name} is not ordered by key: {key} after {previous}")
+        previous = key
+        yield item
+
+
+def iter_delta(
+    current: Iterable[Tuple[str, str, Any]], pushed: Iterable[Tuple[str, str]]
+) -> Iterator[Tuple[DeltaStatus, str, Any]]:
+    """
+    Merge-join the current (key, hash, item) records with the pushed (key, hash)
+    records and yield (status, key, item) for every key. The item is None for
+    removed keys. Both inputs must be ordered by key using Python string
+    comparison; ValueError is raised otherwise. Only one record of each input
+    is held in memory.
+    """
+    current = _check_order(current, "Current records")
+    pushed = _check_order(pushed, "Pushed records")
+    new = next(current, None)
+    old = next(pushed, None)
+
+    while new is not None or old is not None:
+        if old is None or (new is not None and new[0] < old[0]):
+            yield DeltaStatus.NEW, new[0], new[2]
+            new = next(current, None)
+        elif new is None or old[0] < new[0]:
+            yield DeltaStatus.REMOVED, old[0], None
+            old = next(pushed, None)
+        else:
+            status = DeltaStatus.UNCHANGED if new[1] == old[1] else DeltaStatus.CHANGED
+            yield status, new[0], new[2]
+            new = next(current, None)
+            old = next(pushed, None)
+
+
+def _iter_serialized(apartments) -> Iterator[Tuple[str, str, bytes]]:
+    with shared_fragments():
+        for apartment in apartments:
+            element = apartment.to_etree(overrides={"action": ApartmentAction.UPDATE})
+            data = etree.tostring(element, encoding="utf-8")
+            # Hash the element as it will be parsed back from the file, so the
+            # hash matches the one recorded by PushStateStore.record_file.
+            yield apartment.key, record_hash(etree.fromstring(data)), data
+
+
+def write_delta(apartments, state_store: PushStateStore, file_path=".") -> DeltaResult:
+    """
+    Write an UPDATEAPT file with the apartments that are new or changed since
+    the last push recorded in `state_store` and removals of the pushed keys
+    missing from `apartments`. The apartments must be ordered by key, e.g.
+    `queryset.order_by(Collate("key", "C"))` on PostgreSQL. No file is written
+    if nothing changed.
+    """
+    filename = get_filename("UPDATEAPT")
+    file = os.path.join(file_path, filename)
+    temp_file = f"{file}.temp"
+    result = DeltaResult(filename)
+    delta = iter_delta(_iter_serialized(apartments), state_store.iter_hashes())
+
+    try:
+        with get_writer(temp_file, "Apartments") as writer:
+            for status, key, data in delta:
+                result.counts[status] += 1
+                if status is DeltaStatus.REMOVED:
+                    writer.write(ApartmentRemoval(key).to_etree())
+                elif status is not DeltaStatus.UNCHANGED:
+                    writer.write_fragment(data)
+    except BaseException:
+        # The writer may have failed before creating the file
+        with suppress(FileNotFoundError):
+            os.remove(temp_file)
+        raise
+
+    if result.counts[DeltaStatus.UNCHANGED] == sum(result.counts.values()):
+        os.remove(temp_file)
+        result.filename = None
+    else:
+        os.replace(temp_file, file)
+    return result
+
+
+def push_delta(apartments, state_store: PushStateStore, file_path=".") -> DeltaResult:
+    """
+    write_delta() and upload the file, recording the pushed records in the
+    state store.
+    """
+    result = write_delta(apartments, state_store, file_path)
+    if result.filename is not None:
+        send_items(file_path, result.filename, state_store=state_store)
+    return result
@@ -0,0 +1,184 @@
+import logging
+import os
+import sqlite3
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional, Tuple
+
+from lxml import etree
+
+from .enums import RecordDiffStatus
+
+_logger = logging.getLogger(__name__)
+
+# Record elements of the APT/UPDATEAPT and HOUSINGCOMPANY feeds and the name of
+# the child element holding their key.
+RECORD_TAGS = ("Apartment", "housing-company")
+KEY_TAGS = ("Key", "key")
+
+INDEX_BATCH_SIZE = 1000
+
+
+@dataclass
+class RecordDiff:
+    key: str
+    status: RecordDiffStatus
+    # Field name -> (old value, new value). Only populated for changed records.
+    changes: Dict[str, Tuple[Optional[str], Optional[str]]] = field(
+        default_factory=dict
+    )
+
+
+def _get_record_key(element: etree._Element) -> Optional[str]:
+    for tag in KEY_TAGS:
+        key = element.findtext(tag)
+        if key is not None:
+            return key
+    return None
+
+
+def iter_feed_records(xml_path: str) -> Iterator[Tuple[str, etree._Element]]:
+    """
+    Stream (key, element) pairs of the records in a feed file.
+
+    Elements are cleared as soon as the consumer resumes the iterator, so the
+    yielded element must be processed before requesting the next one.
+    """
+    context = etree.iterparse(
+        xml_path, events=("end",), tag=RECORD_TAGS, huge_tree=True
+    )
+    for _, element in context:
+        key = _get_record_key(element)
+        if key is None:
+            _logger.warning(f"Skipping {element.tag} without a key in {xml_path}")
+        else:
+            yield key, element
+
+        element.clear(keep_tail=True)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+def _build_index(connection: sqlite3.Connection, table: str, xml_path: str):
+    connection.execute(
+        f"CREATE TABLE {table} "
+        "(key TEXT PRIMARY KEY, record BLOB, occurrences INTEGER DEFAULT 1) "
+        "WITHOUT ROWID"
+    )
+    # Records with a duplicate key are counted, to be reported as duplicates
+    sql = (
+        f"INSERT INTO {table} (key, record) VALUES (?, ?) "
+        "ON CONFLICT (key) DO UPDATE SET occurrences = occurrences + 1"
+    )
+
+    batch = []
+    for key, element in iter_feed_records(xml_path):
+        batch.append((key, etree.tostring(element, with_tail=False)))
+        if len(batch) >= INDEX_BATCH_SIZE:
+            connection.executemany(sql, batch)
+            batch.clear()
+    connection.executemany(sql, batch)
+    connection.commit()
+
+
+def _field_value(element: etree._Element) -> str:
+    if len(element) == 0 and not element.attrib:
+        return element.text or ""
+    # Canonicalize nested elements so that indentation and attribute order
+    # don't count as changes
+    for node in element.iter():
+        if node.text is not None and not node.text.strip():
+            node.text = None
+        if node.tail is not None and not node.tail.strip():
+            node.tail = None
+    return etree.tostring(element, method="c14n", with_tail=False).decode()
+
+
+def _record_fields(record: bytes) -> Dict[str, str]:
+    element = etree.fromstring(record)
+    fields = {f"@{name}": value for name, value in element.attrib.items()}
+
+    counts = {}
+    for child in element:
+        if not isinstance(child.tag, str):
+            # Comments and processing instructions
+            continue
+        counts[child.tag] = counts.get(child.tag, 0) + 1
+        name = (
+            child.tag if counts[child.tag] == 1 else f"{child.tag}[{counts[child.tag]}]"
+        )
+        fields[name] = _field_value(child)
+
+    return fields
+
+
+def diff_records(old_record: bytes, new_record: bytes) -> Dict[str, tuple]:
+    """
+    Return the field-level differences of two serialized record elements.
+    Attributes of the record element are reported as "@name".
+    """
+    old_fields = _record_fields(old_record)
+    new_fields = _record_fields(new_record)
+
+    changes = {}
+    for name in list(old_fields) + [n for n in new_fields if n not in old_fields]:
+        old_value = old_fields.get(name)
+        new_value = new_fields.get(name)
+        if old_value != new_value:
+            changes[name] = (old_value, new_value)
+    return changes
+
+
+def diff_feeds(
+    old_path: str, new_path: str, index_dir: Optional[str] = None
+) -> Iterator[RecordDiff]:
+    """
+    Compare two feed files record by record, keyed on <Key>/<key>.
+
+    Both files are streamed into a temporary on-disk SQLite index (created in
+    `index_dir` or the system temp directory) and merge-joined in key order,
+    so memory use stays bounded regardless of the file sizes. Unchanged
+    records are not reported. Keys found more than once in either file are
+    reported as DUPLICATE instead of being compared.
+    """
+    with tempfile.TemporaryDirectory(dir=index_dir) as tmp_dir:
+        connection = sqlite3.connect(os.path.join(tmp_dir, "index.sqlite3"))
+        try:
+            _build_index(connection, "old", old_path)
+            _build_index(connection, "new", new_path)
+
+            old_rows = connection.execute(
+                "SELECT key, record, occurrences FROM old ORDER BY key"
+            )
+            new_rows = connection.execute(
+                "SELECT key, record, occurrences FROM new ORDER BY key"
+            )
+            old_row = old_rows.fetchone()
+            new_row = new_rows.fetchone()
+
+            while old_row is not None or new_row is not None:
+                if new_row is None or (old_row is not None and old_row[0] < new_row[0]):
+                    status = RecordDiffStatus.REMOVED
+                    if old_row[2] > 1:
+                        status = RecordDiffStatus.DUPLICATE
+                    yield RecordDiff(old_row[0], status)
+                    old_row = old_rows.fetchone()
+                elif old_row is None or new_row[0] < old_row[0]:
+                    status = RecordDiffStatus.ADDED
+                    if new_row[2] > 1:
+                        status = RecordDiffStatus.DUPLICATE
+                    yield RecordDiff(new_row[0], status)
+                    new_row = new_rows.fetchone()
+                else:
+                    if old_row[2] > 1 or new_row[2] > 1:
+                        yield RecordDiff(old_row[0], RecordDiffStatus.DUPLICATE)
+                    elif old_row[1] != new_row[1]:
+                        changes = diff_records(old_row[1], new_row[1])
+                        if changes:
+                            yield RecordDiff(
+                                old_row[0], RecordDiffStatus.CHANGED, changes
+                            )
+                    old_row = old_rows.fetchone()
+                    new_row = new_rows.fetchone()
+        finally:
+            connection.close()
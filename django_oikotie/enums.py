@@ -123,3 +123,18 @@ class ShoreType(Enum):
 class SiteType(Enum):
     OWNED = "O"
     RENT = "V"
+
+
+class RecordDiffStatus(Enum):
+    ADDED = "added"
+    REMOVED = "removed"
+    CHANGED = "changed"
+    # The key is found more than once in either file
+    DUPLICATE = "duplicate"
+
+
+class DeltaStatus(Enum):
+    NEW = "new"
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+    REMOVED = "removed"
@@ -0,0 +1,80 @@
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+from .utils import format_date, yes_no_bool
+
+Formatter = Callable[[Any], Any]
+
+# Formatters registered with register_formatter(), by type
+_formatters: Dict[type, Formatter] = {}
+# Formatters resolved for the exact types of the formatted values
+_resolved: Dict[type, Formatter] = {}
+
+
+def register_formatter(value_type: type, formatter: Optional[Formatter] = None):
+    """
+    Register the function formatting values of `value_type` (and its subclasses
+    without a formatter of their own) of fields without a format_<key> method.
+    The function returns the text of the element or attribute. Can be used as
+    a decorator.
+
+    Example::
+
+        >>> @register_formatter(Money)
+        >>> def format_money(value: Money) -> str:
+        >>>     return format_decimal(value.amount, 2)
+    """
+    if formatter is None:
+        return lambda formatter: register_formatter(value_type, formatter)
+
+    _formatters[value_type] = formatter
+    _resolved.clear()
+    return formatter
+
+
+def unregister_formatter(value_type: type):
+    """Remove the formatter registered for `value_type`."""
+    del _formatters[value_type]
+    _resolved.clear()
+
+
+def _resolve(value_type: type) -> Formatter:
+    mro = value_type.__mro__
+    if issubclass(value_type, Enum):
+        # Mixed-in enums (class Case(str, Enum)) are formatted as enums and not
+        # as their data type.
+        mro = sorted(mro, key=lambda t: not issubclass(t, Enum))
+    for t in mro:
+        formatter = _formatters.get(t)
+        if formatter is not None:
+            return formatter
+    return str
+
+
+def get_formatter(value_type: type) -> Formatter:
+    """
+    Formatter for values of `value_type`: the one registered for the closest
+    class in its MRO, or str().
+    """
+    formatter = _resolved.get(value_type)
+    if formatter is None:
+        formatter = _resolved[value_type] = _resolve(value_type)
+    return formatter
+
+
+def format_value(value: Any) -> Any:
+    return get_formatter(type(value))(value)
+
+
+def _as_is(value):
+    return value
+
+
+# Numbers, including Decimals, are formatted with str(); the precision of a
+# field is set with xml_field(decimals=...)
+register_formatter(list, _as_is)
+register_formatter(bool, yes_no_bool)
+register_formatter(Enum, lambda value: str(value.value))
+register_formatter(date, lambda value: format_date(value, "%d.%m.%Y"))
+register_formatter(datetime, lambda value: format_date(value, "%Y-%m-%dT%H:%M:%S"))
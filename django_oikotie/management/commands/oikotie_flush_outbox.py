@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from django_oikotie.outbox import flush_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Push the queued apartment changes that are due as one UPDATEAPT file. "
+        "Meant to be run periodically, e.g. every minute."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output-dir", default=".")
+
+    def handle(self, *args, **options):
+        result = flush_outbox(options["output_dir"])
+        if result is None:
+            self.stdout.write("Nothing to push")
+            return
+
+        self.stdout.write(
+            f"{result.filename}: {result.updates} updates, {result.removals} removals"
+        )
+        self.stdout.write(
+            f"  latency max {result.max_latency.total_seconds():.1f} s, "
+            f"mean {result.mean_latency.total_seconds():.1f} s"
+        )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from django_oikotie.codegen import generate_models
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate XMLModel dataclasses with straight-line serializers from a "
+        "RelaxNG schema."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("schema", help="Path of the RelaxNG (.rng) schema")
+        parser.add_argument(
+            "--override",
+            action="append",
+            default=[],
+            metavar="ELEMENT=DOTTED.PATH",
+            help=(
+                "Use a hand-written class for the element instead of generating "
+                "one, e.g. Picture=django_oikotie.xml_models.apartment.Picture"
+            ),
+        )
+        parser.add_argument(
+            "--output", help="File to write the module to (default: stdout)"
+        )
+
+    def handle(self, *args, **options):
+        overrides = {}
+        for override in options["override"]:
+            element, sep, class_path = override.partition("=")
+            if not sep or "." not in class_path:
+                raise CommandError(f"Invalid --override {override}")
+            overrides[element] = class_path
+
+        source = generate_models(options["schema"], overrides)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(source)
+        else:
+            self.stdout.write(source, ending="")
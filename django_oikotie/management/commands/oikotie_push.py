@@ -0,0 +1,196 @@
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from os import path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from django_oikotie.oikotie import get_filename, send_items, write_feed
+from django_oikotie.quarantine import Quarantine
+from django_oikotie.utils import validate_against_schema
+from django_oikotie.worker_pool import connect_pool
+
+
+@dataclass
+class Feed:
+    prefix: str
+    root_name: str
+    provider_setting: str
+    schema_setting: str
+
+
+FEEDS = {
+    "apartments": Feed(
+        prefix="APT",
+        root_name="Apartments",
+        provider_setting="OIKOTIE_APARTMENTS_PROVIDER",
+        schema_setting="OIKOTIE_APARTMENTS_BATCH_SCHEMA",
+    ),
+    "housing-companies": Feed(
+        prefix="HOUSINGCOMPANY",
+        root_name="housing-companies",
+        provider_setting="OIKOTIE_HOUSING_COMPANIES_PROVIDER",
+        schema_setting="OIKOTIE_HOUSINGCOMPANIES_BATCH_SCHEMA",
+    ),
+}
+
+
+class _TimedIterator:
+    """Iterator wrapper which measures the time spent producing the items."""
+
+    def __init__(self, iterable):
+        self.iterator = iter(iterable)
+        self.elapsed = 0.0
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            item = next(self.iterator)
+        finally:
+            self.elapsed += time.perf_counter() - start
+        self.count += 1
+        return item
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate an Oikotie feed file from the items returned by the "
+        "OIKOTIE_APARTMENTS_PROVIDER / OIKOTIE_HOUSING_COMPANIES_PROVIDER "
+        "callable, optionally validate it and upload it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--feed", choices=sorted(FEEDS), default="apartments")
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of worker processes used for serialization",
+        )
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=1000,
+            help="Number of items serialized per worker task",
+        )
+        parser.add_argument(
+            "--worker-pool",
+            action="store_true",
+            help=(
+                "Serialize and validate in the workers of the running "
+                "oikotie_worker_pool service instead of starting processes"
+            ),
+        )
+        parser.add_argument(
+            "--validate",
+            action="store_true",
+            help="Validate the file against the RelaxNG schema before uploading",
+        )
+        parser.add_argument(
+            "--prevalidate",
+            action="store_true",
+            help=(
+                "Check each item against the constraints declared by its model "
+                "before serializing it"
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Generate (and validate) the file without uploading it",
+        )
+        parser.add_argument("--output-dir", default=".")
+        parser.add_argument(
+            "--quarantine",
+            metavar="PATH",
+            help=(
+                "Leave out items which fail to serialize and report them as JSON "
+                "lines to PATH instead of aborting"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["jobs"] < 1 or options["shard_size"] < 1:
+            raise CommandError("--jobs and --shard-size must be positive")
+
+        feed = FEEDS[options["feed"]]
+        provider_path = getattr(settings, feed.provider_setting, None)
+        if not provider_path:
+            raise CommandError(f"settings.{feed.provider_setting} is not defined")
+
+        pool = None
+        if options["worker_pool"]:
+            try:
+                pool = connect_pool()
+            except ConnectionError as e:
+                raise CommandError(f"The worker pool is not running: {e}")
+
+        self.timings = {}
+        with self.stage("total"), pool or nullcontext():
+            filename = get_filename(feed.prefix)
+            file_path = path.join(options["output_dir"], filename)
+
+            items = _TimedIterator(import_string(provider_path)())
+            quarantine = None
+            if options["quarantine"]:
+                quarantine = Quarantine(options["quarantine"])
+            with self.stage("serialize"):
+                try:
+                    write_feed(
+                        file_path,
+                        feed.root_name,
+                        items,
+                        jobs=options["jobs"],
+                        shard_size=options["shard_size"],
+                        quarantine=quarantine,
+                        prevalidate=options["prevalidate"],
+                        pool=pool,
+                    )
+                finally:
+                    if quarantine is not None:
+                        quarantine.close()
+            # Items are loaded lazily while the file is written
+            self.timings["load"] = items.elapsed
+            self.timings["serialize"] -= items.elapsed
+
+            if options["validate"]:
+                with self.stage("validate"):
+                    schema = getattr(settings, feed.schema_setting)
+                    if not self.validate(pool, schema, file_path):
+                        raise CommandError(f"{filename} is not valid against {schema}")
+
+            if not options["dry_run"]:
+                with self.stage("upload"):
+                    send_items(options["output_dir"], filename)
+
+        self.stdout.write(f"{filename}: {items.count} items")
+        if quarantine is not None and quarantine.count:
+            self.stdout.write(
+                f"  {quarantine.count} items quarantined to {quarantine.report_path}"
+            )
+        for stage in ("load", "serialize", "validate", "upload", "total"):
+            if stage in self.timings:
+                self.stdout.write(f"  {stage:<10} {self.timings[stage]:8.2f} s")
+
+    def validate(self, pool, schema, file_path):
+        if pool is None:
+            return validate_against_schema(schema, file_path)
+        with open(file_path, "rb") as f:
+            valid, errors = pool.validate(schema, f.read())
+        if not valid:
+            self.stderr.write(errors)
+        return valid
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
@@ -0,0 +1,39 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from django_oikotie.worker_pool import WorkerPool, make_server
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a pool of warm serialization and validation workers, used by "
+        "oikotie_push --worker-pool and worker_pool.connect_pool(), until "
+        "interrupted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=None,
+            help="Number of worker processes, by default one per CPU",
+        )
+
+    def handle(self, *args, **options):
+        if options["jobs"] is not None and options["jobs"] < 1:
+            raise CommandError("--jobs must be positive")
+
+        with WorkerPool(options["jobs"]) as pool:
+            try:
+                server = make_server(pool)
+            except ImproperlyConfigured as e:
+                raise CommandError(str(e))
+            self.stdout.write(
+                f"Worker pool of {pool.jobs} workers listening on {server.address}"
+            )
+            self.stdout.flush()
+            try:
+                server.serve_forever()
+            except SystemExit:
+                # serve_forever() exits with sys.exit() once stopped
+                pass
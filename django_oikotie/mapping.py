@@ -0,0 +1,389 @@
+from abc import ABC, abstractmethod
+from dataclasses import fields
+from operator import attrgetter
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from django.core.exceptions import FieldDoesNotExist
+
+from .oikotie import iter_shards
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class _Spec(ABC):
+    def get_paths(self) -> Tuple[str, ...]:
+        return ()
+
+    @abstractmethod
+    def compile_loader(self) -> Callable[[Sequence], list]:
+        """Return a function which maps a chunk of rows to a column of values."""
+
+
+class _RowSpec(_Spec):
+    """Spec whose value is computed from each row on its own."""
+
+    @abstractmethod
+    def compile(self) -> Callable:
+        """Return a function which maps a row to its value."""
+
+    def compile_loader(self) -> Callable[[Sequence], list]:
+        getter = self.compile()
+        return lambda rows: list(map(getter, rows))
+
+
+class Value(_RowSpec):
+    """Constant value for a field."""
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def compile(self) -> Callable:
+        value = self.value
+        return lambda row: value
+
+    def compile_loader(self) -> Callable[[Sequence], list]:
+        value = self.value
+        return lambda rows: [value] * len(rows)
+
+
+class Path(_RowSpec):
+    """
+    Attribute path relative to the source row, e.g. "building.street_address".
+    Plain strings in a mapping are turned into Paths. A None anywhere along the
+    path results in None.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def get_paths(self) -> Tuple[str, ...]:
+        return (self.path,)
+
+    def compile(self) -> Callable:
+        getter = attrgetter(self.path)
+        if "." not in self.path:
+            return getter
+        parts = self.path.split(".")
+
+        def get(row):
+            try:
+                return getter(row)
+            except AttributeError:
+                # Slow path only taken for a None relation along the path
+                for part in parts:
+                    if row is None:
+                        return None
+                    row = getattr(row, part)
+                return row
+
+        return get
+
+
+class Computed(_RowSpec):
+    """
+    Value computed from one or more attribute paths.
+
+    Example::
+
+        >>> living_area = Computed(lambda area: LivingArea("m2", area), "area")
+    """
+
+    def __init__(self, func: Callable, *paths: str):
+        self.func = func
+        self.paths = paths
+
+    def get_paths(self) -> Tuple[str, ...]:
+        return self.paths
+
+    def compile(self) -> Callable:
+        func = self.func
+        getters = tuple(Path(path).compile() for path in self.paths)
+        return lambda row: func(*[getter(row) for getter in getters])
+
+
+class Nested(_Spec):
+    """
+    Nested XMLModel built with another mapping from the same source row, or from
+    the object at `source` if given. With `optional` the nested model is None
+    when all of its source values are None.
+    """
+
+    def __init__(
+        self,
+        mapping: "type[ModelMapping]",
+        source: Optional[str] = None,
+        optional: bool = True,
+    ):
+        self.mapping = mapping
+        self.source = source
+        self.optional = optional
+
+    def get_paths(self) -> Tuple[str, ...]:
+        paths = self.mapping.get_source_paths()
+        if self.source:
+            return tuple(f"{self.source}.{path}" for path in paths) or (self.source,)
+        return paths
+
+    def compile_loader(self) -> Callable[[Sequence], list]:
+        mapping = self.mapping
+        optional = self.optional
+        source = Path(self.source).compile() if self.source else None
+
+        def load(rows):
+            if source is not None:
+                rows = [source(row) for row in rows]
+            present = [i for i, row in enumerate(rows) if row is not None]
+            models = mapping.map_rows([rows[i] for i in present], optional=optional)
+            column = [None] * len(rows)
+            for i, model in zip(present, models):
+                column[i] = model
+            return column
+
+        return load
+
+
+class Related(_Spec):
+    """
+    List of XMLModels built with `mapping` from the rows of a related model
+    pointing to the source row with the foreign key `fk` (e.g. the pictures of
+    an apartment).
+
+    The related rows of a whole chunk are loaded with one query and grouped by
+    the foreign key, so a chunk costs one query per Related field instead of
+    one per source row. Items within a list are ordered by `order_by`, then by
+    primary key. If `index_field` is given, the 1-based position of each item
+    in its list is set to that field. Empty lists are mapped to None.
+
+    Example::
+
+        >>> pictures = Related(
+        >>>     ApartmentImage.objects.all(),
+        >>>     "apartment",
+        >>>     PictureMapping,
+        >>>     order_by=("order",),
+        >>>     index_field="index",
+        >>> )
+    """
+
+    def __init__(
+        self,
+        queryset,
+        fk: str,
+        mapping: "type[ModelMapping]",
+        order_by: Sequence[str] = (),
+        key: str = "pk",
+        index_field: Optional[str] = None,
+    ):
+        self.queryset = queryset
+        self.fk = fk
+        self.mapping = mapping
+        self.order_by = tuple(order_by)
+        self.key = key
+        self.index_field = index_field
+
+    def get_paths(self) -> Tuple[str, ...]:
+        return (self.key,)
+
+    def get_queryset(self, keys: Sequence):
+        queryset = self.queryset
+        if not hasattr(queryset, "filter"):
+            # A model class
+            queryset = queryset._default_manager.all()
+
+        fk_attname = queryset.model._meta.get_field(self.fk).attname
+        queryset = self.mapping.prepare_queryset(queryset, extra_fields=(fk_attname,))
+        return fk_attname, queryset.filter(**{f"{self.fk}__in": keys}).order_by(
+            *self.order_by, "pk"
+        )
+
+    def compile_loader(self) -> Callable[[Sequence], list]:
+        key_getter = Path(self.key).compile()
+
+        def load(rows):
+            if not rows:
+                return []
+            keys = [key_getter(row) for row in rows]
+
+            # Grouped in a dict rather than merge-joined with the sorted keys,
+            # as the database may order keys differently from Python (e.g.
+            # strings under a non-C collation)
+            fk_attname, queryset = self.get_queryset(list(set(keys)))
+            groups = {}
+            for related in queryset.iterator():
+                groups.setdefault(getattr(related, fk_attname), []).append(related)
+
+            return [self._map_group(groups.get(key, [])) for key in keys]
+
+        return load
+
+    def _map_group(self, group: list) -> Optional[list]:
+        if not group:
+            return None
+        extra = {}
+        if self.index_field:
+            extra[self.index_field] = list(range(1, len(group) + 1))
+        return self.mapping.map_rows(group, **extra)
+
+
+class ModelMapping:
+    """
+    Declarative mapping from Django model instances to an XMLModel. Each class
+    attribute named after a field of `Meta.model` describes where the value
+    comes from: an attribute path string, `Value`, `Computed`, `Nested` or
+    `Related`. The loaders are compiled once when the mapping class is created
+    and the `only()`/`select_related()` arguments are derived from the paths.
+    Rows are mapped a chunk at a time, column by column, so list fields filled
+    with `Related` cost one query per chunk.
+
+    Example::
+
+        >>> class CityMapping(ModelMapping):
+        >>>     class Meta:
+        >>>         model = City
+        >>>
+        >>>     id = "building.city.code"
+        >>>     value = "building.city.name"
+        >>>
+        >>> class ApartmentMapping(ModelMapping):
+        >>>     class Meta:
+        >>>         model = Apartment
+        >>>
+        >>>     key = "uuid"
+        >>>     type = Value(ApartmentType.BLOCK_OF_FLATS)
+        >>>     street_address = "building.street_address"
+        >>>     city = Nested(CityMapping, optional=False)
+        >>>     ...
+        >>>
+        >>> for apartment in ApartmentMapping.map_queryset(Unit.objects.all()):
+        >>>     ...
+    """
+
+    class Meta:
+        model = None
+
+    _specs: Tuple[Tuple[str, Any], ...] = ()
+    _loaders: Tuple[Tuple[str, Callable], ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        model = cls.Meta.model
+        if model is None:
+            raise ValueError(f"{cls.__name__}.Meta.model is not defined")
+
+        field_names = [f.name for f in fields(model)]
+        specs = dict(cls._specs)
+        for name, spec in vars(cls).items():
+            if name.startswith("_") or name == "Meta":
+                continue
+            if isinstance(spec, str):
+                spec = Path(spec)
+            if not isinstance(spec, _Spec):
+                continue
+            if name not in field_names:
+                raise ValueError(f"{model.__name__} has no field {name}")
+            specs[name] = spec
+
+        # Keep the field order of the model
+        cls._specs = tuple((name, specs[name]) for name in field_names if name in specs)
+        cls._loaders = tuple((name, spec.compile_loader()) for name, spec in cls._specs)
+
+    @classmethod
+    def get_source_paths(cls) -> Tuple[str, ...]:
+        paths = []
+        for _, spec in cls._specs:
+            paths.extend(spec.get_paths())
+        return tuple(paths)
+
+    @classmethod
+    def get_queryset_fields(cls, django_model) -> Tuple[Optional[Set[str]], Set[str]]:
+        """
+        Return the `only()` and `select_related()` lookups needed by the mapping.
+        The `only()` lookups are None if a path goes through a property or
+        other non-field attribute, in which case whole rows are needed.
+        """
+        only = set()
+        related = set()
+        for path in cls.get_source_paths():
+            model = django_model
+            lookups = []
+            for part in path.split("."):
+                if part == "pk":
+                    part = model._meta.pk.name
+                try:
+                    field = model._meta.get_field(part)
+                except FieldDoesNotExist:
+                    only = None
+                    break
+                lookups.append(part)
+                if not field.is_relation:
+                    # Any remaining parts are Python attributes of the value
+                    break
+                if field.many_to_many or field.one_to_many:
+                    raise ValueError(f"{path} traverses a multi-valued relation")
+                related.add("__".join(lookups))
+                model = field.related_model
+
+            if only is not None:
+                only.add("__".join(lookups))
+
+        if only is not None:
+            # A traversed relation must not be deferred
+            only.update(related)
+        return only, related
+
+    @classmethod
+    def prepare_queryset(cls, queryset, extra_fields: Iterable[str] = ()):
+        only, related = cls.get_queryset_fields(queryset.model)
+        if related:
+            queryset = queryset.select_related(*sorted(related))
+        if only is not None:
+            queryset = queryset.only(*sorted(only.union(extra_fields)))
+        return queryset
+
+    @classmethod
+    def map_row(cls, row):
+        return cls.map_rows([row])[0]
+
+    @classmethod
+    def map_rows(cls, rows: Sequence, optional: bool = False, **extra_columns) -> List:
+        """
+        Map a chunk of rows. `extra_columns` are lists of values, aligned with
+        the rows, for fields not covered by the mapping. With `optional` a row
+        whose mapped values are all None is mapped to None.
+        """
+        model = cls.Meta.model
+        columns = {name: load(rows) for name, load in cls._loaders}
+        columns.update(extra_columns)
+        names = tuple(columns)
+        models = []
+        for values in zip(*columns.values()):
+            if optional and all(value is None for value in values):
+                models.append(None)
+            else:
+                models.append(model(**dict(zip(names, values))))
+        return models
+
+    @classmethod
+    def map_chunks(cls, queryset, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+        """
+        Yield lists of mapped XMLModels, `chunk_size` rows at a time, from the
+        queryset limited to the columns and relations the mapping needs.
+        """
+        rows = cls.prepare_queryset(queryset).iterator(chunk_size=chunk_size)
+        for chunk in iter_shards(rows, chunk_size):
+            yield cls.map_rows(chunk)
+
+    @classmethod
+    def map_queryset(cls, queryset, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+        for chunk in cls.map_chunks(queryset, chunk_size):
+            yield from chunk
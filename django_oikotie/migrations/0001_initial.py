@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=255, unique=True)),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("update", "UPDATE"), ("remove", "REMOVE")],
+                        max_length=16,
+                    ),
+                ),
+                ("priority", models.SmallIntegerField(default=1)),
+                ("payload", models.BinaryField()),
+                ("version", models.PositiveIntegerField(default=1)),
+                ("first_changed_at", models.DateTimeField(db_index=True)),
+                ("changed_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "outbox entry",
+                "verbose_name_plural": "outbox entries",
+                "ordering": ("priority", "first_changed_at"),
+            },
+        ),
+    ]
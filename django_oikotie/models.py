@@ -0,0 +1,33 @@
+from django.db import models
+
+from django_oikotie.enums import ApartmentAction
+
+REMOVAL_PRIORITY = 0
+UPDATE_PRIORITY = 1
+
+
+class OutboxEntry(models.Model):
+    """
+    Pending change of one apartment, waiting to be pushed in an UPDATEAPT file.
+    Repeated changes to the same key are coalesced into a single entry which
+    holds the latest serialized Apartment element.
+    """
+
+    key = models.CharField(max_length=255, unique=True)
+    action = models.CharField(
+        max_length=16,
+        choices=[(action.value, action.name) for action in ApartmentAction],
+    )
+    priority = models.SmallIntegerField(default=UPDATE_PRIORITY)
+    payload = models.BinaryField()
+    version = models.PositiveIntegerField(default=1)
+    first_changed_at = models.DateTimeField(db_index=True)
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("priority", "first_changed_at")
+        verbose_name = "outbox entry"
+        verbose_name_plural = "outbox entries"
+
+    def __str__(self):
+        return f"{self.action} {self.key}"
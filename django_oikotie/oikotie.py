@@ -1,12 +1,24 @@
+import json
+import os
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from ftplib import FTP
+from itertools import islice
+from operator import methodcaller
 from os import path
-from xml.etree.ElementTree import ElementTree
+from typing import Optional
 
 from django.conf import settings
-from lxml.etree import Element
+from lxml import etree
 
 from django_oikotie.enums import ApartmentAction
+from django_oikotie.prevalidation import check_record
+from django_oikotie.quarantine import describe_failure, to_etree_or_quarantine
+from django_oikotie.writers import get_writer
+from django_oikotie.xml_models import shared_fragments
+from django_oikotie.xml_models.apartment import ApartmentRemoval
 
 
 def get_session():
@@ -26,7 +38,11 @@ def get_filename(prefix):
     )
 
 
-def send_items(file_path, filename):
+def send_items(file_path, filename, state_store=None):
+    """
+    Upload a feed file. If a `state.PushStateStore` is given, the records of
+    the file are recorded in it after a successful upload.
+    """
     session = get_session()
 
     with open(path.join(file_path, filename), "rb") as f:
@@ -34,37 +50,311 @@ def send_items(file_path, filename):
         session.rename("temp/{}.temp".format(filename), "data/{}".format(filename))
         session.quit()
 
+    if state_store is not None:
+        state_store.record_file(path.join(file_path, filename), filename)
 
-def create_housing_companies(housing_companies, file_path="."):
+
+def _write_items(file, root_name, items, quarantine, prevalidate, **kwargs):
+    with get_writer(file, root_name) as writer, shared_fragments():
+        for item in items:
+            element = to_etree_or_quarantine(item, quarantine, prevalidate, **kwargs)
+            if element is not None:
+                writer.write(element)
+
+
+def create_housing_companies(
+    housing_companies, file_path=".", quarantine=None, prevalidate=False
+):
     filename = get_filename("HOUSINGCOMPANY")
-    root = Element("housing-companies")
-    for housing_company in housing_companies:
-        root.append(housing_company.to_etree())
-    tree = ElementTree(root)
-    tree.write(path.join(file_path, filename), encoding="utf-8", xml_declaration=True)
+    _write_items(
+        path.join(file_path, filename),
+        "housing-companies",
+        housing_companies,
+        quarantine,
+        prevalidate,
+    )
     return filename
 
 
-def create_apartments(apartments, file_path="."):
+def create_apartments(
+    apartments,
+    file_path=".",
+    checkpoint_path=None,
+    checkpoint_interval=1000,
+    quarantine=None,
+    prevalidate=False,
+):
+    """
+    Write an APT feed file of the apartments and return its filename.
+
+    With `checkpoint_path` the apartments must be ordered by key. Every
+    `checkpoint_interval` apartments the last written key and the file offset
+    are recorded in the checkpoint file. If the checkpoint file exists when
+    the function is called, the interrupted file is truncated to the recorded
+    offset and writing continues from the first apartment after the recorded
+    key. The checkpoint file is removed once the feed file is complete.
+
+    With a `quarantine.Quarantine`, apartments which fail to serialize are
+    reported to it and left out of the file instead of aborting the batch.
+
+    With `prevalidate` each apartment is checked with
+    `prevalidation.check_record` before it is serialized, so that invalid
+    apartments are rejected (or quarantined) without validating the file.
+    """
+    if checkpoint_path is not None:
+        return _create_apartments_checkpointed(
+            apartments,
+            file_path,
+            checkpoint_path,
+            checkpoint_interval,
+            quarantine,
+            prevalidate,
+        )
+
     filename = get_filename("APT")
-    root = Element("Apartments")
-    for apartment in apartments:
-        root.append(apartment.to_etree())
-    tree = ElementTree(root)
-    tree.write(path.join(file_path, filename), encoding="utf-8", xml_declaration=True)
+    _write_items(
+        path.join(file_path, filename),
+        "Apartments",
+        apartments,
+        quarantine,
+        prevalidate,
+    )
     return filename
 
 
-def update_apartments(apartments, action=ApartmentAction.UPDATE, file_path="."):
+def create_apartments_from_batches(batches, file_path="."):
+    """
+    Write an APT feed file of `batch.ApartmentBatch`es and return its filename.
+    """
+    filename = get_filename("APT")
+    with get_writer(path.join(file_path, filename), "Apartments") as writer:
+        with shared_fragments():
+            for batch in batches:
+                for element in batch.iter_etrees():
+                    writer.write(element)
+    return filename
+
+
+@dataclass
+class Checkpoint:
+    filename: str
+    key: Optional[str] = None
+    offset: int = 0
+
+    @classmethod
+    def load(cls, checkpoint_path) -> Optional["Checkpoint"]:
+        try:
+            with open(checkpoint_path) as f:
+                return cls(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def save(self, checkpoint_path):
+        # Replace the previous checkpoint atomically
+        temp_path = f"{checkpoint_path}.temp"
+        with open(temp_path, "w") as f:
+            json.dump(asdict(self), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, checkpoint_path)
+
+
+def _create_apartments_checkpointed(
+    apartments, file_path, checkpoint_path, checkpoint_interval, quarantine, prevalidate
+):
+    checkpoint = Checkpoint.load(checkpoint_path)
+    resuming = checkpoint is not None
+    if checkpoint is None:
+        checkpoint = Checkpoint(get_filename("APT"))
+
+    feed_path = path.join(file_path, checkpoint.filename)
+    offset = checkpoint.offset if resuming else None
+    with get_writer(feed_path, "Apartments", offset) as writer, shared_fragments():
+        if not resuming:
+            checkpoint.offset = writer.sync()
+            checkpoint.save(checkpoint_path)
+
+        skip_until = checkpoint.key
+        last_key = checkpoint.key
+        written = 0
+        for apartment in apartments:
+            key = apartment.key
+            if skip_until is not None:
+                if key <= skip_until:
+                    continue
+                skip_until = None
+            elif last_key is not None and key <= last_key:
+                raise ValueError(
+                    f"Apartments are not ordered by key: {key} after {last_key}"
+                )
+
+            element = to_etree_or_quarantine(apartment, quarantine, prevalidate)
+            if element is not None:
+                writer.write(element)
+            last_key = key
+            written += 1
+            if written % checkpoint_interval == 0:
+                Checkpoint(checkpoint.filename, last_key, writer.sync()).save(
+                    checkpoint_path
+                )
+
+    os.remove(checkpoint_path)
+    return checkpoint.filename
+
+
+def update_apartments(
+    apartments,
+    action=ApartmentAction.UPDATE,
+    file_path=".",
+    quarantine=None,
+    prevalidate=False,
+):
     filename = get_filename("UPDATEAPT")
-    root = Element("Apartments")
-    for apartment in apartments:
-        apartment.action = action
-        root.append(apartment.to_etree())
-    tree = ElementTree(root)
-    tree.write(path.join(file_path, filename), encoding="utf-8", xml_declaration=True)
+    _write_items(
+        path.join(file_path, filename),
+        "Apartments",
+        apartments,
+        quarantine,
+        prevalidate,
+        overrides={"action": action},
+    )
     return filename
 
 
 def remove_apartments(apartments):
     return update_apartments(apartments, ApartmentAction.REMOVE)
+
+
+def remove_apartment_keys(keys, file_path="."):
+    """
+    Write an UPDATEAPT file removing apartments by key, without building full
+    Apartment objects. `keys` yields keys or (key, vendor identifier) tuples.
+    """
+    filename = get_filename("UPDATEAPT")
+    removals = (
+        ApartmentRemoval(*key) if isinstance(key, tuple) else ApartmentRemoval(key)
+        for key in keys
+    )
+    write_feed(path.join(file_path, filename), "Apartments", removals)
+    return filename
+
+
+def serialize_items(items) -> bytes:
+    """
+    Serialize XMLModel objects into concatenated XML fragments.
+    """
+    return _serialize_shard(items, tolerant=False)[0]
+
+
+def _to_checked_etree(item):
+    check_record(item)
+    return item.to_etree()
+
+
+def _serialize_shard(items, tolerant, prevalidate=False):
+    """
+    Return the concatenated XML fragments of the items and, in tolerant mode,
+    the descriptions of the items which failed to serialize. Module level so
+    that it can be run in worker processes.
+    """
+    to_etree = _to_checked_etree if prevalidate else methodcaller("to_etree")
+    if not tolerant:
+        with shared_fragments():
+            return (
+                b"".join(
+                    etree.tostring(to_etree(item), encoding="utf-8") for item in items
+                ),
+                [],
+            )
+
+    fragments = []
+    failures = []
+    with shared_fragments():
+        for item in items:
+            try:
+                fragments.append(etree.tostring(to_etree(item), encoding="utf-8"))
+            except Exception as e:
+                failures.append(describe_failure(item, e))
+    return b"".join(fragments), failures
+
+
+def iter_shards(items, shard_size):
+    iterator = iter(items)
+    while True:
+        shard = list(islice(iterator, shard_size))
+        if not shard:
+            return
+        yield shard
+
+
+def _iter_serialized_shards(
+    items, jobs, shard_size, tolerant=False, prevalidate=False, pool=None
+):
+    shards = iter_shards(items, shard_size)
+    if pool is not None:
+        yield from _iter_submitted(
+            shards,
+            lambda shard: pool.submit_serialize(shard, tolerant, prevalidate),
+            pool.jobs,
+        )
+        return
+    if jobs <= 1:
+        for shard in shards:
+            yield _serialize_shard(shard, tolerant, prevalidate)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from _iter_submitted(
+            shards,
+            lambda shard: executor.submit(
+                _serialize_shard, shard, tolerant, prevalidate
+            ),
+            jobs,
+        )
+
+
+def _iter_submitted(shards, submit, jobs):
+    # Keep a bounded number of shards in flight so that the input is not
+    # consumed (and pickled) all at once. Results are yielded in input order.
+    pending = deque()
+    for shard in shards:
+        pending.append(submit(shard))
+        if len(pending) >= jobs * 2:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def write_feed(
+    file,
+    root_name,
+    items,
+    jobs=1,
+    shard_size=1000,
+    quarantine=None,
+    prevalidate=False,
+    pool=None,
+):
+    """
+    Write a feed file with a `root_name` root element containing the serialized
+    items. With `jobs` > 1 shards of `shard_size` items are serialized in
+    parallel worker processes. With a `worker_pool.WorkerPool` (or the
+    `RemotePool` of connect_pool()) as `pool`, the shards are serialized by its
+    warm workers instead and `jobs` is ignored. With a `quarantine.Quarantine`,
+    items which fail to serialize are reported to it and left out of the file.
+    With `prevalidate`, items are also checked with
+    `prevalidation.check_record`.
+    """
+    shards = _iter_serialized_shards(
+        items,
+        jobs,
+        shard_size,
+        tolerant=quarantine is not None,
+        prevalidate=prevalidate,
+        pool=pool,
+    )
+    with get_writer(file, root_name) as writer:
+        for fragment, failures in shards:
+            writer.write_fragment(fragment)
+            for failure in failures:
+                quarantine.add(*failure)
@@ -0,0 +1,186 @@
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+from os import path
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from lxml import etree
+
+from django_oikotie.enums import ApartmentAction
+from django_oikotie.models import REMOVAL_PRIORITY, UPDATE_PRIORITY, OutboxEntry
+from django_oikotie.oikotie import get_filename, send_items
+from django_oikotie.writers import get_writer
+from django_oikotie.xml_models.apartment import Apartment, ApartmentRemoval
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 60
+DEFAULT_BATCH_SIZE = 10000
+
+
+@dataclass
+class OutboxFlush:
+    filename: str
+    updates: int
+    removals: int
+    max_latency: timedelta
+    mean_latency: timedelta
+
+
+def get_window() -> timedelta:
+    return timedelta(seconds=getattr(settings, "OIKOTIE_OUTBOX_WINDOW", DEFAULT_WINDOW))
+
+
+def _enqueue(key: str, element: etree._Element, action: ApartmentAction, priority: int):
+    payload = etree.tostring(element, encoding="utf-8")
+    now = timezone.now()
+    defaults = {
+        "action": action.value,
+        "priority": priority,
+        "payload": payload,
+        "first_changed_at": now,
+        "changed_at": now,
+    }
+    with transaction.atomic():
+        entry, created = OutboxEntry.objects.get_or_create(key=key, defaults=defaults)
+        if created:
+            return
+        # Coalesce with the pending change, the first change time is kept so
+        # that a frequently changing apartment is not delayed forever.
+        updated = OutboxEntry.objects.filter(pk=entry.pk).update(
+            action=action.value,
+            priority=priority,
+            payload=payload,
+            version=F("version") + 1,
+            changed_at=now,
+        )
+        if not updated:
+            # The entry was locked by a flush, which pushed and deleted it
+            OutboxEntry.objects.create(key=key, **defaults)
+
+
+def enqueue_update(apartment: Apartment):
+    """
+    Queue an apartment to be pushed as an update. Should be called in the same
+    transaction as the change itself.
+    """
+    action = ApartmentAction.UPDATE
+    element = apartment.to_etree(overrides={"action": action})
+    _enqueue(apartment.key, element, action, UPDATE_PRIORITY)
+
+
+def enqueue_removal(key: str, vendor_identifier: Optional[str] = None):
+    """
+    Queue an apartment to be removed by its key. Removals are pushed on the next
+    flush without waiting for the coalescing window.
+    """
+    element = ApartmentRemoval(key, vendor_identifier).to_etree()
+    _enqueue(key, element, ApartmentAction.REMOVE, REMOVAL_PRIORITY)
+
+
+def register(model, to_apartment: Callable, dispatch_uid: Optional[str] = None):
+    """
+    Queue changes of `model` instances: saves as updates and deletes as removals.
+    `to_apartment` converts an instance to an Apartment, or returns None if the
+    instance should not be pushed.
+    """
+    dispatch_uid = dispatch_uid or f"oikotie_outbox_{model._meta.label_lower}"
+
+    def on_save(sender, instance, **kwargs):
+        apartment = to_apartment(instance)
+        if apartment is not None:
+            enqueue_update(apartment)
+
+    def on_delete(sender, instance, **kwargs):
+        apartment = to_apartment(instance)
+        if apartment is not None:
+            enqueue_removal(apartment.key, apartment.vendor_identifier)
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=dispatch_uid)
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=dispatch_uid)
+
+
+def unregister(model, dispatch_uid: Optional[str] = None):
+    dispatch_uid = dispatch_uid or f"oikotie_outbox_{model._meta.label_lower}"
+    post_save.disconnect(sender=model, dispatch_uid=dispatch_uid)
+    post_delete.disconnect(sender=model, dispatch_uid=dispatch_uid)
+
+
+def get_due_entries(now=None):
+    """
+    Return the entries to push: all removals, and updates whose first change is
+    older than the coalescing window.
+    """
+    now = now or timezone.now()
+    batch_size = getattr(settings, "OIKOTIE_OUTBOX_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    return OutboxEntry.objects.filter(
+        Q(priority=REMOVAL_PRIORITY) | Q(first_changed_at__lte=now - get_window())
+    ).order_by("priority", "first_changed_at")[:batch_size]
+
+
+def _push_entries(file_path, entries) -> str:
+    filename = get_filename("UPDATEAPT")
+    with get_writer(path.join(file_path, filename), "Apartments") as writer:
+        for _, _, payload, _, _ in entries:
+            writer.write_fragment(bytes(payload))
+
+    send_items(file_path, filename)
+
+    pks_by_version = {}
+    for pk, _, _, version, _ in entries:
+        pks_by_version.setdefault(version, []).append(pk)
+    OutboxEntry.objects.filter(
+        reduce(
+            or_,
+            (Q(pk__in=pks, version=version) for version, pks in pks_by_version.items()),
+        )
+    ).delete()
+    return filename
+
+
+def flush_outbox(file_path=".", now=None) -> Optional[OutboxFlush]:
+    """
+    Push the due entries as one UPDATEAPT file, removals first, and delete them
+    from the outbox. Entries changed again while the file was being pushed are
+    kept for the next flush. Returns None if nothing was due.
+
+    The entries are locked until they are deleted, and entries locked by a
+    concurrent flush are skipped, so an entry is pushed by one flush only.
+    Changes to locked entries wait for the flush to finish.
+    """
+    with transaction.atomic():
+        entries = list(
+            get_due_entries(now)
+            .select_for_update(skip_locked=True)
+            .values_list("pk", "priority", "payload", "version", "first_changed_at")
+        )
+        if not entries:
+            return None
+        filename = _push_entries(file_path, entries)
+    uploaded_at = timezone.now()
+
+    latencies = [uploaded_at - first_changed_at for *_, first_changed_at in entries]
+    removals = sum(1 for _, priority, *_ in entries if priority == REMOVAL_PRIORITY)
+    result = OutboxFlush(
+        filename=filename,
+        updates=len(entries) - removals,
+        removals=removals,
+        max_latency=max(latencies),
+        mean_latency=sum(latencies, timedelta()) / len(latencies),
+    )
+    _logger.info(
+        "Pushed %s with %d updates and %d removals, latency max %.1f s, mean %.1f s",
+        filename,
+        result.updates,
+        result.removals,
+        result.max_latency.total_seconds(),
+        result.mean_latency.total_seconds(),
+    )
+    return result
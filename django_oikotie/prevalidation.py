@@ -0,0 +1,185 @@
+from dataclasses import fields
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from .utils import is_required_field, unwrap_optional
+from .xml_models import XMLModel
+
+# Checks of a value of a field, yielding error messages
+Check = Callable[[Any], Iterator[str]]
+
+_validators: Dict[type, "_Validator"] = {}
+
+
+class RecordInvalid(ValueError):
+    """Raised by check_record() for a record that breaks its model's constraints."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+class _Validator:
+    """The field checks of an XMLModel class, compiled once per class."""
+
+    def __init__(self, model_class: type):
+        hints = get_type_hints(model_class)
+        self.fields = []
+        for f in fields(model_class):
+            required = is_required_field(f)
+            checks = _type_checks(hints.get(f.name))
+            constraints = f.metadata.get("constraints")
+            if constraints is not None:
+                checks += _constraint_checks(constraints)
+            self.fields.append((f.name, required, checks))
+
+    def iter_errors(self, item, prefix: str = "") -> Iterator[str]:
+        values = item.__dict__
+        for name, required, checks in self.fields:
+            value = values.get(name)
+            if value is None:
+                if required:
+                    yield f"{prefix}{name} is required"
+                continue
+            for check in checks:
+                for error in check(value):
+                    yield f"{prefix}{name}{error}"
+
+
+def _type_checks(hint) -> List[Check]:
+    hint = unwrap_optional(hint)
+    origin = get_origin(hint)
+
+    if origin is list:
+        (item_hint,) = get_args(hint) or (Any,)
+        item_checks = _type_checks(item_hint)
+
+        def check_list(value):
+            if not isinstance(value, list):
+                yield f" must be a list, not {type(value).__name__}"
+                return
+            for i, item in enumerate(value):
+                for check in item_checks:
+                    for error in check(item):
+                        yield f"[{i}]{error}"
+
+        return [check_list]
+
+    if origin is Literal:
+        choices = get_args(hint)
+
+        def check_choice(value):
+            if value not in choices:
+                yield f" must be one of {choices}, not {value!r}"
+
+        return [check_choice]
+
+    if isinstance(hint, type) and issubclass(hint, Enum):
+
+        def check_enum(value):
+            if not isinstance(value, hint):
+                yield f" must be a {hint.__name__}, not {value!r}"
+
+        return [check_enum]
+
+    if isinstance(hint, type) and issubclass(hint, XMLModel):
+
+        def check_model(value):
+            if not isinstance(value, XMLModel):
+                yield f" must be a {hint.__name__}, not {type(value).__name__}"
+                return
+            yield from get_validator(type(value)).iter_errors(value, ".")
+
+        return [check_model]
+
+    return []
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+
+def _constraint_checks(constraints) -> List[Check]:
+    checks = []
+    if constraints.date_format is not None:
+
+        def check_date(value):
+            if not isinstance(value, date):
+                yield f" must be a date, not {type(value).__name__}"
+
+        checks.append(check_date)
+    elif constraints.decimals is not None:
+
+        def check_number(value):
+            if not _is_number(value):
+                yield f" must be a number, not {type(value).__name__}"
+
+        checks.append(check_number)
+    elif constraints.yes_no:
+
+        def check_bool(value):
+            if not isinstance(value, bool):
+                yield f" must be a bool, not {type(value).__name__}"
+
+        checks.append(check_bool)
+    elif constraints.max_length is not None:
+        # Longer texts are cut to max_length when serialized, only values
+        # which can't be cut are invalid.
+        def check_text(value):
+            if not isinstance(value, str):
+                yield f" must be a str, not {type(value).__name__}"
+
+        checks.append(check_text)
+
+    min_value, max_value = constraints.min_value, constraints.max_value
+    if min_value is not None or max_value is not None:
+
+        def check_range(value):
+            if not _is_number(value):
+                return
+            if (min_value is not None and value < min_value) or (
+                max_value is not None and value > max_value
+            ):
+                yield f" must be between {min_value} and {max_value}, not {value}"
+
+        checks.append(check_range)
+    return checks
+
+
+def get_validator(model_class: type) -> _Validator:
+    validator = _validators.get(model_class)
+    if validator is None:
+        validator = _validators[model_class] = _Validator(model_class)
+    return validator
+
+
+def validate_record(item: XMLModel) -> List[str]:
+    """
+    Check the record against the constraints derived from its model class:
+    required fields, enum and Literal values, value types of the xml_field()
+    constraints and numeric ranges, recursively through the nested models.
+    Return the error messages, which are empty for a valid record.
+
+    Much cheaper than validating the file against the RelaxNG schema, and done
+    before the record is serialized, but only covers what the models declare.
+    """
+    return list(get_validator(type(item)).iter_errors(item))
+
+
+def check_record(item: XMLModel):
+    """Raise RecordInvalid if validate_record() finds errors in the record."""
+    errors = validate_record(item)
+    if errors:
+        raise RecordInvalid(errors)
@@ -0,0 +1,90 @@
+import json
+import logging
+import traceback
+from typing import Optional
+
+from lxml import etree
+
+from .prevalidation import check_record
+
+_logger = logging.getLogger(__name__)
+
+
+class Quarantine:
+    """
+    Report of records that failed to serialize, written as JSON lines with the
+    key, model name, error and traceback of each record. The report file is
+    only created when the first record is quarantined.
+
+    Example::
+
+        >>> with Quarantine("quarantine.jsonl") as quarantine:
+        >>>     create_apartments(apartments, quarantine=quarantine)
+        >>> quarantine.count
+        0
+    """
+
+    def __init__(self, report_path: str):
+        self.report_path = report_path
+        self.count = 0
+        self._file = None
+
+    def __enter__(self) -> "Quarantine":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def add(self, key: Optional[str], model: str, error: str, traceback_text: str):
+        if self._file is None:
+            self._file = open(self.report_path, "a", encoding="utf-8")
+        record = {
+            "key": key,
+            "model": model,
+            "error": error,
+            "traceback": traceback_text,
+        }
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+        _logger.warning(f"Quarantined {model} {key}: {error}")
+
+    def add_exception(self, item, exc: Exception):
+        self.add(*describe_failure(item, exc))
+
+
+def describe_failure(item, exc: Exception):
+    """(key, model, error, traceback) of a record which failed to serialize."""
+    key = getattr(item, "key", None)
+    return (
+        None if key is None else str(key),
+        type(item).__name__,
+        f"{type(exc).__name__}: {exc}",
+        "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+    )
+
+
+def to_etree_or_quarantine(
+    item, quarantine: Optional[Quarantine], prevalidate: bool = False, **kwargs
+) -> Optional[etree._Element]:
+    """
+    Serialize the item, after checking it with prevalidation.check_record() if
+    `prevalidate` is set. Without a quarantine errors are raised as usual,
+    otherwise the failure is reported and None is returned.
+    """
+    if quarantine is None:
+        if prevalidate:
+            check_record(item)
+        return item.to_etree(**kwargs)
+    try:
+        if prevalidate:
+            check_record(item)
+        return item.to_etree(**kwargs)
+    except Exception as e:
+        quarantine.add_exception(item, e)
+        return None
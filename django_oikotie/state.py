@@ -0,0 +1,142 @@
+import hashlib
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Tuple
+
+from lxml import etree
+
+from .diff import iter_feed_records
+from .enums import ApartmentAction
+
+BATCH_SIZE = 10000
+
+
+@dataclass
+class PushedRecord:
+    key: str
+    hash: str
+    pushed_at: datetime
+    filename: str
+
+
+def record_hash(element: etree._Element) -> str:
+    """
+    Content hash of a serialized record. The action attribute is not part of
+    the hash, so a record hashes the same in APT and UPDATEAPT files.
+    """
+    action = element.attrib.pop("action", None)
+    try:
+        data = etree.tostring(element, with_tail=False)
+    finally:
+        if action is not None:
+            element.set("action", action)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class PushStateStore:
+    """
+    SQLite database of the records pushed to Oikotie: the key, content hash,
+    time of the last push and the name of the file that pushed it. Keys are
+    iterated in sorted order, which is the order of Python string comparison.
+
+    Example::
+
+        >>> store = PushStateStore("oikotie-state.sqlite3")
+        >>> send_items(file_path, filename, state_store=store)
+        >>> for record in store.iter_records():
+        >>>     ...
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS pushed ("
+            "key TEXT PRIMARY KEY, hash TEXT NOT NULL, "
+            "pushed_at TEXT NOT NULL, filename TEXT NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+    def __enter__(self) -> "PushStateStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM pushed").fetchone()[0]
+
+    def upsert_many(
+        self,
+        records: Iterable[Tuple[str, str]],
+        filename: str,
+        pushed_at: Optional[datetime] = None,
+    ):
+        """Insert or update (key, hash) pairs pushed in `filename`."""
+        pushed_at = (pushed_at or datetime.now(timezone.utc)).isoformat()
+        sql = (
+            "INSERT INTO pushed (key, hash, pushed_at, filename) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET hash = excluded.hash, "
+            "pushed_at = excluded.pushed_at, filename = excluded.filename"
+        )
+        rows = ((key, hash, pushed_at, filename) for key, hash in records)
+        with self.connection:
+            while True:
+                batch = list(islice(rows, BATCH_SIZE))
+                if not batch:
+                    break
+                self.connection.executemany(sql, batch)
+
+    def delete_many(self, keys: Iterable[str]):
+        rows = ((key,) for key in keys)
+        with self.connection:
+            self.connection.executemany("DELETE FROM pushed WHERE key = ?", rows)
+
+    def get(self, key: str) -> Optional[PushedRecord]:
+        row = self.connection.execute(
+            "SELECT key, hash, pushed_at, filename FROM pushed WHERE key = ?", (key,)
+        ).fetchone()
+        return self._to_record(row) if row else None
+
+    def iter_hashes(self) -> Iterator[Tuple[str, str]]:
+        """Stream (key, hash) pairs sorted by key."""
+        yield from self.connection.execute("SELECT key, hash FROM pushed ORDER BY key")
+
+    def iter_records(self) -> Iterator[PushedRecord]:
+        cursor = self.connection.execute(
+            "SELECT key, hash, pushed_at, filename FROM pushed ORDER BY key"
+        )
+        for row in cursor:
+            yield self._to_record(row)
+
+    @staticmethod
+    def _to_record(row) -> PushedRecord:
+        key, hash, pushed_at, filename = row
+        return PushedRecord(key, hash, datetime.fromisoformat(pushed_at), filename)
+
+    def record_file(
+        self, xml_path: str, filename: str, pushed_at: Optional[datetime] = None
+    ):
+        """
+        Record the contents of a pushed feed file. Records with
+        action="remove" are deleted from the store.
+        """
+        removed = []
+
+        def iter_pushed():
+            for key, element in iter_feed_records(xml_path):
+                if element.get("action") == ApartmentAction.REMOVE.value:
+                    removed.append(key)
+                else:
+                    yield key, record_hash(element)
+
+        self.upsert_many(iter_pushed(), filename, pushed_at)
+        self.delete_many(removed)
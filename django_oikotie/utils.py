@@ -1,7 +1,18 @@
-import math
 import os
-from decimal import Decimal
-from typing import TYPE_CHECKING, Union
+import re
+import unicodedata
+from dataclasses import MISSING, Field
+from datetime import date, datetime
+from decimal import ROUND_DOWN, Context, Decimal
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    List,
+    Optional,
+    Union,
+    get_args,
+    get_origin,
+)
 
 from django.conf import settings
 from lxml import etree
@@ -34,7 +45,6 @@ def get_schemas() -> dict:  # TODO: add return type
     _logger.info(f"get schemas from {schema_dir}")
 
     for filename in filenames:
-
         schema: etree.RelaxNG = etree.RelaxNG(
             etree.parse(os.path.join(schema_dir, filename))
         )
@@ -81,14 +91,207 @@ def transform_name(name: str, case: Case) -> str:
         return name.title().replace("_", "")
 
 
+class BoundedMemo:
+    """
+    Dict backed memo for formatted values. The memo is emptied once it holds
+    `maxsize` entries, which keeps memory bounded while values repeating within
+    a batch are still formatted only once.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def set(self, key, value):
+        if len(self._data) >= self.maxsize:
+            self._data.clear()
+        self._data[key] = value
+
+    def clear(self):
+        self._data.clear()
+
+
+# Large enough to hold every distinct price/area/fee value of a typical feed.
+_decimal_memo = BoundedMemo(maxsize=65536)
+_decimal_context = Context(prec=1000)
+_quantize_exponents = {}
+
+
+def _to_decimal(value: Union[int, float, Decimal]) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        # repr() is the shortest string that round-trips, so 0.29 is 0.29 and
+        # not 0.28999999999999998002.
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def _truncate_decimal(value: Union[int, float, Decimal], n: int) -> Decimal:
+    exponent = _quantize_exponents.get(n)
+    if exponent is None:
+        exponent = _quantize_exponents[n] = Decimal(1).scaleb(-n)
+    truncated = _to_decimal(value).quantize(
+        exponent, rounding=ROUND_DOWN, context=_decimal_context
+    )
+    # Avoid "-0.00" for small negative values
+    return truncated if truncated else truncated.copy_abs()
+
+
+def _format_truncated(value: Decimal, pad: bool) -> str:
+    text = f"{value:f}"
+    if pad:
+        return text
+    # Drop trailing zeros like str(float) does, but keep at least one decimal
+    if "." not in text:
+        return text + ".0"
+    text = text.rstrip("0")
+    return text + "0" if text.endswith(".") else text
+
+
 def truncate_to_n_decimal_places(
     value: Union[float, Decimal], n: int
 ) -> float:  # noqa: E501
     """
     Truncate float or Decimal to n decimal places.
     """
-    return math.floor(value * 10**n) / 10**n
+    return float(_truncate_decimal(value, n))
+
+
+def format_decimal(value: Union[int, float, Decimal], n: int, pad: bool = False) -> str:
+    """
+    Truncate (round towards zero) a number to n decimal places and format it
+    as a string without going through float, so large Decimals keep their
+    precision. With `pad` the result always has exactly n decimals ("1.50"),
+    otherwise trailing zeros are dropped ("1.5").
+    """
+    key = (type(value), value, n, pad)
+    formatted = _decimal_memo.get(key)
+    if formatted is None:
+        formatted = _format_truncated(_truncate_decimal(value, n), pad)
+        _decimal_memo.set(key, formatted)
+    return formatted
+
+
+def format_decimals(
+    values: Iterable[Union[int, float, Decimal, None]], n: int, pad: bool = False
+) -> List[Optional[str]]:
+    """
+    Batch variant of `format_decimal` for formatting a whole column of values
+    in one pass. Every distinct value is truncated only once and the results
+    are stored in the shared memo, so the per-record formatters of the same
+    batch only look up the precomputed strings. None values are kept as None.
+    """
+    formatted = {}
+    result = []
+    for value in values:
+        if value is None:
+            result.append(None)
+            continue
+        key = (type(value), value, n, pad)
+        text = formatted.get(key)
+        if text is None:
+            text = formatted[key] = _format_truncated(_truncate_decimal(value, n), pad)
+            _decimal_memo.set(key, text)
+        result.append(text)
+    return result
+
+
+_date_memo = BoundedMemo(maxsize=8192)
+
+
+def format_date(value: Union[date, datetime], fmt: str) -> str:
+    """
+    strftime() with a memo shared by all model formatters. Dates repeat
+    heavily within a batch (availability, completion and showing dates of a
+    housing project) so most calls only need a dict lookup.
+    """
+    # tzinfo is part of the key because aware datetimes of different time
+    # zones compare equal when they denote the same instant.
+    key = (type(value), value, getattr(value, "tzinfo", None), fmt)
+    formatted = _date_memo.get(key)
+    if formatted is None:
+        formatted = value.strftime(fmt)
+        _date_memo.set(key, formatted)
+    return formatted
+
+
+# Characters allowed by the XML 1.0 Char production
+_xml_invalid_chars = re.compile(
+    "[^\u0009\u000A\u000D\u0020-\uD7FF\uE000-\uFFFD\U00010000-\U0010FFFF]"
+)
+_surrogates = re.compile("[\uD800-\uDFFF]")
+_surrogate_pairs = re.compile("[\uD800-\uDBFF][\uDC00-\uDFFF]")
+# Free-text values are long, so fewer of them are kept than dates or numbers.
+_text_memo = BoundedMemo(maxsize=1024)
+
+
+def _continues_cluster(text: str, index: int) -> bool:
+    """
+    Whether the character at `index` belongs to the same user-perceived
+    character as the one before it (combining marks, variation selectors
+    and zero width joiner sequences).
+    """
+    char = text[index]
+    if unicodedata.category(char) in ("Mn", "Mc", "Me") or char == "\u200d":
+        return True
+    return text[index - 1] == "\u200d"
+
+
+def _join_surrogate_pair(match: re.Match) -> str:
+    high, low = match.group()
+    return chr(0x10000 + ((ord(high) - 0xD800) << 10) + (ord(low) - 0xDC00))
+
+
+def _sanitize_text(value: str, max_length: Optional[int]) -> str:
+    if _surrogates.search(value):
+        # Join surrogate pairs into real code points; lone surrogates are left
+        # behind and removed with the rest of the invalid characters below.
+        value = _surrogate_pairs.sub(_join_surrogate_pair, value)
+    value = _xml_invalid_chars.sub("", value)
+
+    if max_length is not None and len(value) > max_length:
+        cut = max_length
+        while cut > 0 and _continues_cluster(value, cut):
+            cut -= 1
+        value = value[:cut]
+    return value
+
+
+def truncate_text(value: str, max_length: Optional[int] = None) -> str:
+    """
+    Strip characters XML 1.0 does not allow and truncate the text to at most
+    `max_length` characters without splitting a base character from its
+    combining marks. Results are memoized per value, so descriptions repeated
+    across the apartments of a project are processed once.
+    """
+    key = (value, max_length)
+    text = _text_memo.get(key)
+    if text is None:
+        text = _sanitize_text(value, max_length)
+        _text_memo.set(key, text)
+    return text
 
 
 def yes_no_bool(value: bool) -> str:
     return "K" if value else "E"
+
+
+def unwrap_optional(hint):
+    """The type of an Optional[...] type hint, other hints as they are."""
+    if get_origin(hint) is Union:
+        args = [arg for arg in get_args(hint) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return hint
+
+
+def is_required_field(f: Field) -> bool:
+    """Whether a dataclass field has neither a default nor a default factory."""
+    return f.default is MISSING and f.default_factory is MISSING
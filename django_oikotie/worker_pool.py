@@ -0,0 +1,294 @@
+"""
+Long-lived pool of warm serialization and validation worker processes.
+
+Each worker imports the model modules, compiles the serializers and writers of
+the models and the RelaxNG schemas of get_schemas() once when it starts, so the
+jobs sent to the pool don't pay for them. The pool is started on demand in the
+current process with get_pool(), or as a service shared by the processes of a
+host with `manage.py oikotie_worker_pool` and used through connect_pool().
+Both kinds of pools can be given to oikotie.write_feed() as `pool`.
+
+Settings:
+
+- OIKOTIE_WORKER_POOL_ADDRESS: (host, port) or Unix socket path the service
+  listens on, by default ("127.0.0.1", 50100)
+- OIKOTIE_WORKER_POOL_AUTHKEY: key authenticating the clients of the service,
+  by default a key derived from SECRET_KEY with salted_hmac(). Required when
+  the service listens on a non-loopback address.
+"""
+import atexit
+import ipaddress
+import logging
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing.managers import BaseManager
+from typing import List, Optional, Sequence, Tuple, Union
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.crypto import salted_hmac
+from lxml import etree
+
+from .oikotie import _serialize_shard
+from .utils import get_schemas
+from .xml_models import XMLModel
+from .xml_models.compiler import get_serializer_source
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_ADDRESS = ("127.0.0.1", 50100)
+
+Address = Union[Tuple[str, int], str]
+
+# RelaxNG schemas by filename, loaded once per worker
+_schemas: Optional[dict] = None
+
+_pool: Optional["WorkerPool"] = None
+
+
+def _iter_model_classes(cls=XMLModel):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _iter_model_classes(subclass)
+
+
+def _warm_up():
+    """Initializer of the worker processes."""
+    global _schemas
+
+    from django.apps import apps
+
+    if not apps.ready:
+        import django
+
+        django.setup()
+
+    # Import the models so that their classes are compiled too
+    from .xml_models import apartment, housing_company  # noqa: F401
+
+    for model_class in _iter_model_classes():
+        # Skip the base classes of the models
+        if not hasattr(getattr(model_class, "Meta", None), "element_name"):
+            continue
+        try:
+            get_serializer_source(model_class)
+        except Exception:
+            # Left to fail in the jobs serializing the model
+            _logger.exception(f"Could not compile {model_class.__name__}")
+    if getattr(settings, "OIKOTIE_SCHEMA_DIR", None):
+        _schemas = get_schemas()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _validate(schema_filename: str, data: bytes) -> Tuple[bool, str]:
+    global _schemas
+
+    if _schemas is None:
+        _schemas = get_schemas()
+    schema = _schemas[schema_filename]
+    valid = schema.validate(etree.fromstring(data))
+    return valid, str(schema.error_log)
+
+
+class WorkerPool:
+    """
+    Pool of `jobs` warm worker processes, by default one per CPU.
+
+    Example::
+
+        >>> with WorkerPool(jobs=4) as pool:
+        >>>     fragment, failures = pool.serialize(apartments)
+        >>>     valid, errors = pool.validate(schema_filename, feed_bytes)
+    """
+
+    def __init__(self, jobs: Optional[int] = None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self._executor = None
+
+    def start(self) -> "WorkerPool":
+        """Start the workers and wait until they are warm."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.jobs, initializer=_warm_up
+            )
+            wait([self._executor.submit(_ping) for _ in range(self.jobs)])
+            _logger.info(f"Started a worker pool of {self.jobs} workers")
+        return self
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "WorkerPool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit_serialize(
+        self,
+        items: Sequence[XMLModel],
+        tolerant: bool = False,
+        prevalidate: bool = False,
+    ) -> Future:
+        """
+        Serialize the items in a worker. The future gives the concatenated XML
+        fragments of the items and, when `tolerant`, the descriptions of the
+        items which failed to serialize.
+        """
+        self.start()
+        return self._executor.submit(_serialize_shard, items, tolerant, prevalidate)
+
+    def submit_validate(self, schema_filename: str, data: bytes) -> Future:
+        """
+        Validate a feed document against a schema of get_schemas() in a worker.
+        The future gives whether it is valid and the schema error log.
+        """
+        self.start()
+        return self._executor.submit(_validate, schema_filename, data)
+
+    def serialize(
+        self,
+        items: Sequence[XMLModel],
+        tolerant: bool = False,
+        prevalidate: bool = False,
+    ) -> Tuple[bytes, List[tuple]]:
+        return self.submit_serialize(items, tolerant, prevalidate).result()
+
+    def validate(self, schema_filename: str, data: bytes) -> Tuple[bool, str]:
+        return self.submit_validate(schema_filename, data).result()
+
+    def get_jobs(self) -> int:
+        return self.jobs
+
+
+def get_pool(jobs: Optional[int] = None) -> WorkerPool:
+    """
+    Pool of the current process, started on the first call and closed when
+    the process exits. `jobs` only applies to the first call.
+    """
+    global _pool
+
+    if _pool is None:
+        _pool = WorkerPool(jobs).start()
+        atexit.register(_pool.close)
+    return _pool
+
+
+def _get_address() -> Address:
+    address = getattr(settings, "OIKOTIE_WORKER_POOL_ADDRESS", DEFAULT_ADDRESS)
+    return address if isinstance(address, str) else tuple(address)
+
+
+def _get_authkey() -> bytes:
+    authkey = getattr(settings, "OIKOTIE_WORKER_POOL_AUTHKEY", None)
+    if authkey is None:
+        # Don't hand SECRET_KEY itself to the pickle-RPC channel
+        return salted_hmac(__name__, "authkey").digest()
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+
+def _is_loopback(address: Address) -> bool:
+    if isinstance(address, str):
+        # Unix socket path
+        return True
+    host = address[0]
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _PoolManager(BaseManager):
+    pass
+
+
+_PoolManager.register("get_pool")
+
+
+def make_server(
+    pool: WorkerPool,
+    address: Optional[Address] = None,
+    authkey: Optional[bytes] = None,
+):
+    """
+    Return a server sharing the pool with the clients of connect_pool(). The
+    clients are served in threads of the current process by serve_forever().
+
+    Raises ImproperlyConfigured if the address isn't a loopback one and no
+    authkey is given, either as an argument or OIKOTIE_WORKER_POOL_AUTHKEY.
+    """
+    address = address or _get_address()
+    if (
+        not authkey
+        and getattr(settings, "OIKOTIE_WORKER_POOL_AUTHKEY", None) is None
+        and not _is_loopback(address)
+    ):
+        raise ImproperlyConfigured(
+            f"OIKOTIE_WORKER_POOL_AUTHKEY must be set to serve the worker pool "
+            f"on {address}"
+        )
+
+    class PoolServerManager(BaseManager):
+        pass
+
+    PoolServerManager.register(
+        "get_pool",
+        callable=lambda: pool,
+        exposed=("serialize", "validate", "get_jobs"),
+    )
+    manager = PoolServerManager(address=address, authkey=authkey or _get_authkey())
+    return manager.get_server()
+
+
+class RemotePool:
+    """
+    Client of the pool of a make_server() server, with the interface of
+    WorkerPool. Jobs are submitted from threads, one connection each, so up
+    to two jobs per worker are queued on the server.
+    """
+
+    def __init__(self, address: Optional[Address] = None, authkey=None):
+        manager = _PoolManager(
+            address=address or _get_address(), authkey=authkey or _get_authkey()
+        )
+        manager.connect()
+        self._pool = manager.get_pool()
+        self.jobs = self._pool.get_jobs()
+        self._threads = ThreadPoolExecutor(max_workers=self.jobs * 2)
+
+    def close(self):
+        self._threads.shutdown()
+
+    def __enter__(self) -> "RemotePool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit_serialize(self, items, tolerant=False, prevalidate=False) -> Future:
+        items = list(items)
+        return self._threads.submit(self._pool.serialize, items, tolerant, prevalidate)
+
+    def submit_validate(self, schema_filename: str, data: bytes) -> Future:
+        return self._threads.submit(self._pool.validate, schema_filename, data)
+
+    def serialize(self, items, tolerant=False, prevalidate=False):
+        return self._pool.serialize(list(items), tolerant, prevalidate)
+
+    def validate(self, schema_filename: str, data: bytes) -> Tuple[bool, str]:
+        return self._pool.validate(schema_filename, data)
+
+
+def connect_pool(address: Optional[Address] = None, authkey=None) -> RemotePool:
+    """
+    Connect to the pool served by `manage.py oikotie_worker_pool`. Raises
+    ConnectionError if the service isn't running.
+    """
+    return RemotePool(address, authkey)
@@ -0,0 +1,137 @@
+import os
+from typing import Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from lxml import etree
+
+XML_DECLARATION = b"<?xml version='1.0' encoding='utf-8'?>\n"
+
+DEFAULT_WRITER = "django_oikotie.writers.IncrementalWriter"
+
+
+class FeedWriter:
+    """
+    Writes a feed file: the XML declaration, a `root_name` root element and the
+    records appended with write() or, already serialized, write_fragment().
+    Elements are serialized one at a time by libxml2, so the whole document is
+    never held in memory. The closing tag is only written if the block exits
+    without an exception.
+
+    With `offset` an interrupted file is resumed: it is truncated to the
+    offset, e.g. one returned by sync(), and the records are appended after
+    it without writing the declaration and the root start tag again.
+
+    All writers produce byte-identical files. Compared to the stdlib
+    ElementTree.write() the builders used before, empty elements are written
+    without a space before the slash, e.g. `<Estate type="E"/>`. Set
+    OIKOTIE_FEED_WRITER to the dotted path of a subclass to use a different
+    writer.
+
+    Example::
+
+        >>> with get_writer(file, "Apartments") as writer:
+        >>>     for apartment in apartments:
+        >>>         writer.write(apartment.to_etree())
+    """
+
+    def __init__(self, file: str, root_name: str, offset: Optional[int] = None):
+        self.file = file
+        self.root_name = root_name
+        self.offset = offset
+        self._f = None
+
+    def __enter__(self) -> "FeedWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(exc_type, exc, tb)
+
+    def open(self):
+        if self.offset is None:
+            self._f = open(self.file, "wb")
+            self._f.write(XML_DECLARATION + f"<{self.root_name}>".encode())
+        else:
+            self._f = open(self.file, "r+b")
+            self._f.truncate(self.offset)
+            self._f.seek(self.offset)
+
+    def write(self, element: etree._Element):
+        self._f.write(etree.tostring(element, encoding="utf-8"))
+
+    def write_fragment(self, data: bytes):
+        self._f.write(data)
+
+    def sync(self) -> int:
+        """
+        Flush the records written so far to disk and return the file offset
+        after them.
+        """
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        return self._f.tell()
+
+    def close(self, exc_type=None, exc=None, tb=None):
+        try:
+            if exc_type is None:
+                self._f.write(f"</{self.root_name}>".encode())
+        finally:
+            self._f.close()
+
+
+class IncrementalWriter(FeedWriter):
+    """
+    FeedWriter using lxml's incremental xmlfile serializer, which writes the
+    elements straight into libxml2's output buffer. xmlfile can't continue a
+    document, so a resumed file is written like with FeedWriter.
+    """
+
+    def open(self):
+        if self.offset is not None:
+            self._xf = None
+            super().open()
+            return
+        self._f = open(self.file, "wb")
+        self._xmlfile = etree.xmlfile(self._f, encoding="utf-8")
+        self._xf = self._xmlfile.__enter__()
+        self._xf.write_declaration()
+        self._root = self._xf.element(self.root_name)
+        self._root.__enter__()
+
+    def write(self, element: etree._Element):
+        if self._xf is None:
+            super().write(element)
+        else:
+            self._xf.write(element)
+
+    def write_fragment(self, data: bytes):
+        if self._xf is not None:
+            self._xf.flush()
+        self._f.write(data)
+
+    def sync(self) -> int:
+        if self._xf is not None:
+            self._xf.flush()
+        return super().sync()
+
+    def close(self, exc_type=None, exc=None, tb=None):
+        if self._xf is None:
+            super().close(exc_type, exc, tb)
+            return
+        try:
+            if exc_type is None:
+                self._root.__exit__(None, None, None)
+                self._xmlfile.__exit__(None, None, None)
+            else:
+                # Exiting the contexts would write the closing tag
+                self._xf.flush()
+        finally:
+            self._f.close()
+
+
+def get_writer(file: str, root_name: str, offset: Optional[int] = None) -> FeedWriter:
+    writer_class = import_string(
+        getattr(settings, "OIKOTIE_FEED_WRITER", DEFAULT_WRITER)
+    )
+    return writer_class(file, root_name, offset)
@@ -1,10 +1,140 @@
+import copy
 import types
-from enum import Enum
-from typing import Union
+from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, fields
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from lxml import etree
 
-from ..utils import transform_name, yes_no_bool
+from ..formatters import format_value, register_formatter
+from ..utils import (
+    BoundedMemo,
+    format_date,
+    format_decimal,
+    transform_name,
+    truncate_text,
+    yes_no_bool,
+)
+
+# Serialized nested models of the current batch, see shared_fragments()
+_fragments: "ContextVar[Optional[BoundedMemo]]" = ContextVar("fragments", default=None)
+
+# Field names of the model classes, in field order, see get_intern_key()
+_field_names: Dict[type, Tuple[str, ...]] = {}
+
+# Element name, attributes and text of a TextElementModel
+ElementParts = Tuple[str, Dict[str, str], Optional[str]]
+
+
+@contextmanager
+def shared_fragments(maxsize: int = 4096):
+    """
+    Within the block, nested models that are equal to an already serialized
+    one (the same City, Estate or fee shared by the apartments of a housing
+    project) are not serialized again; a copy of the previously rendered
+    element is used instead.
+
+    Example::
+
+        >>> with shared_fragments():
+        >>>     elements = [apartment.to_etree() for apartment in apartments]
+    """
+    token = _fragments.set(BoundedMemo(maxsize))
+    try:
+        yield
+    finally:
+        _fragments.reset(token)
+
+
+@dataclass(frozen=True)
+class FieldConstraints:
+    """
+    Formatting constraints of a model field, see xml_field().
+    """
+
+    max_length: Optional[int] = None
+    sanitize: bool = False
+    decimals: Optional[int] = None
+    pad: bool = False
+    date_format: Optional[str] = None
+    yes_no: bool = False
+    min_value: Optional[Union[int, float]] = None
+    max_value: Optional[Union[int, float]] = None
+
+    def compile(self) -> Callable[[Any], Any]:
+        """Return a function formatting a value of the field."""
+        max_length = self.max_length
+        if self.date_format is not None:
+            date_format = self.date_format
+            return lambda value: format_date(value, date_format)
+        if self.decimals is not None:
+            decimals, pad = self.decimals, self.pad
+            return lambda value: format_decimal(value, decimals, pad)
+        if self.yes_no:
+            return yes_no_bool
+        if self.sanitize:
+            return lambda value: truncate_text(value, max_length)
+        if max_length is not None:
+            return lambda value: value[:max_length]
+        return format_value
+
+
+def xml_field(
+    *,
+    max_length: Optional[int] = None,
+    sanitize: bool = False,
+    decimals: Optional[int] = None,
+    pad: bool = False,
+    date_format: Optional[str] = None,
+    yes_no: bool = False,
+    min_value: Optional[Union[int, float]] = None,
+    max_value: Optional[Union[int, float]] = None,
+    **kwargs,
+):
+    """
+    dataclasses.field() declaring how the value of the field is formatted,
+    instead of a format_<key> method:
+
+    - `max_length`: the text is cut to `max_length` characters
+    - `sanitize`: characters XML doesn't allow are removed and the text is cut
+      without splitting characters, see utils.truncate_text()
+    - `decimals`: the number is truncated to `decimals` decimal places and,
+      with `pad`, always has that many decimals
+    - `date_format`: the date is formatted with strftime()
+    - `yes_no`: the boolean is formatted as K/E
+    - `min_value`, `max_value`: the allowed range of the number, checked by the
+      pre-validator (see prevalidation.validate_record())
+
+    Example::
+
+        >>> @dataclass
+        >>> class Address(XMLModel):
+        >>>     street: str = xml_field(max_length=100)
+        >>>     area: Optional[Decimal] = xml_field(decimals=2, default=None)
+    """
+    constraints = FieldConstraints(
+        max_length=max_length,
+        sanitize=sanitize,
+        decimals=decimals,
+        pad=pad,
+        date_format=date_format,
+        yes_no=yes_no,
+        min_value=min_value,
+        max_value=max_value,
+    )
+    metadata = {**kwargs.pop("metadata", {}), "constraints": constraints}
+    return field(metadata=metadata, **kwargs)
 
 
 class XMLModel:
@@ -56,25 +186,87 @@ class XMLModel:
             err = f"{self.__class__.__name__}.Meta.case is not defined"
             raise ValueError(err)
 
+    @classmethod
+    def _get_formatters(cls) -> Tuple[Dict[str, Callable], Dict[str, Callable]]:
+        """
+        The format_<key> methods and the value formatters compiled from the
+        field constraints of the class, by field name. Built once per class.
+        """
+        formatters = cls.__dict__.get("_formatters")
+        if formatters is None:
+            methods = {}
+            constraints = {}
+            for name, f in getattr(cls, "__dataclass_fields__", {}).items():
+                method = getattr(cls, f"format_{name}", None)
+                if method and callable(method):
+                    methods[name] = method
+                if "constraints" in f.metadata:
+                    constraints[name] = f.metadata["constraints"].compile()
+            formatters = cls._formatters = (methods, constraints)
+        return formatters
+
     def get_formatted_value(
         self, key: str
     ) -> Union[str, list, "XMLModel", etree._Element]:
-        format_function = getattr(self, f"format_{key}", None)
-        if format_function and callable(format_function):
+        methods, constraints = self._get_formatters()
+        if key in methods:
             # Class has format_<key> method which is expected to return
             # correctly formatted value. Return that value as is.
-            return format_function()
+            return methods[key](self)
+
+        return constraints.get(key, format_value)(getattr(self, key))
+
+    def get_intern_key(self) -> Optional[Hashable]:
+        """
+        Key identifying models which serialize to identical XML, or None if
+        the model can't be interned (e.g. it has list values).
+        """
+        names = _field_names.get(type(self))
+        if names is None:
+            names = _field_names[type(self)] = tuple(f.name for f in fields(self))
 
-        value = getattr(self, key)
+        values = []
+        for name in names:
+            value = getattr(self, name)
+            if isinstance(value, XMLModel):
+                value = value.get_intern_key()
+                if value is None:
+                    return None
+            elif isinstance(value, list):
+                return None
+            # The type is part of the key as e.g. True == 1 and 1 == 1.0, and
+            # tzinfo as aware datetimes of different time zones compare equal
+            # when they denote the same instant.
+            tzinfo = getattr(value, "tzinfo", None)
+            values.append((name, type(value), value, tzinfo))
+
+        key = (type(self), tuple(values))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def to_shared_etree(self) -> etree._Element:
+        """
+        to_etree() that reuses the element of an equal model serialized
+        earlier within a shared_fragments() block.
+        """
+        fragments = _fragments.get()
+        if fragments is None:
+            return self.to_etree()
+
+        key = self.get_intern_key()
+        if key is None:
+            return self.to_etree()
 
-        if isinstance(value, (list, XMLModel)):
-            return value
-        if isinstance(value, bool):
-            return yes_no_bool(value)
-        if isinstance(value, Enum):
-            return str(value.value)
-        else:
-            return str(value)
+        element = fragments.get(key)
+        if element is None:
+            element = self.to_etree()
+            fragments.set(key, element)
+        # An lxml element can only have one parent; copying is a fast deep
+        # copy done by libxml2.
+        return copy.copy(element)
 
     def get_element_name(self, key: str) -> str:
         if key in getattr(self.Meta, "element_name_overrides", {}):
@@ -85,46 +277,135 @@ class XMLModel:
 
         return transform_name(key, case)
 
-    def to_etree(self) -> etree._Element:
+    def to_etree(self, overrides: Optional[Mapping[str, Any]] = None) -> etree._Element:
+        """
+        Serialize the model. Values in `overrides` are used instead of the
+        model's own values for the given fields, without modifying the model,
+        and are formatted as if the class had no format_<key> method.
+
+        Without overrides the model is serialized by a function generated for
+        its class on first use, see xml_models.compiler.
+
+        Example::
+
+            >>> apartment.to_etree(overrides={"action": ApartmentAction.REMOVE})
+        """
+        if not overrides:
+            serializer = type(self).__dict__.get("_serializer")
+            if serializer is None:
+                from .compiler import compile_serializer
+
+                serializer = compile_serializer(type(self))
+            if serializer:
+                return serializer(self)
+        return self.to_etree_generic(overrides)
+
+    def to_etree_generic(
+        self, overrides: Optional[Mapping[str, Any]] = None
+    ) -> etree._Element:
+        """to_etree() going through the fields of the model one by one."""
         root = etree.Element(self.Meta.element_name)
 
-        for key, value in self.__dict__.items():
+        items = self.__dict__
+        if overrides:
+            unknown = overrides.keys() - items.keys()
+            if unknown:
+                err = f"{self.__class__.__name__} has no fields {sorted(unknown)}"
+                raise ValueError(err)
+            items = {**items, **overrides}
+
+        constraints = self._get_formatters()[1]
+        attributes = getattr(self.Meta, "attributes", [])
+        for key, value in items.items():
             if value is None:
                 continue
 
             # Format key and value before anything is added to the root element.
-            value = self.get_formatted_value(key)
-            element_name = self.get_element_name(key)
-
-            if etree.iselement(value):
-                # The value is an lxml element. Append it to the root element as is.
-                root.append(value)
-            elif isinstance(value, types.GeneratorType):
-                # The value is a generator object that is a result of yielding
-                # XMLModel.to_etree() in format_<key> function. Yielded lxml Elements
-                # are added directly to root element instead of nesting them within
-                # separate child element
-                for child_element in value:
-                    root.append(child_element)
-            elif isinstance(value, XMLModel):
-                # The value is an XMLModel object. Serialize it to a lxml element and
-                # append it to the root element.
-                element = value.to_etree()
-                root.append(element)
-            elif isinstance(value, list):
-                # The value is a list of XMLModel objects. Serialize them to lxml
-                # elements and append them to the root element.
-                element = etree.Element(element_name)
-                for child in value:
-                    element.append(child.to_etree())
-                root.append(element)
-            elif key in getattr(self.Meta, "attributes", []):
-                # The value is an attribute. Set the key-value pair as an attribute
-                # to the root element instead of it being a regular child element.
-                root.attrib[element_name] = value
+            if overrides and key in overrides:
+                value = constraints.get(key, format_value)(value)
             else:
-                # Key-value pair is handled as a regular child element
-                element = etree.Element(element_name)
-                element.text = value
-                root.append(element)
+                value = self.get_formatted_value(key)
+            append_value(root, self.get_element_name(key), key in attributes, value)
         return root
+
+
+def append_value(
+    root: etree._Element, element_name: str, is_attribute: bool, value
+) -> None:
+    """Add a formatted value of a field to the element of its model."""
+    if etree.iselement(value):
+        # The value is an lxml element. Append it to the root element as is.
+        root.append(value)
+    elif isinstance(value, types.GeneratorType):
+        # The value is a generator object that is a result of yielding
+        # XMLModels or their to_etree() in format_<key> function. Yielded
+        # elements are added directly to root element instead of nesting them
+        # within separate child element
+        for child in value:
+            root.append(child.to_etree() if isinstance(child, XMLModel) else child)
+    elif isinstance(value, XMLModel):
+        # The value is an XMLModel object. Serialize it to a lxml element and
+        # append it to the root element.
+        element = value.to_shared_etree()
+        root.append(element)
+    elif isinstance(value, list):
+        # The value is a list of XMLModel objects. Serialize them to lxml
+        # elements and append them to the root element.
+        element = etree.Element(element_name)
+        for child in value:
+            element.append(child.to_etree())
+        root.append(element)
+    elif is_attribute:
+        # The value is an attribute. Set the key-value pair as an attribute
+        # to the root element instead of it being a regular child element.
+        root.attrib[element_name] = value
+    else:
+        # Key-value pair is handled as a regular child element
+        element = etree.Element(element_name)
+        element.text = value
+        root.append(element)
+
+
+class TextElementModel(XMLModel, metaclass=ABCMeta):
+    """
+    Model serialized to a single element with attributes and text, such as
+    `<LivingArea unit="m2">54.5</LivingArea>`. Subclasses return the parts of
+    the element from get_parts(), which to_etree() builds the element of.
+
+    Example::
+
+        >>> @dataclass
+        >>> class Area(TextElementModel):
+        >>>     unit: str
+        >>>     area: float = xml_field(decimals=2)
+        >>>
+        >>>     class Meta:
+        >>>         element_name = "Area"
+        >>>         case = Case.PASCAL
+        >>>
+        >>>     def get_parts(self):
+        >>>         return "Area", {"unit": self.unit}, self.get_formatted_value("area")
+    """
+
+    @abstractmethod
+    def get_parts(self) -> ElementParts:
+        """The element name, attributes and text (or None) of the element."""
+
+    def to_etree(self, overrides: Optional[Mapping[str, Any]] = None) -> etree._Element:
+        if overrides:
+            unknown = overrides.keys() - self.__dict__.keys()
+            if unknown:
+                err = f"{self.__class__.__name__} has no fields {sorted(unknown)}"
+                raise ValueError(err)
+            model = copy.copy(self)
+            model.__dict__.update(overrides)
+            return model.to_etree()
+
+        element_name, attributes, text = self.get_parts()
+        element = etree.Element(element_name, attributes)
+        element.text = text
+        return element
+
+
+# Nested models are serialized by to_etree()
+register_formatter(XMLModel, lambda value: value)
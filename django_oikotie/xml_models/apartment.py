@@ -3,8 +3,6 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import Generator, List, Literal, Optional
 
-from lxml import etree
-
 from ..enums import (
     ApartmentAction,
     ApartmentType,
@@ -21,28 +19,27 @@ from ..enums import (
     ShoreType,
     SiteType,
 )
-from ..utils import truncate_to_n_decimal_places, yes_no_bool
-from . import XMLModel
+from ..utils import format_date, yes_no_bool
+from . import ElementParts, TextElementModel, XMLModel, xml_field
 
 # Fees & Costs
 # ================================
 
 
 @dataclass
-class _Cost(XMLModel):
-    value: Decimal
+class _Cost(TextElementModel):
+    value: Decimal = xml_field(decimals=2)
     unit: str
 
     class Meta:
         case = Case.PASCAL
 
-    def format_value(self) -> str:
-        return str(truncate_to_n_decimal_places(self.value, n=2))
-
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, unit=self.unit)
-        element.text = self.format_value()
-        return element
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"unit": self.unit},
+            self.get_formatted_value("value"),
+        )
 
 
 @dataclass
@@ -140,20 +137,19 @@ class WaterFee(_Cost):
 
 
 @dataclass
-class _Price(XMLModel):
-    value: Decimal
+class _Price(TextElementModel):
+    value: Decimal = xml_field(decimals=2)
     currency: str
 
     class Meta:
         case = Case.PASCAL
 
-    def format_value(self) -> str:
-        return str(truncate_to_n_decimal_places(self.value, n=2))
-
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, currency=self.currency)
-        element.text = self.format_value()
-        return element
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"currency": self.currency},
+            self.get_formatted_value("value"),
+        )
 
 
 @dataclass
@@ -185,7 +181,7 @@ class UnencumberedSalesPrice(_Price):
 
 
 @dataclass
-class Attachments(XMLModel):
+class Attachments(TextElementModel):
     url: str
     link_text: str
 
@@ -193,14 +189,12 @@ class Attachments(XMLModel):
         element_name = "Attachments"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, url=self.url)
-        element.text = self.link_text
-        return element
+    def get_parts(self) -> ElementParts:
+        return self.Meta.element_name, {"url": self.url}, self.link_text
 
 
 @dataclass
-class Balcony(XMLModel):
+class Balcony(TextElementModel):
     value: bool
     description: Optional[str] = None
 
@@ -208,10 +202,12 @@ class Balcony(XMLModel):
         element_name = "Balcony"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, value=yes_no_bool(self.value))
-        element.text = self.format_description()
-        return element
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"value": yes_no_bool(self.value)},
+            self.format_description(),
+        )
 
     def format_description(self) -> Optional[str]:
         if self.description:
@@ -219,27 +215,26 @@ class Balcony(XMLModel):
 
 
 @dataclass
-class BuildingRightsAmount(XMLModel):
+class BuildingRightsAmount(TextElementModel):
     type: BuildingRightAmountType
-    amount: float
+    amount: float = xml_field(decimals=2)
 
     class Meta:
         element_name = "BuildingRightsAmount"
         case = Case.PASCAL
 
-    def format_amount(self) -> str:
-        return str(truncate_to_n_decimal_places(self.amount, n=2))
-
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, type=self.type.value)
-        element.text = self.format_amount()
-        return element
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"type": self.type.value},
+            self.get_formatted_value("amount"),
+        )
 
 
 @dataclass
 class CampaignLink(XMLModel):
-    target_url: str
-    picture_url: str
+    target_url: str = xml_field(max_length=500)
+    picture_url: str = xml_field(max_length=500)
 
     class Meta:
         element_name = "CampaignLink"
@@ -250,47 +245,39 @@ class CampaignLink(XMLModel):
         }
         attributes = ["target_url", "picture_url"]
 
-    def format_target_url(self) -> str:
-        return self.target_url[:500]
-
-    def format_picture_url(self) -> str:
-        return self.picture_url[:500]
-
 
 @dataclass
-class City(XMLModel):
+class City(TextElementModel):
     id: int
-    value: str
+    value: str = xml_field(max_length=50)
 
     class Meta:
         element_name = "City"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, id=str(self.id))
-        element.text = self.format_value()
-        return element
-
-    def format_value(self) -> str:
-        return self.value[:50]
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"id": str(self.id)},
+            self.get_formatted_value("value"),
+        )
 
 
 @dataclass
-class CityPlanPicture(XMLModel):
+class CityPlanPicture(TextElementModel):
     index: int
-    url: str
+    url: str = xml_field(max_length=300)
 
     class Meta:
         element_name = "CityPlanPicture"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(f"{self.Meta.element_name}{self.index}")
-        element.text = self.format_url()
-        return element
-
-    def format_url(self) -> str:
-        return self.url[:300]
+    def get_parts(self) -> ElementParts:
+        return (
+            f"{self.Meta.element_name}{self.index}",
+            {},
+            self.get_formatted_value("url"),
+        )
 
 
 @dataclass
@@ -305,9 +292,6 @@ class DebtPayable(XMLModel):
         }
         attributes = ["value"]
 
-    def format_value(self) -> str:
-        return yes_no_bool(self.value)
-
 
 @dataclass
 class Estate(XMLModel):
@@ -336,21 +320,20 @@ class EstateAgentRating(XMLModel):
 
 
 @dataclass
-class EstateAgentSocialMedia(XMLModel):
+class EstateAgentSocialMedia(TextElementModel):
     url: str
-    description: str
+    description: str = xml_field(max_length=200)
 
     class Meta:
         element_name = "EstateAgentSocialMedia"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, url=self.url)
-        element.text = self.format_description()
-        return element
-
-    def format_description(self) -> str:
-        return self.description[:200]
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"url": self.url},
+            self.get_formatted_value("description"),
+        )
 
 
 @dataclass
@@ -382,108 +365,100 @@ class FinancingOffer2(_FinancingOffer):
 
 
 @dataclass
-class FloorArea(XMLModel):
+class FloorArea(TextElementModel):
     unit: str
-    area: float
+    area: float = xml_field(decimals=2)
 
     class Meta:
         element_name = "FloorArea"
         case = Case.PASCAL
 
-    def format_area(self) -> str:
-        return str(truncate_to_n_decimal_places(self.area, n=2))
-
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, unit=self.unit)
-        element.text = self.format_area()
-        return element
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"unit": self.unit},
+            self.get_formatted_value("area"),
+        )
 
 
 @dataclass
-class FloorLocation(XMLModel):
+class FloorLocation(TextElementModel):
     high: Optional[bool] = None
     low: Optional[bool] = None
     number: Optional[int] = None
     count: Optional[int] = None
-    description: Optional[str] = None
+    description: Optional[str] = xml_field(max_length=50, default=None)
 
     class Meta:
         element_name = "FloorLocation"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        kwargs = {}
+    def get_parts(self) -> ElementParts:
+        attributes = {}
         if self.high is not None:
-            kwargs["high"] = yes_no_bool(self.high)
+            attributes["high"] = yes_no_bool(self.high)
         if self.low is not None:
-            kwargs["low"] = yes_no_bool(self.low)
+            attributes["low"] = yes_no_bool(self.low)
         if self.number is not None:
-            kwargs["number"] = str(self.number)
+            attributes["number"] = str(self.number)
         if self.count is not None:
-            kwargs["count"] = str(self.count)
-        element = etree.Element(
+            attributes["count"] = str(self.count)
+        return (
             self.Meta.element_name,
-            **kwargs,
+            attributes,
+            self.get_formatted_value("description"),
         )
-        element.text = self.format_description()
-        return element
-
-    def format_description(self) -> str:
-        return self.description[:50]
 
 
 @dataclass
-class GeneralCondition(XMLModel):
+class GeneralCondition(TextElementModel):
     level: GeneralConditionLevel
-    description: str
+    description: str = xml_field(max_length=500)
 
     class Meta:
         element_name = "GeneralCondition"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, level=str(self.level.value))
-        element.text = self.format_description()
-        return element
-
-    def format_description(self) -> str:
-        return self.description[:500]
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"level": str(self.level.value)},
+            self.get_formatted_value("description"),
+        )
 
 
 @dataclass
-class Lift(XMLModel):
+class Lift(TextElementModel):
     value: bool
-    description: str
+    description: str = xml_field(max_length=50)
 
     class Meta:
         element_name = "Lift"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, value=yes_no_bool(self.value))
-        element.text = self.format_description()
-        return element
-
-    def format_description(self) -> str:
-        return self.description[:50]
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"value": yes_no_bool(self.value)},
+            self.get_formatted_value("description"),
+        )
 
 
 @dataclass
-class LivingArea(XMLModel):
+class LivingArea(TextElementModel):
     unit: str
-    area: float
+    area: float = xml_field(decimals=2)
 
     class Meta:
         element_name = "LivingArea"
         case = Case.PASCAL
 
-    def format_area(self) -> str:
-        return str(truncate_to_n_decimal_places(self.area, n=2))
-
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, unit=self.unit)
-        element.text = self.format_area()
-        return element
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"unit": self.unit},
+            self.get_formatted_value("area"),
+        )
 
 
 @dataclass
@@ -515,91 +490,79 @@ class NewDevelopmentStatus(XMLModel):
 
 
 @dataclass
-class OnlineOfferLabel(XMLModel):
+class OnlineOfferLabel(TextElementModel):
     background_color: str
     text_color: str
-    text_value: str
+    text_value: str = xml_field(max_length=50)
 
     class Meta:
         element_name = "OnlineOfferLabel"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(
+    def get_parts(self) -> ElementParts:
+        return (
             self.Meta.element_name,
-            backgroundColor=self.background_color,
-            textColor=self.text_color,
+            {"backgroundColor": self.background_color, "textColor": self.text_color},
+            self.get_formatted_value("text_value"),
         )
-        element.text = self.format_text_value()
-        return element
-
-    def format_text_value(self) -> str:
-        return self.text_value[:50]
 
 
 @dataclass
-class ParkingSpace(XMLModel):
+class ParkingSpace(TextElementModel):
     type: ParkingSpaceType
     heated: ParkingSpaceHeatingType
     electricity_outlet: bool
-    text_value: str
+    text_value: str = xml_field(max_length=200)
 
     class Meta:
         element_name = "ParkingSpace"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(
+    def get_parts(self) -> ElementParts:
+        return (
             self.Meta.element_name,
-            type=str(self.type.value),
-            heated=str(self.heated.value),
-            electricityOutlet=yes_no_bool(self.electricity_outlet),
+            {
+                "type": str(self.type.value),
+                "heated": str(self.heated.value),
+                "electricityOutlet": yes_no_bool(self.electricity_outlet),
+            },
+            self.get_formatted_value("text_value"),
         )
-        element.text = self.format_text_value()
-        return element
-
-    def format_text_value(self) -> str:
-        return self.text_value[:200]
 
 
 @dataclass
-class Picture(XMLModel):
+class Picture(TextElementModel):
     index: int
     is_floor_plan: bool
-    url: str
+    url: str = xml_field(max_length=300)
 
     class Meta:
         element_name = "PictureX"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(
+    def get_parts(self) -> ElementParts:
+        return (
             self.Meta.element_name.replace("X", str(self.index)),
-            isFloorPlan=yes_no_bool(self.is_floor_plan),
+            {"isFloorPlan": yes_no_bool(self.is_floor_plan)},
+            self.get_formatted_value("url"),
         )
-        element.text = self.format_url()
-        return element
-
-    def format_url(self) -> str:
-        return self.url[:300]
 
 
 @dataclass
-class PictureDescription(XMLModel):
+class PictureDescription(TextElementModel):
     index: int
-    description: str
+    description: str = xml_field(max_length=200)
 
     class Meta:
         element_name = "PictureXDescription"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name.replace("X", str(self.index)))
-        element.text = self.format_description()
-        return element
-
-    def format_description(self) -> str:
-        return self.description[:200]
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name.replace("X", str(self.index)),
+            {},
+            self.get_formatted_value("description"),
+        )
 
 
 @dataclass
@@ -610,9 +573,6 @@ class _BoolAttrValueModel(XMLModel):
         case = Case.CAMEL
         attributes = ["value"]
 
-    def format_value(self) -> str:
-        return yes_no_bool(self.value)
-
 
 @dataclass
 class PromotionalOffer(_BoolAttrValueModel):
@@ -639,44 +599,38 @@ class RentFurnished(_BoolAttrValueModel):
 
 
 @dataclass
-class RentSecurityDeposit2(XMLModel):
-    value: int
+class RentSecurityDeposit2(TextElementModel):
+    value: int = xml_field(decimals=2)
     currency: str
 
     class Meta:
         element_name = "RentSecurityDeposit2"
         case = Case.PASCAL
 
-    def format_value(self) -> str:
-        return str(truncate_to_n_decimal_places(self.value, n=2))
-
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, currency=self.currency)
-        element.text = self.format_value()
-        return element
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"currency": self.currency},
+            self.get_formatted_value("value"),
+        )
 
 
 @dataclass
-class Sauna(XMLModel):
+class Sauna(TextElementModel):
     own: bool
     common: bool
-    description: str
+    description: str = xml_field(max_length=50)
 
     class Meta:
         element_name = "Sauna"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(
+    def get_parts(self) -> ElementParts:
+        return (
             self.Meta.element_name,
-            own=yes_no_bool(self.own),
-            common=yes_no_bool(self.common),
+            {"own": yes_no_bool(self.own), "common": yes_no_bool(self.common)},
+            self.get_formatted_value("description"),
         )
-        element.text = self.format_description()
-        return element
-
-    def format_description(self) -> str:
-        return self.description[:50]
 
 
 @dataclass
@@ -700,7 +654,7 @@ class Shore(XMLModel):
 
 
 @dataclass
-class ShowingDate1(XMLModel):
+class ShowingDate1(TextElementModel):
     value: date
     first_showing: bool
 
@@ -708,40 +662,35 @@ class ShowingDate1(XMLModel):
         element_name = "ShowingDate1"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(
+    def get_parts(self) -> ElementParts:
+        return (
             self.Meta.element_name,
-            firstShowing=yes_no_bool(self.first_showing),
+            {"firstShowing": yes_no_bool(self.first_showing)},
+            format_date(self.value, "%d.%m.%Y"),
         )
-        element.text = self.value.strftime("%d.%m.%Y")
-        return element
 
 
 @dataclass
-class SiteArea(XMLModel):
-    area: float
+class SiteArea(TextElementModel):
+    area: float = xml_field(decimals=2, pad=True)
     unit: str
 
     class Meta:
         element_name = "SiteArea"
         case = Case.PASCAL
 
-    def format_area(self) -> str:
-        return "{:.2f}".format(truncate_to_n_decimal_places(self.area, n=2))
-
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(
+    def get_parts(self) -> ElementParts:
+        return (
             self.Meta.element_name,
-            unit=self.unit,
+            {"unit": self.unit},
+            self.get_formatted_value("area"),
         )
-        element.text = self.format_area()
-        return element
 
 
 @dataclass
-class TotalArea(XMLModel):
+class TotalArea(TextElementModel):
     unit: str
-    area: float
+    area: float = xml_field(decimals=2, pad=True)
     min: Optional[int] = None
     max: Optional[int] = None
 
@@ -749,225 +698,252 @@ class TotalArea(XMLModel):
         element_name = "TotalArea"
         case = Case.PASCAL
 
-    def format_area(self) -> str:
-        return "{:.2f}".format(truncate_to_n_decimal_places(self.area, n=2))
-
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(
+    def get_parts(self) -> ElementParts:
+        return (
             self.Meta.element_name,
-            unit=self.unit,
-            min=str(self.min),
-            max=str(self.max),
+            {"unit": self.unit, "min": str(self.min), "max": str(self.max)},
+            self.get_formatted_value("area"),
         )
-        element.text = self.format_area()
-        return element
 
 
 @dataclass
-class YearOfBuilding(XMLModel):
+class YearOfBuilding(TextElementModel):
     original: int
-    description: str
+    description: str = xml_field(max_length=500)
 
     class Meta:
         element_name = "YearOfBuilding"
         case = Case.PASCAL
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, original=str(self.original))
-        element.text = self.format_description()
-        return element
-
-    def format_description(self) -> str:
-        return self.description[:500]
+    def get_parts(self) -> ElementParts:
+        return (
+            self.Meta.element_name,
+            {"original": str(self.original)},
+            self.get_formatted_value("description"),
+        )
 
 
 @dataclass
 class Apartment(XMLModel):
     type: ApartmentType
     new_houses: bool
-    key: str
-    vendor_identifier: str
+    key: str = xml_field(max_length=100)
+    vendor_identifier: str = xml_field(max_length=40)
     mode_of_habitation: ModeOfHabitation
-    street_address: str
+    street_address: str = xml_field(max_length=100)
     city: City
 
     action: Optional[ApartmentAction] = None
     new_apartment_reserved: Optional[bool] = None
 
     estate: Optional[Estate] = None
-    mode_of_financing: Optional[str] = None
-    apartment_city_plan_id: Optional[str] = None
+    mode_of_financing: Optional[str] = xml_field(max_length=400, default=None)
+    apartment_city_plan_id: Optional[str] = xml_field(max_length=20, default=None)
     hide_building_data: Optional[bool] = None
 
-    postal_code: Optional[str] = None
-    other_post_code: Optional[str] = None
-    post_office: Optional[str] = None
-    region: Optional[str] = None
-    country: Optional[str] = None
-    latitude: Optional[float] = None
-    longitude: Optional[float] = None
-
-    oikotie_id: Optional[str] = None
-    title: Optional[str] = None
-    description: Optional[str] = None
-    supplementary_information: Optional[str] = None
-    direction: Optional[str] = None
+    postal_code: Optional[str] = xml_field(max_length=6, default=None)
+    other_post_code: Optional[str] = xml_field(max_length=6, default=None)
+    post_office: Optional[str] = xml_field(max_length=100, default=None)
+    region: Optional[str] = xml_field(max_length=100, default=None)
+    country: Optional[str] = xml_field(max_length=50, default=None)
+    latitude: Optional[float] = xml_field(
+        decimals=5, pad=True, min_value=-90, max_value=90, default=None
+    )
+    longitude: Optional[float] = xml_field(
+        decimals=5, pad=True, min_value=-180, max_value=180, default=None
+    )
+
+    oikotie_id: Optional[str] = xml_field(max_length=30, default=None)
+    title: Optional[str] = xml_field(max_length=150, default=None)
+    description: Optional[str] = xml_field(max_length=2000, sanitize=True, default=None)
+    supplementary_information: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
+    direction: Optional[str] = xml_field(max_length=100, default=None)
     pictures: Optional[List[Picture]] = None
-    picture_gallery_promotion: Optional[str] = None
-    picture_gallery_promotion_url: Optional[str] = None
+    picture_gallery_promotion: Optional[str] = xml_field(max_length=300, default=None)
+    picture_gallery_promotion_url: Optional[str] = xml_field(
+        max_length=300, default=None
+    )
     picture_descriptions: Optional[List[PictureDescription]] = None
     city_plan_pictures: Optional[List[CityPlanPicture]] = None
-    virtual_presentation: Optional[str] = None
-    video_presentation_url: Optional[str] = None
-    listing_background_image: Optional[str] = None
+    virtual_presentation: Optional[str] = xml_field(max_length=200, default=None)
+    video_presentation_url: Optional[str] = xml_field(max_length=300, default=None)
+    listing_background_image: Optional[str] = xml_field(max_length=300, default=None)
     listing_background_color: Optional[str] = None
 
     floor_location: Optional[FloorLocation] = None
     number_of_rooms: Optional[int] = None
-    room_types: Optional[str] = None
-    other_space_description: Optional[str] = None
+    room_types: Optional[str] = xml_field(max_length=200, default=None)
+    other_space_description: Optional[str] = xml_field(max_length=500, default=None)
     balcony: Optional[Balcony] = None
-    terrace: Optional[str] = None
-    direction_of_windows: Optional[str] = None
-    view: Optional[str] = None
+    terrace: Optional[str] = xml_field(max_length=500, default=None)
+    direction_of_windows: Optional[str] = xml_field(max_length=100, default=None)
+    view: Optional[str] = xml_field(max_length=100, default=None)
     cellar: Optional[bool] = None
 
     living_area: Optional[LivingArea] = None
     living_area_type: Optional[LivingAreaType] = None
     total_area: Optional[TotalArea] = None
     floor_area: Optional[FloorArea] = None
-    residental_apartment_area: Optional[float] = None
-    office_area: Optional[float] = None
-    estate_area: Optional[str] = None
-    forest_amount: Optional[str] = None
-    land_area: Optional[str] = None
-
-    real_estate_id: Optional[str] = None
-    real_estate_code: Optional[str] = None
-    housing_company_name: Optional[str] = None
-    housing_company_key: Optional[str] = None
-    business_id: Optional[str] = None
-    disponent: Optional[str] = None
-    real_estate_management: Optional[str] = None
+    residental_apartment_area: Optional[float] = xml_field(decimals=2, default=None)
+    office_area: Optional[float] = xml_field(decimals=2, default=None)
+    estate_area: Optional[str] = xml_field(max_length=500, default=None)
+    forest_amount: Optional[str] = xml_field(max_length=500, default=None)
+    land_area: Optional[str] = xml_field(max_length=500, default=None)
+
+    real_estate_id: Optional[str] = xml_field(max_length=30, default=None)
+    real_estate_code: Optional[str] = xml_field(max_length=50, default=None)
+    housing_company_name: Optional[str] = xml_field(max_length=100, default=None)
+    housing_company_key: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
+    business_id: Optional[str] = xml_field(max_length=12, default=None)
+    disponent: Optional[str] = xml_field(max_length=100, default=None)
+    real_estate_management: Optional[str] = xml_field(max_length=50, default=None)
     number_of_apartments: Optional[int] = None
     lift: Optional[Lift] = None
 
     year_of_building: Optional[YearOfBuilding] = None
     year_start_of_use: Optional[int] = None
-    basic_renovations: Optional[str] = None
-    renovation_year_facade: Optional[str] = None
-    renovation_year_roof: Optional[str] = None
-    renovation_year_plumbing: Optional[str] = None
-    renovation_year_bathrooms: Optional[str] = None
-    future_renovations: Optional[str] = None
-    future_renovation_year_facade: Optional[str] = None
-    future_renovation_year_roof: Optional[str] = None
-    future_renovation_year_plumbing: Optional[str] = None
-    future_renovation_year_bathrooms: Optional[str] = None
-
-    heating: Optional[str] = None
-    roof_type: Optional[str] = None
-    building_rights: Optional[str] = None
+    basic_renovations: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
+    renovation_year_facade: Optional[str] = xml_field(max_length=9, default=None)
+    renovation_year_roof: Optional[str] = xml_field(max_length=9, default=None)
+    renovation_year_plumbing: Optional[str] = xml_field(max_length=9, default=None)
+    renovation_year_bathrooms: Optional[str] = xml_field(max_length=9, default=None)
+    future_renovations: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
+    future_renovation_year_facade: Optional[str] = xml_field(max_length=9, default=None)
+    future_renovation_year_roof: Optional[str] = xml_field(max_length=9, default=None)
+    future_renovation_year_plumbing: Optional[str] = xml_field(
+        max_length=9, default=None
+    )
+    future_renovation_year_bathrooms: Optional[str] = xml_field(
+        max_length=9, default=None
+    )
+
+    heating: Optional[str] = xml_field(max_length=200, default=None)
+    roof_type: Optional[str] = xml_field(max_length=200, default=None)
+    building_rights: Optional[str] = xml_field(max_length=200, default=None)
     building_rights_amount: Optional[BuildingRightsAmount] = None
     number_of_offices: Optional[int] = None
 
-    sanitation: Optional[str] = None
-    water_and_sewage: Optional[str] = None
-    sewer_system: Optional[str] = None
-    use_of_water: Optional[str] = None
-    ventilation_system: Optional[str] = None
-    other_buildings: Optional[str] = None
-    more_estate_information: Optional[str] = None
+    sanitation: Optional[str] = xml_field(max_length=300, default=None)
+    water_and_sewage: Optional[str] = xml_field(max_length=300, default=None)
+    sewer_system: Optional[str] = xml_field(max_length=300, default=None)
+    use_of_water: Optional[str] = xml_field(max_length=300, default=None)
+    ventilation_system: Optional[str] = xml_field(max_length=300, default=None)
+    other_buildings: Optional[str] = xml_field(max_length=500, default=None)
+    more_estate_information: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
 
     general_condition: Optional[GeneralCondition] = None
-    condition_inspection: Optional[str] = None
+    condition_inspection: Optional[str] = xml_field(max_length=500, default=None)
 
-    estate_name_and_number: Optional[str] = None
+    estate_name_and_number: Optional[str] = xml_field(max_length=500, default=None)
     site: Optional[Site] = None
-    site_rent: Optional[str] = None
+    site_rent: Optional[str] = xml_field(max_length=50, default=None)
     site_rent_contract_end_date: Optional[date] = None
     site_area: Optional[SiteArea] = None
-    area_description: Optional[str] = None
+    area_description: Optional[str] = xml_field(max_length=500, default=None)
     shore: Optional[Shore] = None
-    shores_description: Optional[str] = None
-    shore_direction: Optional[str] = None
-    shore_length: Optional[str] = None
-    waters_description: Optional[str] = None
-    building_plan_information: Optional[str] = None
-    building_plan_situation: Optional[str] = None
-    grounds: Optional[str] = None
-    yard_description: Optional[str] = None
-    yard_direction: Optional[str] = None
+    shores_description: Optional[str] = xml_field(max_length=300, default=None)
+    shore_direction: Optional[str] = xml_field(max_length=200, default=None)
+    shore_length: Optional[str] = xml_field(max_length=200, default=None)
+    waters_description: Optional[str] = xml_field(max_length=300, default=None)
+    building_plan_information: Optional[str] = xml_field(max_length=200, default=None)
+    building_plan_situation: Optional[str] = xml_field(max_length=100, default=None)
+    grounds: Optional[str] = xml_field(max_length=200, default=None)
+    yard_description: Optional[str] = xml_field(max_length=500, default=None)
+    yard_direction: Optional[str] = xml_field(max_length=200, default=None)
 
     heating_costs: Optional[HeatingCosts] = None
     sauna_charge: Optional[SaunaCharge] = None
-    estate_tax: Optional[str] = None
+    estate_tax: Optional[str] = xml_field(max_length=30, default=None)
     housing_company_fee: Optional[HousingCompanyFee] = None
     financing_fee: Optional[FinancingFee] = None
     maintenance_fee: Optional[MaintenanceFee] = None
     water_fee: Optional[WaterFee] = None
-    water_fee_explanation: Optional[str] = None
-    electricity_consumption: Optional[str] = None
+    water_fee_explanation: Optional[str] = xml_field(max_length=400, default=None)
+    electricity_consumption: Optional[str] = xml_field(max_length=200, default=None)
     electricity_consumption_charge: Optional[ElectricityConsumptionCharge] = None
     cable_tv_charge: Optional[CableTvCharge] = None
     road_costs: Optional[str] = None
-    other_fees: Optional[str] = None
-    share_of_debt_85: Optional[Decimal] = None
-    share_of_debt_70: Optional[Decimal] = None
+    other_fees: Optional[str] = xml_field(max_length=2000, sanitize=True, default=None)
+    share_of_debt_85: Optional[Decimal] = xml_field(decimals=2, default=None)
+    share_of_debt_70: Optional[Decimal] = xml_field(decimals=2, default=None)
     charge_fee: Optional[ChargeFee] = None
     car_parking_charge: Optional[CarParkingCharge] = None
 
-    building_material: Optional[str] = None
-    foundation: Optional[str] = None
-    wall_construction: Optional[str] = None
-    roof_material: Optional[str] = None
-    floor: Optional[str] = None
-    bedroom_floor: Optional[str] = None
-    kitchen_floor: Optional[str] = None
-    living_room_floor: Optional[str] = None
-    bathroom_floor: Optional[str] = None
-    bedroom_wall: Optional[str] = None
-    kitchen_wall: Optional[str] = None
-    living_room_wall: Optional[str] = None
-    bathroom_wall: Optional[str] = None
-    other_rooms_materials: Optional[str] = None
-    kitchen_appliances: Optional[str] = None
-    bathroom_appliances: Optional[str] = None
-    bedroom_appliances: Optional[str] = None
-    living_room_appliances: Optional[str] = None
-    non_included_appliances: Optional[str] = None
-    other_included_appliances: Optional[str] = None
+    building_material: Optional[str] = xml_field(max_length=200, default=None)
+    foundation: Optional[str] = xml_field(max_length=200, default=None)
+    wall_construction: Optional[str] = xml_field(max_length=200, default=None)
+    roof_material: Optional[str] = xml_field(max_length=200, default=None)
+    floor: Optional[str] = xml_field(max_length=400, default=None)
+    bedroom_floor: Optional[str] = xml_field(max_length=400, default=None)
+    kitchen_floor: Optional[str] = xml_field(max_length=400, default=None)
+    living_room_floor: Optional[str] = xml_field(max_length=400, default=None)
+    bathroom_floor: Optional[str] = xml_field(max_length=400, default=None)
+    bedroom_wall: Optional[str] = xml_field(max_length=200, default=None)
+    kitchen_wall: Optional[str] = xml_field(max_length=200, default=None)
+    living_room_wall: Optional[str] = xml_field(max_length=200, default=None)
+    bathroom_wall: Optional[str] = xml_field(max_length=200, default=None)
+    other_rooms_materials: Optional[str] = xml_field(max_length=400, default=None)
+    kitchen_appliances: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
+    bathroom_appliances: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
+    bedroom_appliances: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
+    living_room_appliances: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
+    non_included_appliances: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
+    other_included_appliances: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
     sauna: Optional[Sauna] = None
-    storage_space: Optional[str] = None
+    storage_space: Optional[str] = xml_field(max_length=1000, default=None)
     parking_space: Optional[ParkingSpace] = None
-    car_storage: Optional[str] = None
-    common_areas: Optional[str] = None
-    antenna_system: Optional[str] = None
-    tv_appliances: Optional[str] = None
-    internet_appliances: Optional[str] = None
+    car_storage: Optional[str] = xml_field(max_length=300, default=None)
+    common_areas: Optional[str] = xml_field(max_length=200, default=None)
+    antenna_system: Optional[str] = xml_field(max_length=50, default=None)
+    tv_appliances: Optional[str] = xml_field(max_length=500, default=None)
+    internet_appliances: Optional[str] = xml_field(max_length=500, default=None)
 
     date_when_available: Optional[date] = None
-    becomes_available: Optional[str] = None
+    becomes_available: Optional[str] = xml_field(max_length=200, default=None)
     rent_fixed_term_start: Optional[date] = None
     rent_fixed_term_end: Optional[date] = None
-    rent_min_length: Optional[str] = None
+    rent_min_length: Optional[str] = xml_field(max_length=500, default=None)
     extra_visibility_start_date_time: Optional[datetime] = None
 
     rented: Optional[Rented] = None
     rent_furnished: Optional[RentFurnished] = None
-    municipal_development: Optional[str] = None
-    honoring_clause: Optional[str] = None
-    lease_holder: Optional[str] = None
-    term_of_lease: Optional[str] = None
-    encumbrances: Optional[str] = None
-    mortgages: Optional[str] = None
-    rent_increase: Optional[str] = None
-    renting_terms: Optional[str] = None
+    municipal_development: Optional[str] = xml_field(max_length=200, default=None)
+    honoring_clause: Optional[str] = xml_field(max_length=30, default=None)
+    lease_holder: Optional[str] = xml_field(max_length=50, default=None)
+    term_of_lease: Optional[str] = xml_field(max_length=500, default=None)
+    encumbrances: Optional[str] = xml_field(max_length=200, default=None)
+    mortgages: Optional[str] = xml_field(max_length=100, default=None)
+    rent_increase: Optional[str] = xml_field(max_length=500, default=None)
+    renting_terms: Optional[str] = xml_field(
+        max_length=4000, sanitize=True, default=None
+    )
     rent_fixed_term: Optional[RentFixedTerm] = None
 
-    services: Optional[str] = None
-    connections: Optional[str] = None
-    driving_instructions: Optional[str] = None
+    services: Optional[str] = xml_field(max_length=200, default=None)
+    connections: Optional[str] = xml_field(max_length=200, default=None)
+    driving_instructions: Optional[str] = xml_field(max_length=200, default=None)
 
     rent_per_month: Optional[RentPerMonth] = None
     rent_per_day: Optional[RentPerDay] = None
@@ -978,65 +954,77 @@ class Apartment(XMLModel):
     sales_price: Optional[SalesPrice] = None
     debt_payable: Optional[DebtPayable] = None
     redemption_price: Optional[RedemptionPrice] = None
-    buyer_costs: Optional[str] = None
-    apartment_rent_income: Optional[Decimal] = None
+    buyer_costs: Optional[str] = xml_field(max_length=500, default=None)
+    apartment_rent_income: Optional[Decimal] = xml_field(decimals=2, default=None)
     rent_comission: Optional[RentComission] = None
-    rent_security_deposit: Optional[str] = None
+    rent_security_deposit: Optional[str] = xml_field(
+        max_length=2000, sanitize=True, default=None
+    )
     rent_security_deposit2: Optional[RentSecurityDeposit2] = None
     financing_offer1: Optional[FinancingOffer1] = None
     financing_offer2: Optional[FinancingOffer2] = None
-    site_repurchase_price: Optional[Decimal] = None
-    site_condominium_fee: Optional[Decimal] = None
-
-    magazine_identifier: Optional[str] = None
-    print_media_text: Optional[str] = None
-
-    estate_agent_contact_person: Optional[str] = None
-    estate_agent_email: Optional[str] = None
-    estate_agent_telephone: Optional[str] = None
-    estate_agent_title: Optional[str] = None
-    estate_agent_degrees: Optional[str] = None
+    site_repurchase_price: Optional[Decimal] = xml_field(decimals=2, default=None)
+    site_condominium_fee: Optional[Decimal] = xml_field(decimals=2, default=None)
+
+    magazine_identifier: Optional[str] = xml_field(max_length=20, default=None)
+    print_media_text: Optional[str] = xml_field(
+        max_length=4000, sanitize=True, default=None
+    )
+
+    estate_agent_contact_person: Optional[str] = xml_field(max_length=100, default=None)
+    estate_agent_email: Optional[str] = xml_field(max_length=100, default=None)
+    estate_agent_telephone: Optional[str] = xml_field(max_length=100, default=None)
+    estate_agent_title: Optional[str] = xml_field(max_length=200, default=None)
+    estate_agent_degrees: Optional[str] = xml_field(max_length=200, default=None)
     estate_agent_rating: Optional[EstateAgentRating] = None
     estate_agent_social_media: Optional[EstateAgentSocialMedia] = None
-    estate_agent_contact_person_picture_url: Optional[str] = None
+    estate_agent_contact_person_picture_url: Optional[str] = xml_field(
+        max_length=300, default=None
+    )
 
-    inquiries: Optional[str] = None
+    inquiries: Optional[str] = xml_field(max_length=500, default=None)
     showing_date1: Optional[ShowingDate1] = None
     showing_start_time1: Optional[str] = None
     showing_end_time1: Optional[str] = None
-    showing_date_explanation1: Optional[str] = None
+    showing_date_explanation1: Optional[str] = xml_field(max_length=400, default=None)
     showing_date2: Optional[date] = None
     showing_start_time2: Optional[str] = None
     showing_end_time2: Optional[str] = None
-    showing_date_explanation2: Optional[str] = None
-    contact_request_email: Optional[str] = None
-    electronic_brochure_request_email: Optional[str] = None
-    electronic_brochure_request_url: Optional[str] = None
-    application_url: Optional[str] = None
+    showing_date_explanation2: Optional[str] = xml_field(max_length=400, default=None)
+    contact_request_email: Optional[str] = xml_field(max_length=100, default=None)
+    electronic_brochure_request_email: Optional[str] = xml_field(
+        max_length=50, default=None
+    )
+    electronic_brochure_request_url: Optional[str] = xml_field(
+        max_length=500, default=None
+    )
+    application_url: Optional[str] = xml_field(max_length=500, default=None)
     show_lead_form: Optional[bool] = None
 
-    more_info_url: Optional[str] = None
+    more_info_url: Optional[str] = xml_field(max_length=500, default=None)
     attachments: Optional[Attachments] = None
     campaign_link: Optional[CampaignLink] = None
-    banner_html: Optional[str] = None
+    banner_html: Optional[str] = xml_field(max_length=500, default=None)
     promotional_offer: Optional[PromotionalOffer] = None
     promotional_offer_title: Optional[str] = None
-    promotional_offer_description: Optional[str] = None
-    promotional_offer_url: Optional[str] = None
-    promotional_offer_url_text: Optional[str] = None
-    promotional_offer_logo: Optional[str] = None
+    promotional_offer_description: Optional[str] = xml_field(
+        max_length=180, default=None
+    )
+    promotional_offer_url: Optional[str] = xml_field(max_length=300, default=None)
+    promotional_offer_url_text: Optional[str] = xml_field(max_length=30, default=None)
+    promotional_offer_logo: Optional[str] = xml_field(max_length=300, default=None)
     promotional_offer_color: Optional[str] = None
     online_offer: Optional[bool] = None
-    online_offer_logo: Optional[str] = None
-    online_offer_url: Optional[str] = None
-    online_offer_highest_bid: Optional[Decimal] = None
+    online_offer_logo: Optional[str] = xml_field(max_length=300, default=None)
+    online_offer_url: Optional[str] = xml_field(max_length=300, default=None)
+    online_offer_highest_bid: Optional[Decimal] = xml_field(decimals=2, default=None)
     online_offer_label: Optional[OnlineOfferLabel] = None
-    online_offer_search_logo: Optional[str] = None
+    online_offer_search_logo: Optional[str] = xml_field(max_length=300, default=None)
     rc_energy_flag: Optional[str] = None
-    rc_energyclass: Optional[str] = None
+    rc_energyclass: Optional[str] = xml_field(max_length=200, default=None)
     rc_wastewater_flag: Optional[str] = None
 
-    estate_division: Optional[str] = None
+    estate_division: Optional[str] = xml_field(max_length=500, default=None)
 
     new_development_status: Optional[NewDevelopmentStatus] = None
     time_of_completion: Optional[date] = None
@@ -1059,497 +1047,31 @@ class Apartment(XMLModel):
         }
         attributes = ["action", "type", "new_houses", "new_apartment_reserved"]
 
-    def format_key(self) -> str:
-        return self.key[:100]
-
-    def format_vendor_identifier(self) -> str:
-        return self.vendor_identifier[:40]
-
-    def format_mode_of_financing(self) -> str:
-        return self.mode_of_financing[:400]
-
-    def format_apartment_city_plan_id(self) -> str:
-        return self.apartment_city_plan_id[:20]
-
-    def format_street_address(self) -> str:
-        return self.street_address[:100]
-
-    def format_postal_code(self) -> str:
-        return self.postal_code[:6]
-
-    def format_other_post_code(self) -> str:
-        return self.other_post_code[:6]
-
-    def format_post_office(self) -> str:
-        return self.post_office[:100]
-
-    def format_region(self) -> str:
-        return self.region[:100]
-
-    def format_country(self) -> str:
-        return self.country[:50]
-
-    def format_oikotie_id(self) -> str:
-        return self.oikotie_id[:30]
-
-    def format_title(self) -> str:
-        return self.title[:150]
-
-    def format_description(self) -> str:
-        return self.description[:2000]
-
-    def format_supplementary_information(self) -> str:
-        return self.supplementary_information[:2000]
-
-    def format_direction(self) -> str:
-        return self.direction[:100]
-
-    def format_picture_gallery_promotion(self) -> str:
-        return self.picture_gallery_promotion[:300]
-
-    def format_picture_gallery_promotion_url(self) -> str:
-        return self.picture_gallery_promotion_url[:300]
-
-    def format_virtual_presentation(self) -> str:
-        return self.virtual_presentation[:200]
-
-    def format_video_presentation_url(self) -> str:
-        return self.video_presentation_url[:300]
-
-    def format_listing_background_image(self) -> str:
-        return self.listing_background_image[:300]
-
-    def format_room_types(self) -> str:
-        return self.room_types[:200]
-
-    def format_other_space_description(self) -> str:
-        return self.other_space_description[:500]
-
-    def format_terrace(self) -> str:
-        return self.terrace[:500]
-
-    def format_direction_of_windows(self) -> str:
-        return self.direction_of_windows[:100]
-
-    def format_view(self) -> str:
-        return self.view[:100]
-
-    def format_estate_area(self) -> str:
-        return self.estate_area[:500]
-
-    def format_forest_amount(self) -> str:
-        return self.forest_amount[:500]
-
-    def format_land_area(self) -> str:
-        return self.land_area[:500]
-
-    def format_real_estate_id(self) -> str:
-        return self.real_estate_id[:30]
-
-    def format_real_estate_code(self) -> str:
-        return self.real_estate_code[:50]
-
-    def format_housing_company_name(self) -> str:
-        return self.housing_company_name[:100]
-
-    def format_housing_company_key(self) -> str:
-        return self.housing_company_key[:2000]
-
-    def format_business_id(self) -> str:
-        return self.business_id[:12]
-
-    def format_disponent(self) -> str:
-        return self.disponent[:100]
-
-    def format_real_estate_management(self) -> str:
-        return self.real_estate_management[:50]
-
-    def format_basic_renovations(self) -> str:
-        return self.basic_renovations[:2000]
-
-    def format_renovation_year_facade(self) -> str:
-        return self.renovation_year_facade[:9]
-
-    def format_renovation_year_roof(self) -> str:
-        return self.renovation_year_roof[:9]
-
-    def format_renovation_year_plumbing(self) -> str:
-        return self.renovation_year_plumbing[:9]
-
-    def format_renovation_year_bathrooms(self) -> str:
-        return self.renovation_year_bathrooms[:9]
-
-    def format_future_renovations(self) -> str:
-        return self.future_renovations[:2000]
-
-    def format_future_renovation_year_facade(self) -> str:
-        return self.future_renovation_year_facade[:9]
-
-    def format_future_renovation_year_roof(self) -> str:
-        return self.future_renovation_year_roof[:9]
-
-    def format_future_renovation_year_plumbing(self) -> str:
-        return self.future_renovation_year_plumbing[:9]
-
-    def format_future_renovation_year_bathrooms(self) -> str:
-        return self.future_renovation_year_bathrooms[:9]
-
-    def format_heating(self) -> str:
-        return self.heating[:200]
-
-    def format_roof_type(self) -> str:
-        return self.roof_type[:200]
-
-    def format_building_rights(self) -> str:
-        return self.building_rights[:200]
-
-    def format_sanitation(self) -> str:
-        return self.sanitation[:300]
-
-    def format_water_and_sewage(self) -> str:
-        return self.water_and_sewage[:300]
-
-    def format_sewer_system(self) -> str:
-        return self.sewer_system[:300]
-
-    def format_use_of_water(self) -> str:
-        return self.use_of_water[:300]
+    def format_pictures(self) -> Generator[Picture, None, None]:
+        yield from self.pictures
 
-    def format_ventilation_system(self) -> str:
-        return self.ventilation_system[:300]
+    def format_picture_descriptions(
+        self,
+    ) -> Generator[PictureDescription, None, None]:
+        yield from self.picture_descriptions
 
-    def format_other_buildings(self) -> str:
-        return self.other_buildings[:500]
+    def format_city_plan_pictures(self) -> Generator[CityPlanPicture, None, None]:
+        yield from self.city_plan_pictures
 
-    def format_more_estate_information(self) -> str:
-        return self.more_estate_information[:2000]
 
-    def format_condition_inspection(self) -> str:
-        return self.condition_inspection[:500]
-
-    def format_estate_name_and_number(self) -> str:
-        return self.estate_name_and_number[:500]
-
-    def format_site_rent(self) -> str:
-        return self.site_rent[:50]
-
-    def format_area_description(self) -> str:
-        return self.area_description[:500]
-
-    def format_shores_description(self) -> str:
-        return self.shores_description[:300]
-
-    def format_shore_direction(self) -> str:
-        return self.shore_direction[:200]
-
-    def format_shore_length(self) -> str:
-        return self.shore_length[:200]
-
-    def format_waters_description(self) -> str:
-        return self.waters_description[:300]
-
-    def format_building_plan_information(self) -> str:
-        return self.building_plan_information[:200]
-
-    def format_building_plan_situation(self) -> str:
-        return self.building_plan_situation[:100]
-
-    def format_grounds(self) -> str:
-        return self.grounds[:200]
-
-    def format_yard_description(self) -> str:
-        return self.yard_description[:500]
-
-    def format_yard_direction(self) -> str:
-        return self.yard_direction[:200]
-
-    def format_estate_tax(self) -> str:
-        return self.estate_tax[:30]
-
-    def format_water_fee_explanation(self) -> str:
-        return self.water_fee_explanation[:400]
-
-    def format_electricity_consumption(self) -> str:
-        return self.electricity_consumption[:200]
-
-    def format_other_fees(self) -> str:
-        return self.other_fees[:2000]
-
-    def format_building_material(self) -> str:
-        return self.building_material[:200]
-
-    def format_foundation(self) -> str:
-        return self.foundation[:200]
-
-    def format_wall_construction(self) -> str:
-        return self.wall_construction[:200]
-
-    def format_roof_material(self) -> str:
-        return self.roof_material[:200]
-
-    def format_floor(self) -> str:
-        return self.floor[:400]
-
-    def format_bedroom_floor(self) -> str:
-        return self.bedroom_floor[:400]
-
-    def format_kitchen_floor(self) -> str:
-        return self.kitchen_floor[:400]
-
-    def format_living_room_floor(self) -> str:
-        return self.living_room_floor[:400]
-
-    def format_bathroom_floor(self) -> str:
-        return self.bathroom_floor[:400]
-
-    def format_bedroom_wall(self) -> str:
-        return self.bedroom_wall[:200]
-
-    def format_kitchen_wall(self) -> str:
-        return self.kitchen_wall[:200]
-
-    def format_living_room_wall(self) -> str:
-        return self.living_room_wall[:200]
-
-    def format_bathroom_wall(self) -> str:
-        return self.bathroom_wall[:200]
-
-    def format_other_rooms_materials(self) -> str:
-        return self.other_rooms_materials[:400]
-
-    def format_kitchen_appliances(self) -> str:
-        return self.kitchen_appliances[:2000]
-
-    def format_bathroom_appliances(self) -> str:
-        return self.bathroom_appliances[:2000]
-
-    def format_bedroom_appliances(self) -> str:
-        return self.bedroom_appliances[:2000]
-
-    def format_living_room_appliances(self) -> str:
-        return self.living_room_appliances[:2000]
-
-    def format_non_included_appliances(self) -> str:
-        return self.non_included_appliances[:2000]
-
-    def format_other_included_appliances(self) -> str:
-        return self.other_included_appliances[:2000]
-
-    def format_storage_space(self) -> str:
-        return self.storage_space[:1000]
-
-    def format_car_storage(self) -> str:
-        return self.car_storage[:300]
-
-    def format_common_areas(self) -> str:
-        return self.common_areas[:200]
-
-    def format_antenna_system(self) -> str:
-        return self.antenna_system[:50]
-
-    def format_tv_appliances(self) -> str:
-        return self.tv_appliances[:500]
-
-    def format_internet_appliances(self) -> str:
-        return self.internet_appliances[:500]
-
-    def format_becomes_available(self) -> str:
-        return self.becomes_available[:200]
-
-    def format_rent_min_length(self) -> str:
-        return self.rent_min_length[:500]
-
-    def format_municipal_development(self) -> str:
-        return self.municipal_development[:200]
-
-    def format_honoring_clause(self) -> str:
-        return self.honoring_clause[:30]
-
-    def format_lease_holder(self) -> str:
-        return self.lease_holder[:50]
-
-    def format_term_of_lease(self) -> str:
-        return self.term_of_lease[:500]
-
-    def format_encumbrances(self) -> str:
-        return self.encumbrances[:200]
-
-    def format_mortgages(self) -> str:
-        return self.mortgages[:100]
-
-    def format_rent_increase(self) -> str:
-        return self.rent_increase[:500]
-
-    def format_renting_terms(self) -> str:
-        return self.renting_terms[:4000]
-
-    def format_services(self) -> str:
-        return self.services[:200]
-
-    def format_connections(self) -> str:
-        return self.connections[:200]
-
-    def format_driving_instructions(self) -> str:
-        return self.driving_instructions[:200]
-
-    def format_buyer_costs(self) -> str:
-        return self.buyer_costs[:500]
-
-    def format_rent_security_deposit(self) -> str:
-        return self.rent_security_deposit[:2000]
-
-    def format_magazine_identifier(self) -> str:
-        return self.magazine_identifier[:20]
-
-    def format_print_media_text(self) -> str:
-        return self.print_media_text[:4000]
-
-    def format_estate_agent_contact_person(self) -> str:
-        return self.estate_agent_contact_person[:100]
-
-    def format_estate_agent_email(self) -> str:
-        return self.estate_agent_email[:100]
-
-    def format_estate_agent_telephone(self) -> str:
-        return self.estate_agent_telephone[:100]
-
-    def format_estate_agent_title(self) -> str:
-        return self.estate_agent_title[:200]
-
-    def format_estate_agent_degrees(self) -> str:
-        return self.estate_agent_degrees[:200]
-
-    def format_estate_agent_contact_person_picture_url(self) -> str:
-        return self.estate_agent_contact_person_picture_url[:300]
-
-    def format_inquiries(self) -> str:
-        return self.inquiries[:500]
-
-    def format_showing_date_explanation1(self) -> str:
-        return self.showing_date_explanation1[:400]
-
-    def format_showing_date_explanation2(self) -> str:
-        return self.showing_date_explanation2[:400]
-
-    def format_contact_request_email(self) -> str:
-        return self.contact_request_email[:100]
-
-    def format_electronic_brochure_request_email(self) -> str:
-        return self.electronic_brochure_request_email[:50]
-
-    def format_electronic_brochure_request_url(self) -> str:
-        return self.electronic_brochure_request_url[:500]
-
-    def format_application_url(self) -> str:
-        return self.application_url[:500]
-
-    def format_more_info_url(self) -> str:
-        return self.more_info_url[:500]
-
-    def format_banner_html(self) -> str:
-        return self.banner_html[:500]
-
-    def format_promotional_offer_description(self) -> str:
-        return self.promotional_offer_description[:180]
-
-    def format_promotional_offer_url(self) -> str:
-        return self.promotional_offer_url[:300]
-
-    def format_promotional_offer_url_text(self) -> str:
-        return self.promotional_offer_url_text[:30]
-
-    def format_promotional_offer_logo(self) -> str:
-        return self.promotional_offer_logo[:300]
-
-    def format_online_offer_logo(self) -> str:
-        return self.online_offer_logo[:300]
-
-    def format_online_offer_url(self) -> str:
-        return self.online_offer_url[:300]
-
-    def format_online_offer_search_logo(self) -> str:
-        return self.online_offer_search_logo[:300]
-
-    def format_rc_energyclass(self) -> str:
-        return self.rc_energyclass[:200]
-
-    def format_estate_division(self) -> str:
-        return self.estate_division[:500]
-
-    def format_pictures(self) -> Generator[etree._Element, None, None]:
-        for picture in self.pictures:
-            yield picture.to_etree()
-
-    def format_picture_descriptions(self) -> Generator[etree._Element, None, None]:
-        for picture_description in self.picture_descriptions:
-            yield picture_description.to_etree()
-
-    def format_city_plan_pictures(self) -> Generator[etree._Element, None, None]:
-        for city_plan_picture in self.city_plan_pictures:
-            yield city_plan_picture.to_etree()
-
-    def format_new_houses(self) -> str:
-        return yes_no_bool(self.new_houses)
-
-    def format_new_apartment_reserved(self) -> str:
-        return yes_no_bool(self.new_apartment_reserved)
-
-    def format_hide_building_data(self) -> str:
-        return yes_no_bool(self.hide_building_data)
-
-    def format_latitude(self) -> str:
-        return "{:.5f}".format(truncate_to_n_decimal_places(self.latitude, n=5))
-
-    def format_longitude(self) -> str:
-        return "{:.5f}".format(truncate_to_n_decimal_places(self.longitude, n=5))
-
-    def format_has_terrace(self) -> str:
-        return yes_no_bool(self.has_terrace)
-
-    def format_cellar(self) -> str:
-        return yes_no_bool(self.cellar)
-
-    def format_residental_apartment_area(self) -> str:
-        return str(truncate_to_n_decimal_places(self.residental_apartment_area, n=2))
-
-    def format_office_area(self) -> str:
-        return str(truncate_to_n_decimal_places(self.office_area, n=2))
-
-    def format_site_rent_contract_end_date(self) -> str:
-        return self.site_rent_contract_end_date.strftime("%d.%m.%Y")
-
-    def format_share_of_debt_85(self) -> str:
-        return str(truncate_to_n_decimal_places(self.share_of_debt_85, n=2))
-
-    def format_share_of_debt_70(self) -> str:
-        return str(truncate_to_n_decimal_places(self.share_of_debt_70, n=2))
-
-    def format_date_when_available(self) -> str:
-        return self.date_when_available.strftime("%d.%m.%Y")
-
-    def format_rent_fixed_term_start(self) -> str:
-        return self.rent_fixed_term_start.strftime("%d.%m.%Y")
-
-    def format_rent_fixed_term_end(self) -> str:
-        return self.rent_fixed_term_end.strftime("%d.%m.%Y")
-
-    def format_extra_visibility_start_date_time(self) -> str:
-        return self.extra_visibility_start_date_time.strftime("%Y-%m-%dT%H:%M:%S")
-
-    def format_apartment_rent_income(self) -> str:
-        return str(truncate_to_n_decimal_places(self.apartment_rent_income, n=2))
-
-    def format_site_repurchase_price(self) -> str:
-        return str(truncate_to_n_decimal_places(self.site_repurchase_price, n=2))
-
-    def format_site_condominium_fee(self) -> str:
-        return str(truncate_to_n_decimal_places(self.site_condominium_fee, n=2))
-
-    def format_showing_date2(self) -> str:
-        return self.showing_date2.strftime("%d.%m.%Y")
+@dataclass
+class ApartmentRemoval(XMLModel):
+    """
+    Minimal Apartment element removing an apartment by its key, for UPDATEAPT
+    files.
+    """
 
-    def format_online_offer_highest_bid(self) -> str:
-        return str(truncate_to_n_decimal_places(self.online_offer_highest_bid, n=2))
+    key: str = xml_field(max_length=100)
+    vendor_identifier: Optional[str] = xml_field(max_length=40, default=None)
+    action: ApartmentAction = ApartmentAction.REMOVE
 
-    def format_time_of_completion(self) -> str:
-        return self.time_of_completion.strftime("%d.%m.%Y")
+    class Meta:
+        element_name = "Apartment"
+        case = Case.PASCAL
+        case_overrides = {"action": Case.CAMEL}
+        attributes = ["action"]
@@ -0,0 +1,204 @@
+"""
+Serializer functions generated per XMLModel class.
+
+XMLModel.to_etree_generic() goes through the fields of a model one by one and
+works out how to add each value to the element at runtime. For every class
+which doesn't override to_etree() or get_formatted_value(), compile_serializer()
+generates the source of
+a function doing the same with straight-line code: one block per field, in
+field order, with the element names, attribute/element choice and formatter of
+each field resolved when the function is generated.
+
+Settings:
+
+- OIKOTIE_COMPILED_SERIALIZERS: set to False to always use to_etree_generic()
+- OIKOTIE_SERIALIZER_CACHE_DIR: directory where the compiled code of the
+  generated functions is cached between processes
+- OIKOTIE_DEBUG_SERIALIZERS: log the source of each generated function
+"""
+import hashlib
+import linecache
+import logging
+import marshal
+import os
+import sys
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import (
+    Callable,
+    Literal,
+    Optional,
+    Union,
+    get_origin,
+    get_type_hints,
+)
+
+from lxml import etree
+
+from ..formatters import format_value
+from ..utils import unwrap_optional
+from . import XMLModel, append_value
+
+_logger = logging.getLogger(__name__)
+
+_SCALAR_TYPES = (str, int, float, bool, Decimal, date, datetime)
+
+
+def _get_setting(name: str, default=None):
+    from django.conf import settings
+
+    if not settings.configured:
+        return default
+    return getattr(settings, name, default)
+
+
+def _is_scalar(hint) -> bool:
+    """Whether values of the type are formatted to text by format_value()."""
+    if get_origin(hint) is Literal:
+        return True
+    return isinstance(hint, type) and (hint in _SCALAR_TYPES or issubclass(hint, Enum))
+
+
+def _is_model(hint) -> bool:
+    return isinstance(hint, type) and issubclass(hint, XMLModel)
+
+
+def generate_serializer_source(model_class: type) -> Optional[tuple]:
+    """
+    Return the source of the serializer function of the class and the
+    namespace it is executed in, or None if the class can't have one.
+    Classes overriding get_formatted_value() are left to to_etree_generic(),
+    which formats the values through it.
+    """
+    if model_class.to_etree is not XMLModel.to_etree:
+        return None
+    if model_class.get_formatted_value is not XMLModel.get_formatted_value:
+        return None
+    if not is_dataclass(model_class):
+        return None
+    try:
+        hints = get_type_hints(model_class)
+    except (NameError, TypeError):
+        hints = {}
+
+    methods, constraints = model_class._get_formatters()
+    attributes = getattr(model_class.Meta, "attributes", [])
+    namespace = {
+        "Element": etree.Element,
+        "SubElement": etree.SubElement,
+        "XMLModel": XMLModel,
+        "append_value": append_value,
+        "format_value": format_value,
+    }
+    # get_element_name() only reads the class Meta
+    get_element_name = model_class.get_element_name
+
+    function_name = f"serialize_{model_class.__name__}"
+    lines = [
+        f"def {function_name}(self):",
+        f"    root = Element({model_class.Meta.element_name!r})",
+    ]
+    for f in fields(model_class):
+        key = f.name
+        element_name = get_element_name(model_class, key)
+        is_attribute = key in attributes
+        hint = unwrap_optional(hints.get(key))
+        lines += [f"    value = self.{key}", "    if value is not None:"]
+
+        if key in methods:
+            namespace[f"method_{key}"] = methods[key]
+            body = [
+                f"append_value(root, {element_name!r}, {is_attribute}, "
+                f"method_{key}(self))"
+            ]
+        elif key in constraints and constraints[key] is not format_value:
+            # Compiled field constraints always format the value to text
+            namespace[f"format_{key}"] = constraints[key]
+            body = [_set_text(element_name, is_attribute, f"format_{key}(value)")]
+        elif _is_scalar(hint):
+            body = [_set_text(element_name, is_attribute, "format_value(value)")]
+        elif _is_model(hint) and not is_attribute:
+            body = [
+                "if isinstance(value, XMLModel):",
+                "    root.append(value.to_shared_etree())",
+                "else:",
+                f"    append_value(root, {element_name!r}, False, "
+                "format_value(value))",
+            ]
+        else:
+            body = [
+                f"append_value(root, {element_name!r}, {is_attribute}, "
+                "format_value(value))"
+            ]
+        lines += [f"        {line}" for line in body]
+    lines.append("    return root")
+    return "\n".join(lines) + "\n", namespace, function_name
+
+
+def _set_text(element_name: str, is_attribute: bool, expression: str) -> str:
+    if is_attribute:
+        return f"root.set({element_name!r}, {expression})"
+    return f"SubElement(root, {element_name!r}).text = {expression}"
+
+
+def _compile(source: str, filename: str):
+    cache_dir = _get_setting("OIKOTIE_SERIALIZER_CACHE_DIR")
+    if not cache_dir:
+        return compile(source, filename, "exec")
+
+    digest = hashlib.sha1(f"{filename}\n{source}".encode()).hexdigest()[:20]
+    cache_path = os.path.join(
+        cache_dir, f"{digest}.{sys.implementation.cache_tag}.marshal"
+    )
+    try:
+        with open(cache_path, "rb") as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    code = compile(source, filename, "exec")
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.temp"
+    with open(temp_path, "wb") as f:
+        marshal.dump(code, f)
+    os.replace(temp_path, cache_path)
+    return code
+
+
+def _exec(model_class: type, generated: tuple, kind: str) -> Callable:
+    source, namespace, function_name = generated
+    filename = f"<{kind} {model_class.__module__}.{model_class.__qualname__}>"
+    # Makes the generated lines show up in tracebacks
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    if _get_setting("OIKOTIE_DEBUG_SERIALIZERS", False):
+        _logger.info(f"{kind.capitalize()} of {model_class.__qualname__}:\n{source}")
+
+    exec(_compile(source, filename), namespace)
+    return namespace[function_name]
+
+
+def compile_serializer(model_class: type) -> Union[Callable, bool]:
+    """
+    Generate, compile and cache the serializer function of the class as
+    `model_class._serializer`. False is cached for classes serialized with
+    to_etree_generic().
+    """
+    generated = None
+    if _get_setting("OIKOTIE_COMPILED_SERIALIZERS", True):
+        generated = generate_serializer_source(model_class)
+    if generated is None:
+        model_class._serializer = False
+        return False
+
+    model_class._serializer = _exec(model_class, generated, "serializer")
+    model_class._serializer_source = generated[0]
+    return model_class._serializer
+
+
+def get_serializer_source(model_class: type) -> Optional[str]:
+    """Source of the serializer function generated for the class, if any."""
+    if model_class.__dict__.get("_serializer") is None:
+        compile_serializer(model_class)
+    return model_class.__dict__.get("_serializer_source")
@@ -5,35 +5,34 @@ from typing import List, Optional
 from lxml import etree
 
 from ..enums import ApartmentType, Availability, Case
-from ..utils import truncate_to_n_decimal_places
-from . import XMLModel
+from ..utils import format_date
+from . import ElementParts, TextElementModel, XMLModel, xml_field
 
 # Housing company picture models
 # ==========================================
 
 
 @dataclass
-class _BasePicture(XMLModel):
-    image_url: str
+class _BasePicture(TextElementModel):
+    image_url: str = xml_field(max_length=200)
     timestamp: Optional[datetime] = None
 
     def format_timestamp(self) -> str:
         if self.timestamp:
-            return self.timestamp.strftime("%Y%m%d%H%M%S")
+            return format_date(self.timestamp, "%Y%m%d%H%M%S")
 
-    def to_etree(self) -> etree._Element:
-        kwargs = {}
+    def get_parts(self) -> ElementParts:
+        attributes = {}
 
         timestamp_formatted = self.format_timestamp()
         if timestamp_formatted:
-            kwargs["timestamp"] = timestamp_formatted
+            attributes["timestamp"] = timestamp_formatted
 
-        element = etree.Element(self.Meta.element_name, **kwargs)
-        element.text = self.format_image_url()
-        return element
-
-    def format_image_url(self) -> str:
-        return self.image_url[:200]
+        return (
+            self.Meta.element_name,
+            attributes,
+            self.get_formatted_value("image_url"),
+        )
 
 
 @dataclass
@@ -56,27 +55,15 @@ class CityPlanPicture(_BasePicture):
 
 @dataclass
 class Address(XMLModel):
-    street: str
-    postal_code: str
-    city: str
-    region: Optional[str] = None
+    street: str = xml_field(max_length=100)
+    postal_code: str = xml_field(max_length=6)
+    city: str = xml_field(max_length=50)
+    region: Optional[str] = xml_field(max_length=100, default=None)
 
     class Meta:
         element_name = "address"
         case = Case.KEBAB
 
-    def format_street(self) -> str:
-        return self.street[:100]
-
-    def format_postal_code(self) -> str:
-        return self.postal_code[:6]
-
-    def format_city(self) -> str:
-        return self.city[:50]
-
-    def format_region(self) -> str:
-        return self.region[:100]
-
 
 @dataclass
 class Apartment(XMLModel):
@@ -102,7 +89,7 @@ class Builder(XMLModel):
 @dataclass
 class ConstructionDetails(XMLModel):
     construction_complete: bool
-    construction_company_name: Optional[str] = None
+    construction_company_name: Optional[str] = xml_field(max_length=100, default=None)
     estimated_completion_time: Optional[str] = None
     availability: Optional[Availability] = None
     funding_type: Optional[str] = None
@@ -111,66 +98,40 @@ class ConstructionDetails(XMLModel):
         element_name = "construction-details"
         case = Case.KEBAB
 
-    def format_construction_company_name(self) -> str:
-        return self.construction_company_name[:100]
-
 
 @dataclass
 class Coordinates(XMLModel):
-    x: float
-    y: float
+    x: float = xml_field(decimals=5, pad=True)
+    y: float = xml_field(decimals=5, pad=True)
 
     class Meta:
         element_name = "coordinates"
         case = Case.KEBAB
 
-    def format_x(self) -> str:
-        return "{:.5f}".format(truncate_to_n_decimal_places(self.x, n=5))
-
-    def format_y(self) -> str:
-        return "{:.5f}".format(truncate_to_n_decimal_places(self.y, n=5))
-
 
 @dataclass
 class MoreInfo(XMLModel):
-    url: str
-    link_text: Optional[str] = None
-    link_image_url: Optional[str] = None
+    url: str = xml_field(max_length=200)
+    link_text: Optional[str] = xml_field(max_length=50, default=None)
+    link_image_url: Optional[str] = xml_field(max_length=200, default=None)
 
     class Meta:
         element_name = "more-info"
         case = Case.KEBAB
         attributes = ["url"]
 
-    def format_url(self) -> str:
-        return self.url[:200]
-
-    def format_link_text(self) -> str:
-        return self.link_text[:50]
-
-    def format_link_image_url(self) -> str:
-        return self.link_image_url[:200]
-
 
 @dataclass
-class VirtualPresentation(XMLModel):
-    url: str
-    link_text: str
+class VirtualPresentation(TextElementModel):
+    url: str = xml_field(max_length=200)
+    link_text: str = xml_field(max_length=50)
 
     class Meta:
         element_name = "virtual-presentation"
         case = Case.KEBAB
 
-    def to_etree(self) -> etree._Element:
-        element = etree.Element(self.Meta.element_name, url=self.url)
-        element.text = self.link_text
-        return element
-
-    def format_url(self) -> str:
-        return self.url[:200]
-
-    def format_link_text(self) -> str:
-        return self.link_text[:50]
+    def get_parts(self) -> ElementParts:
+        return self.Meta.element_name, {"url": self.url}, self.link_text
 
 
 @dataclass
@@ -195,16 +156,18 @@ class RealEstateAgent(XMLModel):
 
 @dataclass
 class HousingCompany(XMLModel):
-    key: str
-    name: str
+    key: str = xml_field(max_length=100)
+    name: str = xml_field(max_length=100)
     real_estate_agent: RealEstateAgent
     apartment: Apartment
     address: Address
     publication_start_date: datetime
     publication_end_date: datetime
-    real_estate_code: Optional[str] = None
-    builder: Optional[List[Builder]] = None
-    presentation_text: Optional[str] = None
+    real_estate_code: Optional[str] = xml_field(max_length=200, default=None)
+    builder: Optional[Builder] = None
+    presentation_text: Optional[str] = xml_field(
+        max_length=10000, sanitize=True, default=None
+    )
     coordinates: Optional[Coordinates] = None
     construction_details: Optional[ConstructionDetails] = None
     pictures: Optional[List[Picture]] = None
@@ -215,31 +178,14 @@ class HousingCompany(XMLModel):
         element_name = "housing-company"
         case = Case.KEBAB
 
-    def format_key(self) -> str:
-        return self.key[:100]
-
-    def format_name(self) -> str:
-        return self.name[:100]
-
-    def format_real_estate_code(self) -> str:
-        return self.real_estate_code[:200]
-
-    def format_presentation_text(self) -> str:
-        return self.presentation_text[:10000]
-
     def _format_publication_date(self, name: str, value: datetime) -> etree._Element:
         element = etree.Element(name)
-        child_elements = {
-            "year": value.strftime("%Y"),
-            "month": value.strftime("%m"),
-            "day": value.strftime("%d"),
-            "hour": value.strftime("%H:%M"),
-        }
-
-        for key, value in child_elements.items():
-            child = etree.Element(key)
-            child.text = value
-            element.append(child)
+        # Render all parts with a single (memoized) strftime call
+        parts = format_date(value, "%Y %m %d %H:%M").split(" ")
+
+        for key, text in zip(("year", "month", "day", "hour"), parts):
+            child = etree.SubElement(element, key)
+            child.text = text
 
         return element
 
@@ -0,0 +1,98 @@
+import asyncio
+
+
+class AsyncFTPStandIn:
+    """
+    Local asyncio FTP server implementing the commands used by
+    `django_oikotie.async_oikotie`. Uploaded files are kept in `files`.
+    """
+
+    def __init__(self, user="user", passwd="secret", silent=False):
+        self.user = user
+        self.passwd = passwd
+        # A silent server accepts connections but never answers
+        self.silent = silent
+        self.files = {}
+        self.commands = []
+        self.server = None
+        self.port = None
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _open_data_server(self):
+        received = asyncio.get_running_loop().create_future()
+
+        async def handle_data(reader, writer):
+            received.set_result(await reader.read())
+            writer.close()
+
+        server = await asyncio.start_server(handle_data, "127.0.0.1", 0)
+        return server, received
+
+    async def _handle(self, reader, writer):
+        def reply(line):
+            writer.write(f"{line}\r\n".encode())
+
+        if self.silent:
+            await reader.read()
+            writer.close()
+            return
+
+        reply("220-Oikotie test server")
+        reply("220 Ready")
+        user = None
+        data = None
+        rename_from = None
+
+        while True:
+            line = (await reader.readline()).decode().rstrip("\r\n")
+            if not line:
+                break
+            command, _, argument = line.partition(" ")
+            self.commands.append(command)
+
+            if command == "USER":
+                user = argument
+                reply("331 Password required")
+            elif command == "PASS":
+                if user == self.user and argument == self.passwd:
+                    reply("230 Logged in")
+                else:
+                    reply("530 Login incorrect")
+            elif command == "TYPE":
+                reply("200 Type set")
+            elif command == "PASV":
+                data = await self._open_data_server()
+                port = data[0].sockets[0].getsockname()[1]
+                reply(f"227 Entering Passive Mode (127,0,0,1,{port >> 8},{port & 255})")
+            elif command == "STOR":
+                reply("150 Ok to send data")
+                server, received = data
+                self.files[argument] = await received
+                server.close()
+                reply("226 Transfer complete")
+            elif command == "RNFR":
+                if argument in self.files:
+                    rename_from = argument
+                    reply("350 Ready for RNTO")
+                else:
+                    reply("550 No such file")
+            elif command == "RNTO":
+                self.files[argument] = self.files.pop(rename_from)
+                reply("250 Rename successful")
+            elif command == "QUIT":
+                reply("221 Goodbye")
+                break
+            else:
+                reply("502 Command not implemented")
+            await writer.drain()
+
+        await writer.drain()
+        writer.close()
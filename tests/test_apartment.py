@@ -1,13 +1,18 @@
 # ruff: noqa: E501
 
-from datetime import date, datetime
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from os import path
+from unittest import mock
 
 import pytest
 from django.test import override_settings
 
+from django_oikotie.enums import ApartmentAction, Case
 from django_oikotie.oikotie import create_apartments
+from django_oikotie.xml_models import XMLModel, shared_fragments
+from django_oikotie.xml_models.apartment import ApartmentRemoval, City
 
 from .factories.apartment import (
     ApartmentFactory,
@@ -762,3 +767,76 @@ def test_appartment_xml_created(test_folder):
     ]
 
     assert all(item in test_xml for item in expected)
+
+
+def test__apartment__free_text_is_truncated_and_sanitized():
+    obj = MinimalApartmentFactory(
+        description="Valoisa\x0c koti " + "\u00e4" * 2000,
+        supplementary_information="x" * 2001,
+    )
+    xml = obj_to_xml_str(obj)
+    assert "<Description>Valoisa koti " + "\u00e4" * 1987 + "</Description>" in xml
+    assert "<SupplementaryInformation>" + "x" * 2000 + "<" in xml
+
+
+def test__apartment__shared_fragments_serialize_equal_nested_models_once():
+    city = CityFactory()
+    apartments = [
+        MinimalApartmentFactory(city=City(id=city.id, value=city.value))
+        for _ in range(3)
+    ]
+    expected = [obj_to_xml_str(obj) for obj in apartments]
+
+    with mock.patch.object(
+        City, "to_etree", autospec=True, side_effect=City.to_etree
+    ) as to_etree:
+        with shared_fragments():
+            xml = [obj_to_xml_str(obj) for obj in apartments]
+
+    assert xml == expected
+    assert to_etree.call_count == 1
+
+
+def test__apartment__intern_key():
+    city = CityFactory()
+    assert city.get_intern_key() == City(id=city.id, value=city.value).get_intern_key()
+    assert city.get_intern_key() != City(id=city.id, value="Other").get_intern_key()
+    assert MinimalApartmentFactory(pictures=[PictureFactory()]).get_intern_key() is None
+
+
+def test__apartment__intern_key_uses_field_names():
+    removal = ApartmentRemoval("a", "b")
+    # Filled in another order, as from the columns of a batch
+    swapped = object.__new__(ApartmentRemoval)
+    swapped.__dict__.update(
+        vendor_identifier="a", key="b", action=ApartmentAction.REMOVE
+    )
+    assert removal.get_intern_key() != swapped.get_intern_key()
+
+
+def test__apartment__intern_key_time_zone():
+    @dataclass
+    class Visibility(XMLModel):
+        start: datetime
+
+        class Meta:
+            element_name = "Visibility"
+            case = Case.PASCAL
+
+    utc = datetime(2020, 1, 1, 12, tzinfo=timezone.utc)
+    helsinki = utc.astimezone(timezone(timedelta(hours=2)))
+    assert utc == helsinki
+    assert Visibility(utc).get_intern_key() != Visibility(helsinki).get_intern_key()
+
+
+def test__apartment__to_etree_overrides():
+    obj = MinimalApartmentFactory(action=ApartmentAction.UPDATE)
+
+    element = obj.to_etree(overrides={"action": ApartmentAction.REMOVE, "title": "x"})
+
+    assert element.get("action") == "remove"
+    assert element.findtext("Title") == "x"
+    assert obj.action == ApartmentAction.UPDATE
+    assert obj.to_etree(overrides={"action": None}).get("action") is None
+    with pytest.raises(ValueError):
+        obj.to_etree(overrides={"unknown": 1})
@@ -0,0 +1,124 @@
+import asyncio
+import ftplib
+import threading
+from io import BytesIO
+
+import pytest
+from django.test import override_settings
+
+from django_oikotie.async_oikotie import AsyncFTP, async_send_items
+
+from .async_ftp import AsyncFTPStandIn
+
+
+def _ftp_settings(server):
+    return override_settings(
+        OIKOTIE_FTP_HOST="127.0.0.1",
+        OIKOTIE_FTP_PORT=server.port,
+        OIKOTIE_USER="user",
+        OIKOTIE_PASSWORD="secret",
+    )
+
+
+def test__async_send_items(test_folder):
+    (test_folder / "APT.xml").write_bytes(b"<Apartments/>" * 10000)
+
+    async def run():
+        async with AsyncFTPStandIn() as server:
+            with _ftp_settings(server):
+                await async_send_items(test_folder, "APT.xml")
+            return server
+
+    server = asyncio.run(run())
+    assert server.files == {"data/APT.xml": b"<Apartments/>" * 10000}
+    assert server.commands == [
+        "USER",
+        "PASS",
+        "TYPE",
+        "PASV",
+        "STOR",
+        "RNFR",
+        "RNTO",
+        "QUIT",
+    ]
+
+
+def test__async_send_items__concurrent_uploads(test_folder):
+    filenames = ["APT.xml", "HOUSINGCOMPANY.xml", "UPDATEAPT.xml"]
+    for filename in filenames:
+        (test_folder / filename).write_bytes(filename.encode())
+
+    async def run():
+        async with AsyncFTPStandIn() as server:
+            with _ftp_settings(server):
+                await asyncio.gather(
+                    *(async_send_items(test_folder, name) for name in filenames)
+                )
+            return server
+
+    server = asyncio.run(run())
+    assert server.files == {f"data/{name}": name.encode() for name in filenames}
+
+
+def test__async_ftp__storbinary_reads_off_the_event_loop():
+    class File(BytesIO):
+        def read(self, size=-1):
+            threads.add(threading.current_thread())
+            return super().read(size)
+
+    threads = set()
+
+    async def run():
+        async with AsyncFTPStandIn() as server:
+            async with AsyncFTP("127.0.0.1", "user", "secret", port=server.port) as s:
+                await s.storbinary("STOR a.xml", File(b"x" * 100), blocksize=30)
+            return server
+
+    server = asyncio.run(run())
+    assert server.files == {"a.xml": b"x" * 100}
+    assert threads and threading.main_thread() not in threads
+
+
+def test__async_ftp__login_failure():
+    async def run():
+        async with AsyncFTPStandIn() as server:
+            async with AsyncFTP("127.0.0.1", "user", "wrong", port=server.port):
+                pass
+
+    with pytest.raises(ftplib.error_perm):
+        asyncio.run(run())
+
+
+def test__async_ftp__timeout():
+    async def run():
+        async with AsyncFTPStandIn(silent=True) as server:
+            session = AsyncFTP(
+                "127.0.0.1", "user", "secret", port=server.port, timeout=0.1
+            )
+            async with session:
+                pass
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+
+
+def test__async_ftp__cancellation_closes_connection():
+    async def run():
+        async with AsyncFTPStandIn(silent=True) as server:
+            session = AsyncFTP(
+                "127.0.0.1", "user", "secret", port=server.port, timeout=None
+            )
+
+            async def connect():
+                async with session:
+                    pass
+
+            task = asyncio.create_task(connect())
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return session
+
+    session = asyncio.run(run())
+    assert session._writer is None
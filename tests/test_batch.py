@@ -0,0 +1,273 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from os import path
+from typing import List, Optional
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.test import override_settings
+from lxml import etree
+
+from django_oikotie.batch import ApartmentBatch, ModelBatch
+from django_oikotie.enums import ApartmentType, Case
+from django_oikotie.oikotie import create_apartments_from_batches
+from django_oikotie.xml_models import (
+    ElementParts,
+    TextElementModel,
+    XMLModel,
+    xml_field,
+)
+from django_oikotie.xml_models.apartment import Apartment, City
+
+from .factories.apartment import ApartmentFactory, MinimalApartmentFactory
+
+
+@dataclass
+class Label(XMLModel):
+    text: str = xml_field(max_length=5)
+    color: Optional[str] = None
+
+    class Meta:
+        element_name = "label"
+        case = Case.KEBAB
+        attributes = ["color"]
+
+
+@dataclass
+class Code(XMLModel):
+    codename: str
+    label: Optional[Label] = None
+    price: Optional[Decimal] = None
+
+    class Meta:
+        element_name = "code"
+        case = Case.KEBAB
+
+
+@dataclass
+class Tag(TextElementModel):
+    name: str
+    flags: List[str] = field(default_factory=list)
+    lang: str = "fi"
+
+    class Meta:
+        element_name = "tag"
+        case = Case.KEBAB
+
+    def get_parts(self) -> ElementParts:
+        attributes = {"lang": self.lang, "flags": ",".join(self.flags)}
+        return "tag", attributes, self.get_formatted_value("name")
+
+
+@dataclass
+class Tagged(XMLModel):
+    codename: str
+    tag: Optional[Tag] = None
+
+    class Meta:
+        element_name = "tagged"
+        case = Case.KEBAB
+
+
+class CodeBatch(ModelBatch):
+    model = Code
+
+
+def to_strings(elements):
+    return [etree.tostring(element) for element in elements]
+
+
+def test__apartment_batch__matches_to_etree():
+    apartments = ApartmentFactory.build_batch(5) + MinimalApartmentFactory.build_batch(
+        3
+    )
+    batch = ApartmentBatch.from_models(apartments)
+
+    assert "living_area__area" in batch.columns
+    assert len(batch) == 8
+    assert to_strings(batch.to_etrees()) == to_strings(
+        apartment.to_etree() for apartment in apartments
+    )
+
+
+def test__batch__from_rows():
+    batch = CodeBatch.from_rows(
+        ("codename", "label__text", "label__color"),
+        [("a", "abcdefg", "red"), ("b", None, None)],
+        price=Decimal("1.5"),
+    )
+
+    assert to_strings(batch.to_etrees()) == [
+        b'<code><codename>a</codename><label color="red"><text>abcde</text></label>'
+        b"<price>1.5</price></code>",
+        b"<code><codename>b</codename><price>1.5</price></code>",
+    ]
+    assert to_strings(batch.to_etrees()) == to_strings(
+        [
+            Code("a", Label("abcdefg", "red"), Decimal("1.5")).to_etree(),
+            Code("b", None, Decimal("1.5")).to_etree(),
+        ]
+    )
+
+
+def test__batch__nested_model_column():
+    batch = CodeBatch({"codename": ["a", "b"], "label": [Label("x"), None]})
+
+    assert to_strings(batch.to_etrees()) == [
+        b"<code><codename>a</codename><label><text>x</text></label></code>",
+        b"<code><codename>b</codename></code>",
+    ]
+
+
+def test__batch__hand_written_nested_model():
+    batch = ApartmentBatch.from_models(MinimalApartmentFactory.build_batch(2))
+    batch.columns["city__id"] = [1, 2]
+    batch.columns["city__value"] = ["Helsinki", "Espoo"]
+
+    elements = batch.to_etrees()
+
+    assert [element.find("City").text for element in elements] == [
+        "Helsinki",
+        "Espoo",
+    ]
+    assert City(2, "Espoo").to_etree().attrib == elements[1].find("City").attrib
+
+
+def test__batch__text_element_model_from_sub_columns():
+    class TaggedBatch(ModelBatch):
+        model = Tagged
+
+    batch = TaggedBatch({"codename": ["a", "b"], "tag__name": ["x", None]})
+    with mock.patch.object(
+        Tag, "get_parts", autospec=True, side_effect=Tag.get_parts
+    ) as get_parts:
+        elements = batch.to_etrees()
+
+    # The elements are built from get_parts() without Tag objects
+    assert get_parts.call_count == 1
+    assert not isinstance(get_parts.call_args.args[0], Tag)
+
+    assert to_strings(elements) == to_strings(
+        [Tagged("a", Tag("x")).to_etree(), Tagged("b").to_etree()]
+    )
+    assert elements[0].find("tag").attrib == {"lang": "fi", "flags": ""}
+
+
+def test__batch__empty():
+    assert CodeBatch.from_rows(("codename",), []).to_etrees() == []
+
+
+@pytest.mark.parametrize(
+    "columns,error",
+    [
+        ({"codename": ["a"], "unknown": [1]}, "Code has no field unknown"),
+        ({"codename": ["a"], "price__value": [1]}, "Code.price is not a nested"),
+        ({"codename": ["a", "b"], "price": [1]}, "different lengths"),
+        ({"price": [1]}, "required field codename is missing"),
+        (
+            {"codename": ["a"], "label": [None], "label__text": ["x"]},
+            "label is given both",
+        ),
+        ({"codename": ["a"], "label__color": ["red"]}, "required field text"),
+    ],
+)
+def test__batch__invalid_columns(columns, error):
+    with pytest.raises(ValueError, match=error):
+        CodeBatch(columns)
+
+
+@dataclass
+class PostInit(XMLModel):
+    codename: str
+
+    class Meta:
+        element_name = "post-init"
+        case = Case.KEBAB
+
+    def __post_init__(self):
+        self.codename = self.codename.upper()
+
+
+@dataclass
+class OwnFormatting(XMLModel):
+    codename: str
+
+    class Meta:
+        element_name = "own-formatting"
+        case = Case.KEBAB
+
+    def get_formatted_value(self, key):
+        return super().get_formatted_value(key).upper()
+
+
+@pytest.mark.parametrize(
+    "model,error",
+    [(PostInit, "has __post_init__"), (OwnFormatting, "own get_formatted_value")],
+)
+def test__batch__unsupported_models(model, error):
+    class UnsupportedBatch(ModelBatch):
+        pass
+
+    UnsupportedBatch.model = model
+    with pytest.raises(ValueError, match=error):
+        UnsupportedBatch({"codename": ["a"]})
+
+
+def test__batch__model_with_own_to_etree():
+    class CityBatch(ModelBatch):
+        model = City
+
+    with pytest.raises(ValueError, match="has its own to_etree"):
+        CityBatch({"id": [1], "value": ["Helsinki"]})
+
+
+@pytest.mark.django_db
+def test__batch__from_values_list():
+    queryset = Permission.objects.order_by("pk")
+
+    batches = list(
+        CodeBatch.from_values_list(
+            queryset,
+            {"codename": "codename", "label__text": "content_type__model"},
+            chunk_size=10,
+        )
+    )
+
+    assert [len(batch) for batch in batches[:-1]] == [10] * (len(batches) - 1)
+    elements = [element for batch in batches for element in batch.to_etrees()]
+    assert [element.findtext("codename") for element in elements] == list(
+        queryset.values_list("codename", flat=True)
+    )
+
+
+@override_settings(OIKOTIE_COMPANY_NAME="ATT", OIKOTIE_ENTRYPOINT="test")
+def test__create_apartments_from_batches(tmp_path):
+    apartments = ApartmentFactory.build_batch(4)
+    batches = [
+        ApartmentBatch.from_models(apartments[:2]),
+        ApartmentBatch.from_models(apartments[2:]),
+    ]
+
+    filename = create_apartments_from_batches(batches, file_path=tmp_path)
+
+    root = etree.parse(path.join(tmp_path, filename)).getroot()
+    assert root.tag == "Apartments"
+    assert to_strings(root) == to_strings(
+        apartment.to_etree() for apartment in apartments
+    )
+
+
+def test__apartment_batch__constants():
+    apartment = MinimalApartmentFactory.build(type=ApartmentType.BLOCK_OF_FLATS)
+    columns = ApartmentBatch.from_models([apartment]).columns
+    names = [name for name in columns if name != "type"]
+
+    batch = ApartmentBatch.from_rows(
+        names,
+        [tuple(columns[name][0] for name in names)],
+        type=ApartmentType.BLOCK_OF_FLATS,
+    )
+
+    assert to_strings(batch.to_etrees()) == [etree.tostring(apartment.to_etree())]
+    assert batch.model is Apartment
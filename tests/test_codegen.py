@@ -0,0 +1,157 @@
+import os
+import types
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from lxml import etree
+
+from django_oikotie.codegen import generate_models, read_schema
+from django_oikotie.prevalidation import validate_record
+
+from .utils import get_tests_base_path
+
+SCHEMA_PATH = os.path.join(get_tests_base_path(), "test_files", "codegen.rng")
+
+
+def _load(source) -> types.ModuleType:
+    module = types.ModuleType("generated_models")
+    exec(compile(source, "generated_models.py", "exec"), module.__dict__)
+    return module
+
+
+@pytest.fixture(scope="module")
+def models():
+    return _load(generate_models(SCHEMA_PATH))
+
+
+def _apartment(models, **kwargs):
+    return models.Apartment(
+        **{
+            "type": "KT",
+            "key": "A1",
+            "city": models.City(91, "Helsinki"),
+            **kwargs,
+        }
+    )
+
+
+def test__read_schema():
+    specs = {model.class_name: model for model in read_schema(SCHEMA_PATH)}
+    assert list(specs) == ["City", "SalesPrice", "Picture", "DebtPayable", "Apartment"]
+    apartment = {f.name: f for f in specs["Apartment"].fields}
+    assert apartment["key"].value.max_length == 100
+    assert apartment["latitude"].value.decimals == 5
+    assert apartment["picture"].repeated and not apartment["picture"].required
+    assert apartment["new_houses"].kind == "attribute"
+
+
+def test__generated_models__serialize_valid_xml(models):
+    apartment = _apartment(
+        models,
+        new_houses=True,
+        street_address="Mannerheimintie 1",
+        latitude=Decimal("60.1733244"),
+        floors=4,
+        date_when_available=date(2024, 5, 1),
+        sales_price=models.SalesPrice("EUR", Decimal("123456.789")),
+        picture=[models.Picture(1, "https://a"), models.Picture(2, "https://b")],
+        tag=["a", "b"],
+        debt_payable=models.DebtPayable(False),
+    )
+    root = etree.Element("Apartments")
+    root.append(apartment.to_etree())
+
+    schema = etree.RelaxNG(etree.parse(SCHEMA_PATH))
+    assert schema.validate(root), schema.error_log
+    assert etree.tostring(apartment.to_etree()).decode() == (
+        '<Apartment type="KT" newHouses="K">'
+        "<Key>A1</Key>"
+        "<StreetAddress>Manne</StreetAddress>"
+        "<Latitude>60.17332</Latitude>"
+        "<Floors>4</Floors>"
+        "<DateWhenAvailable>2024-05-01</DateWhenAvailable>"
+        '<City id="91">Helsinki</City>'
+        '<SalesPrice currency="EUR">123456.78</SalesPrice>'
+        '<Picture index="1">https://a</Picture>'
+        '<Picture index="2">https://b</Picture>'
+        "<Tag>a</Tag><Tag>b</Tag>"
+        '<DebtPayable value="E"/>'
+        "</Apartment>"
+    )
+
+
+def test__generated_models__minimal_and_overrides(models):
+    apartment = _apartment(models)
+    assert etree.tostring(apartment.to_etree(overrides={"type": "RT"})) == (
+        b'<Apartment type="RT"><Key>A1</Key><City id="91">Helsinki</City></Apartment>'
+    )
+    assert apartment.type == "KT"
+
+
+def test__generated_models__constraints_drive_prevalidation(models):
+    apartment = _apartment(models, type="XX", latitude=Decimal("91"), floors=None)
+    assert validate_record(apartment) == [
+        "type must be one of ('KT', 'RT'), not 'XX'",
+        "latitude must be between -90 and 90, not 91",
+    ]
+
+
+def test__generate_models__overrides():
+    source = generate_models(
+        SCHEMA_PATH, {"Picture": "django_oikotie.xml_models.apartment.Picture"}
+    )
+    assert "from django_oikotie.xml_models.apartment import Picture" in source
+    assert "class Picture(" not in source
+    assert "picture: Optional[List[Picture]] = None" in source
+    assert _load(source).Picture.__module__ == "django_oikotie.xml_models.apartment"
+
+
+def test__oikotie_generate_models_command(tmp_path):
+    out = StringIO()
+    call_command("oikotie_generate_models", SCHEMA_PATH, stdout=out)
+    assert out.getvalue() == generate_models(SCHEMA_PATH)
+
+    output = tmp_path / "models.py"
+    call_command(
+        "oikotie_generate_models",
+        SCHEMA_PATH,
+        "--override",
+        "City=myapp.models.City",
+        "--output",
+        str(output),
+    )
+    assert "from myapp.models import City" in output.read_text()
+
+    with pytest.raises(CommandError):
+        call_command("oikotie_generate_models", SCHEMA_PATH, "--override", "City")
+
+
+def test__generate_models__numeric_bounds_only(tmp_path):
+    schema_path = tmp_path / "bounds.rng"
+    schema_path.write_text(
+        """<element name="Apartments" xmlns="http://relaxng.org/ns/structure/1.0"
+         datatypeLibrary="http://www.w3.org/2001/XMLSchema-datatypes">
+  <element name="Apartment">
+    <element name="Floors">
+      <data type="int"><param name="minInclusive">007</param></data>
+    </element>
+    <element name="Area">
+      <data type="decimal"><param name="maxInclusive">0100.50</param></data>
+    </element>
+    <element name="Available">
+      <data type="date"><param name="minInclusive">2000-01-01</param></data>
+    </element>
+  </element>
+</element>"""
+    )
+
+    source = generate_models(str(schema_path))
+
+    assert "min_value=7" in source
+    assert "max_value=100.50" in source
+    assert "2000-01-01" not in source
+    apartment = _load(source).Apartment(floors=3, area=1, available=date(1999, 1, 1))
+    assert validate_record(apartment) == ["floors must be between 7 and None, not 3"]
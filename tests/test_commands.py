@@ -0,0 +1,112 @@
+import os
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from lxml import etree
+
+from tests.utils import get_tests_base_path
+
+from .factories.apartment import MinimalApartmentFactory
+from .factories.housing_company import HousingCompanyFactory
+
+APARTMENTS = MinimalApartmentFactory.build_batch(7)
+HOUSING_COMPANIES = HousingCompanyFactory.build_batch(2)
+
+
+def get_apartments():
+    return iter(APARTMENTS)
+
+
+def get_housing_companies():
+    return HOUSING_COMPANIES
+
+
+pytestmark = pytest.mark.usefixtures("push_settings")
+
+
+@pytest.fixture
+def push_settings():
+    with override_settings(
+        OIKOTIE_COMPANY_NAME="ATT",
+        OIKOTIE_ENTRYPOINT="test",
+        OIKOTIE_SCHEMA_DIR=os.path.join(get_tests_base_path(), "schemas"),
+        OIKOTIE_APARTMENTS_PROVIDER="tests.test_commands.get_apartments",
+        OIKOTIE_HOUSING_COMPANIES_PROVIDER="tests.test_commands.get_housing_companies",
+    ):
+        yield
+
+
+def _push(folder, *args):
+    out = StringIO()
+    with mock.patch(
+        "django_oikotie.management.commands.oikotie_push.send_items"
+    ) as send_items:
+        call_command("oikotie_push", "--output-dir", str(folder), *args, stdout=out)
+    (filename,) = os.listdir(folder)
+    return filename, out.getvalue(), send_items
+
+
+def test__oikotie_push__apartments(test_folder):
+    filename, output, send_items = _push(test_folder)
+
+    assert filename.startswith("APTATT.test.")
+    root = etree.parse(os.path.join(test_folder, filename)).getroot()
+    assert root.tag == "Apartments"
+    assert [e.findtext("Key") for e in root] == [a.key for a in APARTMENTS]
+    send_items.assert_called_once_with(str(test_folder), filename)
+    assert f"{filename}: 7 items" in output
+    for stage in ("load", "serialize", "upload", "total"):
+        assert stage in output
+
+
+def test__oikotie_push__housing_companies(test_folder):
+    filename, _, _ = _push(test_folder, "--feed", "housing-companies", "--dry-run")
+
+    assert filename.startswith("HOUSINGCOMPANY")
+    root = etree.parse(os.path.join(test_folder, filename)).getroot()
+    assert [e.findtext("key") for e in root] == [h.key for h in HOUSING_COMPANIES]
+
+
+def test__oikotie_push__parallel_output_is_identical(tmp_path):
+    sequential = tmp_path / "sequential"
+    parallel = tmp_path / "parallel"
+    sequential.mkdir()
+    parallel.mkdir()
+
+    filename, _, send_items = _push(sequential, "--dry-run")
+    parallel_filename, _, _ = _push(
+        parallel, "--dry-run", "--jobs", "2", "--shard-size", "2"
+    )
+
+    send_items.assert_not_called()
+    assert (sequential / filename).read_bytes() == (
+        parallel / parallel_filename
+    ).read_bytes()
+
+
+def test__oikotie_push__invalid_file_is_not_uploaded(test_folder):
+    # The test schemas don't describe real apartments
+    with pytest.raises(CommandError):
+        _push(test_folder, "--validate")
+
+
+@override_settings(OIKOTIE_APARTMENTS_PROVIDER=None)
+def test__oikotie_push__provider_is_required(test_folder):
+    with pytest.raises(CommandError):
+        call_command("oikotie_push", "--output-dir", str(test_folder))
+
+
+def test__oikotie_push__quarantine(test_folder, tmp_path):
+    report_path = tmp_path / "quarantine.jsonl"
+    broken = MinimalApartmentFactory.build(street_address=12345)
+    with mock.patch(
+        "tests.test_commands.get_apartments", lambda: iter([broken, *APARTMENTS])
+    ):
+        filename, output, _ = _push(test_folder, "--quarantine", str(report_path))
+
+    root = etree.parse(os.path.join(test_folder, filename)).getroot()
+    assert len(root) == len(APARTMENTS)
+    assert f"1 items quarantined to {report_path}" in output
@@ -0,0 +1,181 @@
+import inspect
+import logging
+from dataclasses import dataclass
+from typing import Optional
+from unittest import mock
+
+import factory
+import pytest
+from django.test import override_settings
+from lxml import etree
+
+from django_oikotie.enums import ApartmentAction, Case
+from django_oikotie.xml_models import (
+    TextElementModel,
+    XMLModel,
+    xml_field,
+)
+from django_oikotie.xml_models.apartment import (
+    Apartment,
+    City,
+)
+from django_oikotie.xml_models.compiler import (
+    compile_serializer,
+    get_serializer_source,
+)
+
+from .factories import apartment as apartment_factories
+from .factories import housing_company as housing_company_factories
+
+ALL_FACTORIES = [
+    factory_class
+    for module in (apartment_factories, housing_company_factories)
+    for _, factory_class in inspect.getmembers(module, inspect.isclass)
+    if issubclass(factory_class, factory.Factory)
+    and factory_class.__module__ == module.__name__
+]
+FACTORIES = [
+    factory_class
+    for factory_class in ALL_FACTORIES
+    # Models with a hand-written to_etree have no generated serializer
+    if get_serializer_source(factory_class._meta.model) is not None
+]
+
+
+@dataclass
+class Listing(XMLModel):
+    key: str = xml_field(max_length=3)
+    city: Optional[City] = None
+    action: Optional[ApartmentAction] = None
+
+    class Meta:
+        element_name = "Listing"
+        case = Case.PASCAL
+        case_overrides = {"action": Case.CAMEL}
+        attributes = ["action"]
+
+
+@pytest.mark.parametrize("factory_class", FACTORIES, ids=lambda f: f.__name__)
+def test__compiled_serializers__match_generic_path(factory_class):
+    for item in factory_class.build_batch(3):
+        assert etree.tostring(item.to_etree()) == etree.tostring(
+            item.to_etree_generic()
+        )
+
+
+def test__compiled_serializers__minimal_apartment_matches_generic_path():
+    item = apartment_factories.MinimalApartmentFactory.build()
+    assert etree.tostring(item.to_etree()) == etree.tostring(item.to_etree_generic())
+
+
+def test__compiled_serializer__source():
+    source = get_serializer_source(Listing)
+    assert source == (
+        "def serialize_Listing(self):\n"
+        "    root = Element('Listing')\n"
+        "    value = self.key\n"
+        "    if value is not None:\n"
+        "        SubElement(root, 'Key').text = format_key(value)\n"
+        "    value = self.city\n"
+        "    if value is not None:\n"
+        "        if isinstance(value, XMLModel):\n"
+        "            root.append(value.to_shared_etree())\n"
+        "        else:\n"
+        "            append_value(root, 'City', False, format_value(value))\n"
+        "    value = self.action\n"
+        "    if value is not None:\n"
+        "        root.set('action', format_value(value))\n"
+        "    return root\n"
+    )
+    listing = Listing("abcd", City(1, "Helsinki"), ApartmentAction.UPDATE)
+    assert etree.tostring(listing.to_etree()) == (
+        b'<Listing action="update"><Key>abc</Key><City id="1">Helsinki</City>'
+        b"</Listing>"
+    )
+    # Overrides use the generic path
+    element = listing.to_etree(overrides={"action": ApartmentAction.REMOVE})
+    assert element.get("action") == "remove"
+
+
+def test__compiled_serializer__custom_to_etree_is_kept():
+    assert get_serializer_source(City) is None
+    assert get_serializer_source(Apartment) is not None
+
+
+def test__compiled_serializer__get_formatted_value_override_is_kept():
+    @dataclass
+    class Upper(XMLModel):
+        key: str
+        action: Optional[ApartmentAction] = None
+
+        class Meta:
+            element_name = "Upper"
+            case = Case.PASCAL
+            attributes = ["action"]
+
+        def get_formatted_value(self, key):
+            return super().get_formatted_value(key).upper()
+
+    expected = b'<Upper Action="UPDATE"><Key>A</Key></Upper>'
+    assert get_serializer_source(Upper) is None
+    assert etree.tostring(Upper("a", ApartmentAction.UPDATE).to_etree()) == expected
+    with override_settings(OIKOTIE_COMPILED_SERIALIZERS=False):
+        element = Upper("a", ApartmentAction.UPDATE).to_etree_generic()
+    assert etree.tostring(element) == expected
+
+
+def test__compiled_serializer__debug_and_cache(tmp_path, caplog):
+    cache_dir = tmp_path / "serializers"
+    with override_settings(
+        OIKOTIE_SERIALIZER_CACHE_DIR=str(cache_dir), OIKOTIE_DEBUG_SERIALIZERS=True
+    ), caplog.at_level(logging.INFO):
+        compile_serializer(Listing)
+        assert "def serialize_Listing(self):" in caplog.text
+        assert len(list(cache_dir.iterdir())) == 1
+
+        with mock.patch(
+            "django_oikotie.xml_models.compiler.compile", create=True
+        ) as compile_mock:
+            serializer = compile_serializer(Listing)
+        compile_mock.assert_not_called()
+    assert (
+        etree.tostring(serializer(Listing("a"))) == b"<Listing><Key>a</Key></Listing>"
+    )
+
+
+def test__compiled_serializer__disabled():
+    @dataclass
+    class Plain(XMLModel):
+        key: str
+
+        class Meta:
+            element_name = "Plain"
+            case = Case.PASCAL
+
+    with override_settings(OIKOTIE_COMPILED_SERIALIZERS=False):
+        assert compile_serializer(Plain) is False
+    assert etree.tostring(Plain("a").to_etree()) == b"<Plain><Key>a</Key></Plain>"
+
+
+def test__text_element_model__to_etree_overrides():
+    city = City(1, "Helsinki")
+
+    element = city.to_etree(overrides={"value": "Espoo"})
+
+    assert etree.tostring(element) == b'<City id="1">Espoo</City>'
+    assert city.value == "Helsinki"
+    with pytest.raises(ValueError):
+        city.to_etree(overrides={"unknown": 1})
+
+
+def test__text_element_model__get_parts_is_abstract():
+    @dataclass
+    class Partless(TextElementModel):
+        value: str
+
+        class Meta:
+            element_name = "Partless"
+            case = Case.PASCAL
+
+    with pytest.raises(TypeError):
+        Partless("a")
@@ -0,0 +1,109 @@
+import dataclasses
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from lxml import etree
+
+from django_oikotie.delta import iter_delta, push_delta, write_delta
+from django_oikotie.enums import DeltaStatus
+from django_oikotie.state import PushStateStore
+
+from .factories.apartment import MinimalApartmentFactory
+
+pytestmark = pytest.mark.usefixtures("feed_settings")
+
+
+@pytest.fixture
+def feed_settings():
+    with override_settings(OIKOTIE_COMPANY_NAME="ATT", OIKOTIE_ENTRYPOINT="test"):
+        yield
+
+
+@pytest.fixture
+def store(test_folder):
+    with PushStateStore(str(test_folder / "state.sqlite3")) as store:
+        yield store
+
+
+def _apartments(count):
+    return sorted(
+        MinimalApartmentFactory.build_batch(count), key=lambda apartment: apartment.key
+    )
+
+
+def test__iter_delta():
+    current = [("a", "1", "A"), ("b", "2", "B"), ("d", "4", "D")]
+    pushed = [("b", "2"), ("c", "3"), ("d", "5"), ("e", "6")]
+
+    assert list(iter_delta(current, pushed)) == [
+        (DeltaStatus.NEW, "a", "A"),
+        (DeltaStatus.UNCHANGED, "b", "B"),
+        (DeltaStatus.REMOVED, "c", None),
+        (DeltaStatus.CHANGED, "d", "D"),
+        (DeltaStatus.REMOVED, "e", None),
+    ]
+
+
+@pytest.mark.parametrize(
+    "current,pushed",
+    [
+        ([("b", "1", None), ("a", "1", None)], []),
+        ([], [("a", "1"), ("a", "1")]),
+    ],
+)
+def test__iter_delta__requires_ordered_keys(current, pushed):
+    with pytest.raises(ValueError):
+        list(iter_delta(current, pushed))
+
+
+def _read_actions(test_folder, filename):
+    root = etree.parse(str(test_folder / filename)).getroot()
+    return [(element.findtext("Key"), element.get("action")) for element in root]
+
+
+def test__write_delta(store, test_folder):
+    apartments = _apartments(4)
+    result = write_delta(apartments, store, test_folder)
+    assert result.counts[DeltaStatus.NEW] == 4
+    store.record_file(str(test_folder / result.filename), result.filename)
+
+    changed = dataclasses.replace(apartments[1], street_address="Changed")
+    current = [apartments[0], changed, apartments[3]]
+    result = write_delta(current, store, test_folder)
+
+    assert result.counts == {
+        DeltaStatus.NEW: 0,
+        DeltaStatus.CHANGED: 1,
+        DeltaStatus.UNCHANGED: 2,
+        DeltaStatus.REMOVED: 1,
+    }
+    assert _read_actions(test_folder, result.filename) == [
+        (changed.key, "update"),
+        (apartments[2].key, "remove"),
+    ]
+
+
+def test__write_delta__writer_fails_before_creating_file(store, test_folder):
+    with mock.patch(
+        "django_oikotie.delta.get_writer", side_effect=PermissionError("denied")
+    ):
+        with pytest.raises(PermissionError, match="denied"):
+            write_delta(_apartments(2), store, test_folder)
+
+    assert not list(test_folder.glob("*.xml*"))
+
+
+def test__push_delta(store, test_folder):
+    apartments = _apartments(2)
+    with mock.patch("django_oikotie.oikotie.get_session") as get_session:
+        result = push_delta(apartments, store, test_folder)
+        assert len(store) == 2
+
+        # Nothing changed since the last push
+        unchanged = push_delta(apartments, store, test_folder)
+
+    assert get_session.call_count == 1
+    assert unchanged.filename is None
+    assert unchanged.counts[DeltaStatus.UNCHANGED] == 2
+    assert [file.name for file in test_folder.glob("*.xml")] == [result.filename]
@@ -0,0 +1,120 @@
+from django_oikotie.diff import diff_feeds, iter_feed_records
+from django_oikotie.enums import RecordDiffStatus
+
+OLD_FEED = b"""<?xml version='1.0' encoding='utf-8'?>
+<Apartments>
+  <Apartment type="KT" newHouses="E">
+    <Key>a</Key>
+    <StreetAddress>Street 1</StreetAddress>
+  </Apartment>
+  <Apartment type="KT" newHouses="E">
+    <Key>b</Key>
+    <StreetAddress>Street 2</StreetAddress>
+    <Title>Old title</Title>
+  </Apartment>
+  <Apartment type="KT" newHouses="E">
+    <Key>c</Key>
+    <StreetAddress>Street 3</StreetAddress>
+  </Apartment>
+</Apartments>
+"""
+
+NEW_FEED = b"""<?xml version='1.0' encoding='utf-8'?>
+<Apartments><Apartment type="KT" newHouses="K"><Key>b</Key><StreetAddress>Street 2</StreetAddress><Description>New</Description></Apartment><Apartment type="KT" newHouses="E"><Key>c</Key><StreetAddress>Street 3</StreetAddress></Apartment><Apartment type="RT" newHouses="E"><Key>d</Key><StreetAddress>Street 4</StreetAddress></Apartment></Apartments>
+"""  # noqa: E501
+
+
+def _write(folder, name, content):
+    path = folder / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test__iter_feed_records(test_folder):
+    path = _write(test_folder, "old.xml", OLD_FEED)
+    assert [key for key, _ in iter_feed_records(path)] == ["a", "b", "c"]
+
+
+def test__iter_feed_records__housing_companies(test_folder):
+    path = _write(
+        test_folder,
+        "hc.xml",
+        b"<housing-companies><housing-company><key>x</key></housing-company>"
+        b"</housing-companies>",
+    )
+    assert [key for key, _ in iter_feed_records(path)] == ["x"]
+
+
+def test__diff_feeds(test_folder):
+    old_path = _write(test_folder, "old.xml", OLD_FEED)
+    new_path = _write(test_folder, "new.xml", NEW_FEED)
+
+    diffs = list(diff_feeds(old_path, new_path, index_dir=str(test_folder)))
+
+    assert [(d.key, d.status) for d in diffs] == [
+        ("a", RecordDiffStatus.REMOVED),
+        ("b", RecordDiffStatus.CHANGED),
+        ("d", RecordDiffStatus.ADDED),
+    ]
+    assert diffs[1].changes == {
+        "@newHouses": ("E", "K"),
+        "Title": ("Old title", None),
+        "Description": (None, "New"),
+    }
+
+
+def test__diff_feeds__identical_files(test_folder):
+    old_path = _write(test_folder, "old.xml", OLD_FEED)
+    new_path = _write(test_folder, "new.xml", OLD_FEED)
+
+    assert list(diff_feeds(old_path, new_path)) == []
+
+
+def test__diff_feeds__nested_element_formatting_is_ignored(test_folder):
+    old_path = _write(
+        test_folder,
+        "old.xml",
+        b"""<Apartments>
+  <Apartment>
+    <Key>a</Key>
+    <Estate type="E" extra="1">
+      <Name>x</Name>
+    </Estate>
+  </Apartment>
+</Apartments>""",
+    )
+    new_path = _write(
+        test_folder,
+        "new.xml",
+        b'<Apartments><Apartment><Key>a</Key><Estate extra="1" type="E">'
+        b"<Name>x</Name></Estate></Apartment></Apartments>",
+    )
+
+    assert list(diff_feeds(old_path, new_path)) == []
+
+
+def test__diff_feeds__duplicate_keys(test_folder):
+    old_path = _write(
+        test_folder,
+        "old.xml",
+        b"<Apartments><Apartment><Key>a</Key></Apartment>"
+        b"<Apartment><Key>b</Key><Title>1</Title></Apartment>"
+        b"<Apartment><Key>b</Key><Title>2</Title></Apartment>"
+        b"<Apartment><Key>c</Key></Apartment></Apartments>",
+    )
+    new_path = _write(
+        test_folder,
+        "new.xml",
+        b"<Apartments><Apartment><Key>a</Key></Apartment>"
+        b"<Apartment><Key>a</Key></Apartment>"
+        b"<Apartment><Key>b</Key><Title>2</Title></Apartment>"
+        b"<Apartment><Key>d</Key></Apartment>"
+        b"<Apartment><Key>d</Key></Apartment></Apartments>",
+    )
+
+    assert [(d.key, d.status) for d in diff_feeds(old_path, new_path)] == [
+        ("a", RecordDiffStatus.DUPLICATE),
+        ("b", RecordDiffStatus.DUPLICATE),
+        ("c", RecordDiffStatus.REMOVED),
+        ("d", RecordDiffStatus.DUPLICATE),
+    ]
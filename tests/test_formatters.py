@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Optional
+
+import pytest
+from lxml import etree
+
+from django_oikotie.enums import ApartmentAction, Case
+from django_oikotie.formatters import (
+    format_value,
+    get_formatter,
+    register_formatter,
+    unregister_formatter,
+)
+from django_oikotie.xml_models import XMLModel, xml_field
+from django_oikotie.xml_models.apartment import City
+
+
+class Money:
+    def __init__(self, cents):
+        self.cents = cents
+
+
+class IntEnum(int, Enum):
+    ONE = 1
+
+
+class StrEnum(str, Enum):
+    A = "a"
+
+
+@dataclass
+class Listing(XMLModel):
+    price: Money
+    completed: date
+
+    class Meta:
+        element_name = "Listing"
+        case = Case.PASCAL
+
+
+@dataclass
+class Constrained(XMLModel):
+    name: str = xml_field(max_length=3)
+    text: str = xml_field(max_length=4, sanitize=True)
+    area: float = xml_field(decimals=2, pad=True)
+    shown: date = xml_field(date_format="%Y%m%d")
+    sold: int = xml_field(yes_no=True)
+    note: Optional[str] = xml_field(max_length=2, default=None)
+
+    class Meta:
+        element_name = "Constrained"
+        case = Case.PASCAL
+
+    def format_note(self) -> str:
+        return self.note.upper()
+
+
+@pytest.fixture
+def money_formatter():
+    register_formatter(Money, lambda value: f"{value.cents / 100:.2f}")
+    yield
+    unregister_formatter(Money)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    (
+        (True, "K"),
+        (False, "E"),
+        (ApartmentAction.REMOVE, "remove"),
+        (IntEnum.ONE, "1"),
+        (Decimal("12.349"), "12.349"),
+        (Decimal("60.1705500"), "60.1705500"),
+        (date(2024, 1, 2), "02.01.2024"),
+        (datetime(2024, 1, 2, 3, 4, 5), "2024-01-02T03:04:05"),
+        (12, "12"),
+        ("text", "text"),
+    ),
+)
+def test__format_value(value, expected):
+    assert format_value(value) == expected
+
+
+def test__format_value__lists_and_models_as_is():
+    city = City(1, "Helsinki")
+    assert format_value(city) is city
+    assert format_value([city]) == [city]
+
+
+def test__register_formatter(money_formatter):
+    element = Listing(Money(1234), date(2024, 1, 2)).to_etree()
+    assert etree.tostring(element) == (
+        b"<Listing><Price>12.34</Price><Completed>02.01.2024</Completed></Listing>"
+    )
+
+
+def test__register_formatter__resolved_formatters_are_reset():
+    class Tagged(str):
+        pass
+
+    assert get_formatter(Tagged) is str
+    register_formatter(str, str.upper)
+    try:
+        assert format_value(Tagged("a")) == "A"
+        # Mixed-in enums are still formatted as enums
+        assert format_value(StrEnum.A) == "a"
+    finally:
+        unregister_formatter(str)
+    assert get_formatter(Tagged) is str
+
+
+def test__xml_field():
+    model = Constrained("abcdef", "a\x00bcdef", 1.5, date(2024, 1, 2), 0, "note")
+    assert etree.tostring(model.to_etree()) == (
+        b"<Constrained><Name>abc</Name><Text>abcd</Text><Area>1.50</Area>"
+        b"<Shown>20240102</Shown><Sold>E</Sold><Note>NOTE</Note></Constrained>"
+    )
+    assert model.get_formatted_value("name") == "abc"
+
+    # Overrides skip format_<key> methods but not the field constraints
+    element = model.to_etree(overrides={"name": "ghijkl", "note": "other"})
+    assert element.findtext("Name") == "ghi"
+    assert element.findtext("Note") == "ot"
@@ -2,6 +2,7 @@
 
 from datetime import datetime
 from os import path
+from typing import Optional, get_type_hints
 
 import pytest
 from django.test import override_settings
@@ -9,6 +10,7 @@ from django.test import override_settings
 from django_oikotie.enums import ApartmentType
 from django_oikotie.oikotie import create_housing_companies
 from django_oikotie.utils import yes_no_bool
+from django_oikotie.xml_models.housing_company import Builder, HousingCompany
 
 from .factories.housing_company import (
     AddressFactory,
@@ -77,6 +79,16 @@ def test__builder__xml_serialization():
     assert xml == f"<builder>\n  <logo-url>{obj.logo_url}</logo-url>\n</builder>\n"
 
 
+def test__housing_company__single_builder_element():
+    bld = BuilderFactory()
+    element = HousingCompanyFactory(builder=bld).to_etree()
+
+    (builder,) = element.findall("builder")
+    assert [child.tag for child in builder] == ["logo-url"]
+    assert builder.findtext("logo-url") == bld.logo_url
+    assert get_type_hints(HousingCompany)["builder"] == Optional[Builder]
+
+
 @pytest.mark.parametrize(
     "is_complete,is_complete_str",
     (
@@ -334,8 +346,8 @@ def test__housing_company__complete_xml_serialization():
         f"  </builder>\n"
         f"  <presentation-text>{obj.presentation_text}</presentation-text>\n"
         f"  <coordinates>\n"
-        f"    <x>{crd.format_x()}</x>\n"
-        f"    <y>{crd.format_y()}</y>\n"
+        f"    <x>{crd.get_formatted_value('x')}</x>\n"
+        f"    <y>{crd.get_formatted_value('y')}</y>\n"
         f"  </coordinates>\n"
         f"  <construction-details>\n"
         f"    <construction-complete>{yes_no_bool(cd.construction_complete)}</construction-complete>\n"
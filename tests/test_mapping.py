@@ -0,0 +1,272 @@
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import List, Optional
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+
+from django_oikotie.enums import Case
+from django_oikotie.mapping import (
+    Computed,
+    ModelMapping,
+    Nested,
+    Related,
+    Value,
+    _RowSpec,
+    _Spec,
+)
+from django_oikotie.xml_models import XMLModel
+
+
+@dataclass
+class ContentTypeLabel(XMLModel):
+    app: str
+    model: str
+
+    class Meta:
+        element_name = "content-type"
+        case = Case.KEBAB
+
+
+@dataclass
+class PermissionItem(XMLModel):
+    key: str
+    name: str
+    kind: str
+    content_type: Optional[ContentTypeLabel] = None
+    label: Optional[str] = None
+
+    class Meta:
+        element_name = "permission"
+        case = Case.KEBAB
+
+
+class ContentTypeLabelMapping(ModelMapping):
+    class Meta:
+        model = ContentTypeLabel
+
+    app = "app_label"
+    model = "model"
+
+
+class PermissionItemMapping(ModelMapping):
+    class Meta:
+        model = PermissionItem
+
+    label = Computed(
+        lambda app, codename: f"{app}.{codename}", "content_type.app_label", "codename"
+    )
+    key = "codename"
+    name = "name"
+    kind = Value("permission")
+    content_type = Nested(ContentTypeLabelMapping, source="content_type")
+
+
+@dataclass
+class PermissionCode(XMLModel):
+    index: int
+    codename: str
+
+    class Meta:
+        element_name = "permission"
+
+
+@dataclass
+class ContentTypeItem(XMLModel):
+    model: str
+    permissions: Optional[List[PermissionCode]] = None
+    codenames: Optional[List[PermissionCode]] = None
+
+    class Meta:
+        element_name = "content-type"
+        case = Case.KEBAB
+
+
+class PermissionCodeMapping(ModelMapping):
+    class Meta:
+        model = PermissionCode
+
+    codename = "codename"
+
+
+class ContentTypeItemMapping(ModelMapping):
+    class Meta:
+        model = ContentTypeItem
+
+    model = "model"
+    permissions = Related(
+        Permission, "content_type", PermissionCodeMapping, index_field="index"
+    )
+    codenames = Related(
+        Permission.objects.exclude(codename__startswith="view_"),
+        "content_type",
+        PermissionCodeMapping,
+        order_by=("-codename",),
+        index_field="index",
+    )
+
+
+def _expected_content_type_item(content_type):
+    def codes(permissions):
+        return [
+            PermissionCode(index=i, codename=permission.codename)
+            for i, permission in enumerate(permissions, start=1)
+        ] or None
+
+    permissions = content_type.permission_set.order_by("pk")
+    return ContentTypeItem(
+        model=content_type.model,
+        permissions=codes(permissions),
+        codenames=codes(
+            permissions.exclude(codename__startswith="view_").order_by("-codename")
+        ),
+    )
+
+
+def test__mapping__field_order_follows_model():
+    assert [name for name, _ in PermissionItemMapping._loaders] == [
+        "key",
+        "name",
+        "kind",
+        "content_type",
+        "label",
+    ]
+
+
+def test__mapping__unknown_field():
+    with pytest.raises(ValueError):
+
+        class InvalidMapping(ModelMapping):
+            class Meta:
+                model = PermissionItem
+
+            unknown = "name"
+
+
+def test__mapping__queryset_fields():
+    only, related = PermissionItemMapping.get_queryset_fields(Permission)
+    assert only == {
+        "codename",
+        "name",
+        "content_type",
+        "content_type__app_label",
+        "content_type__model",
+    }
+    assert related == {"content_type"}
+
+
+@pytest.mark.django_db
+def test__mapping__map_queryset(django_assert_num_queries):
+    queryset = Permission.objects.order_by("pk")
+    expected = list(queryset.select_related("content_type"))
+
+    with django_assert_num_queries(1):
+        items = list(PermissionItemMapping.map_queryset(queryset, chunk_size=10))
+
+    assert len(items) == len(expected) > 10
+    item, permission = items[0], expected[0]
+    assert item == PermissionItem(
+        key=permission.codename,
+        name=permission.name,
+        kind="permission",
+        content_type=ContentTypeLabel(
+            app=permission.content_type.app_label, model=permission.content_type.model
+        ),
+        label=f"{permission.content_type.app_label}.{permission.codename}",
+    )
+
+
+@pytest.mark.django_db
+def test__mapping__map_chunks():
+    queryset = Permission.objects.order_by("pk")
+    chunks = list(PermissionItemMapping.map_chunks(queryset, chunk_size=10))
+    assert all(len(chunk) == 10 for chunk in chunks[:-1])
+    assert sum(len(chunk) for chunk in chunks) == queryset.count()
+
+
+def test__mapping__none_along_path():
+    @dataclass
+    class Row:
+        content_type: Optional[object] = None
+        codename: str = "view_thing"
+        name: str = "Can view thing"
+
+    item = PermissionItemMapping.map_row(Row())
+    assert item.content_type is None
+    assert item.label == "None.view_thing"
+
+
+def test__mapping__related_queryset_fields():
+    only, related = ContentTypeItemMapping.get_queryset_fields(ContentType)
+    assert only == {"model", "id"}
+    assert related == set()
+
+
+@pytest.mark.django_db
+def test__mapping__related(django_assert_num_queries):
+    # Reverse the order so that the chunks are not sorted by key
+    queryset = ContentType.objects.order_by("-pk")
+    expected = [_expected_content_type_item(ct) for ct in queryset]
+    ContentType.objects.create(app_label="empty", model="empty")
+    expected.insert(0, ContentTypeItem(model="empty"))
+
+    chunk_size = 3
+    chunks = -(-len(expected) // chunk_size)
+    # One query for the content types and two per chunk for the permissions
+    with django_assert_num_queries(1 + 2 * chunks):
+        items = list(ContentTypeItemMapping.map_queryset(queryset, chunk_size))
+
+    assert items == expected
+    assert items[-1].permissions[0].index == 1
+
+
+@pytest.mark.django_db
+def test__mapping__related__duplicate_rows():
+    content_type = ContentType.objects.get_for_model(Permission)
+    items = ContentTypeItemMapping.map_rows([content_type, content_type])
+    assert items[0] == items[1] == _expected_content_type_item(content_type)
+
+
+class _RelatedRows(list):
+    def iterator(self):
+        return iter(self)
+
+
+def test__mapping__related__database_key_order():
+    # Related rows in case-insensitive order, as under a non-C collation
+    related_rows = _RelatedRows(
+        SimpleNamespace(parent=parent, codename=codename)
+        for parent, codename in [("a", "a1"), ("B", "B1"), ("b", "b1"), ("b", "b2")]
+    )
+
+    class StaticRelated(Related):
+        def get_queryset(self, keys):
+            return "parent", related_rows
+
+    class ItemMapping(ModelMapping):
+        class Meta:
+            model = ContentTypeItem
+
+        model = "model"
+        permissions = StaticRelated(
+            None, "parent", PermissionCodeMapping, key="model", index_field="index"
+        )
+
+    rows = [SimpleNamespace(model=model) for model in ("b", "B", "c", "a")]
+    items = ItemMapping.map_rows(rows)
+
+    assert [[code.codename for code in item.permissions or []] for item in items] == [
+        ["b1", "b2"],
+        ["B1"],
+        [],
+        ["a1"],
+    ]
+
+
+def test__mapping__specs_are_abstract():
+    assert not hasattr(Nested(ContentTypeLabelMapping), "compile")
+    with pytest.raises(TypeError, match="abstract"):
+        _Spec()
+    with pytest.raises(TypeError, match="abstract"):
+        _RowSpec()
@@ -0,0 +1,221 @@
+import json
+from os import path
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from lxml import etree
+
+from django_oikotie.enums import ApartmentAction
+from django_oikotie.oikotie import (
+    Checkpoint,
+    create_apartments,
+    remove_apartment_keys,
+    update_apartments,
+    write_feed,
+)
+from django_oikotie.quarantine import Quarantine
+from django_oikotie.writers import get_writer
+
+from .factories.apartment import MinimalApartmentFactory
+
+pytestmark = pytest.mark.usefixtures("feed_settings")
+
+
+@pytest.fixture
+def feed_settings():
+    with override_settings(OIKOTIE_COMPANY_NAME="ATT", OIKOTIE_ENTRYPOINT="test"):
+        yield
+
+
+def _apartments(count):
+    return sorted(
+        MinimalApartmentFactory.build_batch(count), key=lambda apartment: apartment.key
+    )
+
+
+def _interrupted(apartments, after):
+    for i, apartment in enumerate(apartments):
+        if i == after:
+            raise RuntimeError("Interrupted")
+        yield apartment
+
+
+def test__create_apartments__checkpoint(test_folder):
+    apartments = _apartments(25)
+    checkpoint_path = test_folder / "APT.checkpoint"
+
+    filename = create_apartments(
+        apartments, test_folder, checkpoint_path, checkpoint_interval=5
+    )
+
+    assert not checkpoint_path.exists()
+    root = etree.parse(str(test_folder / filename)).getroot()
+    assert [element.findtext("Key") for element in root] == [
+        apartment.key for apartment in apartments
+    ]
+
+
+@pytest.mark.parametrize(
+    "writer",
+    ["django_oikotie.writers.FeedWriter", "django_oikotie.writers.IncrementalWriter"],
+)
+def test__create_apartments__resume_from_checkpoint(test_folder, writer):
+    with override_settings(OIKOTIE_FEED_WRITER=writer):
+        _test_resume_from_checkpoint(test_folder)
+
+
+def _test_resume_from_checkpoint(test_folder):
+    apartments = _apartments(25)
+    checkpoint_path = test_folder / "APT.checkpoint"
+    expected = create_apartments(
+        apartments, test_folder, test_folder / "expected.checkpoint", 5
+    )
+    # Read it now, the filenames are only unique to the second
+    expected = (test_folder / expected).read_bytes()
+
+    with pytest.raises(RuntimeError):
+        create_apartments(_interrupted(apartments, 13), test_folder, checkpoint_path, 5)
+
+    checkpoint = Checkpoint.load(checkpoint_path)
+    assert checkpoint.key == apartments[9].key
+    assert (test_folder / checkpoint.filename).stat().st_size > checkpoint.offset
+
+    filename = create_apartments(apartments, test_folder, checkpoint_path, 5)
+
+    assert filename == checkpoint.filename
+    assert not checkpoint_path.exists()
+    assert (test_folder / filename).read_bytes() == expected
+
+
+def test__create_apartments__resume_before_first_checkpoint(test_folder):
+    apartments = _apartments(3)
+    checkpoint_path = test_folder / "APT.checkpoint"
+
+    with pytest.raises(RuntimeError):
+        create_apartments(_interrupted(apartments, 2), test_folder, checkpoint_path)
+    assert Checkpoint.load(checkpoint_path).key is None
+
+    filename = create_apartments(apartments, test_folder, checkpoint_path)
+    root = etree.parse(str(test_folder / filename)).getroot()
+    assert len(root) == 3
+
+
+def test__create_apartments__checkpoint_requires_ordered_keys(test_folder):
+    apartments = _apartments(3)[::-1]
+    with pytest.raises(ValueError):
+        create_apartments(apartments, test_folder, test_folder / "APT.checkpoint")
+
+
+def test__remove_apartment_keys(test_folder):
+    filename = remove_apartment_keys(["key-1", ("key-2", "vendor-2")], test_folder)
+
+    assert filename.startswith("UPDATEAPT")
+    assert (test_folder / filename).read_bytes() == (
+        b"<?xml version='1.0' encoding='utf-8'?>\n<Apartments>"
+        b'<Apartment action="remove"><Key>key-1</Key></Apartment>'
+        b'<Apartment action="remove"><Key>key-2</Key>'
+        b"<VendorIdentifier>vendor-2</VendorIdentifier></Apartment>"
+        b"</Apartments>"
+    )
+
+
+def test__update_apartments__does_not_modify_apartments(test_folder):
+    apartments = MinimalApartmentFactory.build_batch(2)
+
+    filename = update_apartments(apartments, ApartmentAction.REMOVE, test_folder)
+
+    root = etree.parse(str(test_folder / filename)).getroot()
+    assert [element.get("action") for element in root] == ["remove", "remove"]
+    assert [apartment.action for apartment in apartments] == [None, None]
+
+
+def _with_broken(count, broken_index):
+    apartments = _apartments(count)
+    # A non-string value can't be cut to the max_length of street_address
+    apartments[broken_index].street_address = 12345
+    return apartments
+
+
+def _read_quarantine(report_path):
+    with open(report_path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test__create_apartments__strict_by_default(test_folder):
+    with pytest.raises(TypeError):
+        create_apartments(_with_broken(3, 1), test_folder)
+
+
+@pytest.mark.parametrize("checkpoint", [False, True])
+def test__create_apartments__quarantine(test_folder, checkpoint):
+    apartments = _with_broken(5, 2)
+    report_path = test_folder / "quarantine.jsonl"
+    checkpoint_path = test_folder / "APT.checkpoint" if checkpoint else None
+
+    with Quarantine(report_path) as quarantine:
+        filename = create_apartments(
+            apartments, test_folder, checkpoint_path, quarantine=quarantine
+        )
+
+    root = etree.parse(str(test_folder / filename)).getroot()
+    assert [element.findtext("Key") for element in root] == [
+        apartment.key for i, apartment in enumerate(apartments) if i != 2
+    ]
+    (record,) = _read_quarantine(report_path)
+    assert record["key"] == apartments[2].key
+    assert record["model"] == "Apartment"
+    assert record["error"].startswith("TypeError")
+    assert "to_etree" in record["traceback"]
+
+
+def test__update_apartments__quarantine(test_folder):
+    apartments = _with_broken(3, 0)
+    with Quarantine(test_folder / "quarantine.jsonl") as quarantine:
+        filename = update_apartments(
+            apartments, file_path=test_folder, quarantine=quarantine
+        )
+
+    root = etree.parse(str(test_folder / filename)).getroot()
+    assert len(root) == 2
+    assert quarantine.count == 1
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test__write_feed__quarantine(test_folder, jobs):
+    apartments = _with_broken(5, 3)
+    report_path = test_folder / "quarantine.jsonl"
+
+    with Quarantine(report_path) as quarantine:
+        write_feed(
+            test_folder / "APT.xml",
+            "Apartments",
+            apartments,
+            jobs=jobs,
+            shard_size=2,
+            quarantine=quarantine,
+        )
+
+    root = etree.parse(str(test_folder / "APT.xml")).getroot()
+    assert len(root) == 4
+    assert [record["key"] for record in _read_quarantine(report_path)] == [
+        apartments[3].key
+    ]
+
+
+def test__quarantine__no_report_without_failures(test_folder):
+    with Quarantine(test_folder / "quarantine.jsonl") as quarantine:
+        create_apartments(_apartments(2), test_folder, quarantine=quarantine)
+    assert quarantine.count == 0
+    assert not (test_folder / "quarantine.jsonl").exists()
+
+
+def test__create_apartments__checkpoint_uses_feed_writer(test_folder):
+    with mock.patch(
+        "django_oikotie.oikotie.get_writer", wraps=get_writer
+    ) as mocked_get_writer:
+        filename = create_apartments(_apartments(3), test_folder, test_folder / "c")
+
+    mocked_get_writer.assert_called_once_with(
+        path.join(test_folder, filename), "Apartments", None
+    )
@@ -0,0 +1,177 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import override_settings
+from django.utils import timezone
+from lxml import etree
+
+from django_oikotie.models import OutboxEntry
+from django_oikotie.outbox import (
+    enqueue_removal,
+    enqueue_update,
+    flush_outbox,
+    register,
+    unregister,
+)
+
+from .factories.apartment import MinimalApartmentFactory
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("outbox_settings")]
+
+
+@pytest.fixture
+def outbox_settings():
+    with override_settings(
+        OIKOTIE_COMPANY_NAME="ATT", OIKOTIE_ENTRYPOINT="test", OIKOTIE_OUTBOX_WINDOW=60
+    ):
+        yield
+
+
+@pytest.fixture
+def send_items():
+    with mock.patch("django_oikotie.outbox.send_items") as send_items:
+        yield send_items
+
+
+def _read_actions(test_folder, filename):
+    root = etree.parse(str(test_folder / filename)).getroot()
+    return [(element.findtext("Key"), element.get("action")) for element in root]
+
+
+def test__outbox__coalesces_changes_to_same_key():
+    apartment = MinimalApartmentFactory.build(street_address="First")
+    enqueue_update(apartment)
+    enqueue_update(MinimalApartmentFactory.build(key=apartment.key))
+    enqueue_update(
+        MinimalApartmentFactory.build(key=apartment.key, street_address="Last")
+    )
+
+    entry = OutboxEntry.objects.get()
+    assert entry.version == 3
+    assert b"Last" in bytes(entry.payload)
+    assert entry.first_changed_at < entry.changed_at
+    # The queued object is not modified
+    assert apartment.action is None
+
+
+def test__outbox__flush_waits_for_window(test_folder, send_items):
+    enqueue_update(MinimalApartmentFactory.build())
+
+    assert flush_outbox(test_folder) is None
+    assert not send_items.called
+
+    result = flush_outbox(test_folder, now=timezone.now() + timedelta(seconds=61))
+    assert result.updates == 1
+    send_items.assert_called_once_with(test_folder, result.filename)
+    assert not OutboxEntry.objects.exists()
+
+
+def test__outbox__removals_are_not_delayed(test_folder, send_items):
+    update = MinimalApartmentFactory.build()
+    removal = MinimalApartmentFactory.build()
+    enqueue_update(update)
+    enqueue_removal(removal.key)
+
+    result = flush_outbox(test_folder)
+
+    assert (result.updates, result.removals) == (0, 1)
+    assert _read_actions(test_folder, result.filename) == [(removal.key, "remove")]
+    assert bytes(OutboxEntry.objects.get().payload).startswith(b"<Apartment ")
+    assert list(OutboxEntry.objects.values_list("key", flat=True)) == [update.key]
+
+
+def test__outbox__removals_are_pushed_first(test_folder, send_items):
+    updates = MinimalApartmentFactory.build_batch(2)
+    removal = MinimalApartmentFactory.build()
+    for apartment in updates:
+        enqueue_update(apartment)
+    enqueue_removal(removal.key)
+
+    result = flush_outbox(test_folder, now=timezone.now() + timedelta(seconds=61))
+
+    assert _read_actions(test_folder, result.filename) == [
+        (removal.key, "remove"),
+        (updates[0].key, "update"),
+        (updates[1].key, "update"),
+    ]
+    assert result.max_latency >= result.mean_latency > timedelta()
+
+
+def test__outbox__keeps_entries_changed_during_flush(test_folder, send_items):
+    apartment = MinimalApartmentFactory.build()
+    enqueue_removal(apartment.key)
+    send_items.side_effect = lambda *args: enqueue_update(apartment)
+
+    flush_outbox(test_folder)
+
+    assert OutboxEntry.objects.get().action == "update"
+
+
+def test__outbox__flush_locks_entries(test_folder, send_items):
+    enqueue_removal(MinimalApartmentFactory.build().key)
+    depth = len(connection.atomic_blocks)
+    push_depths = []
+    send_items.side_effect = lambda *args: push_depths.append(
+        len(connection.atomic_blocks)
+    )
+
+    with mock.patch.object(
+        QuerySet,
+        "select_for_update",
+        autospec=True,
+        side_effect=QuerySet.select_for_update,
+    ) as select_for_update:
+        flush_outbox(test_folder)
+
+    assert select_for_update.call_args.kwargs == {"skip_locked": True}
+    # Pushed while the transaction holding the locks is open
+    assert push_depths == [depth + 1]
+
+
+def test__outbox__enqueue_after_flush_deleted_the_entry():
+    apartment = MinimalApartmentFactory.build()
+    enqueue_update(apartment)
+    get_or_create = OutboxEntry.objects.get_or_create
+
+    def get_and_flush(**kwargs):
+        result = get_or_create(**kwargs)
+        OutboxEntry.objects.all().delete()
+        return result
+
+    with mock.patch.object(
+        OutboxEntry.objects, "get_or_create", side_effect=get_and_flush
+    ):
+        enqueue_removal(apartment.key)
+
+    entry = OutboxEntry.objects.get()
+    assert (entry.key, entry.action, entry.version) == (apartment.key, "remove", 1)
+
+
+def test__outbox__register(test_folder, send_items):
+    def to_apartment(content_type):
+        return MinimalApartmentFactory.build(key=content_type.model)
+
+    register(ContentType, to_apartment)
+    try:
+        content_type = ContentType.objects.create(app_label="app", model="thing")
+        content_type.save()
+        assert OutboxEntry.objects.get().version == 2
+
+        content_type.delete()
+        assert OutboxEntry.objects.get().action == "remove"
+    finally:
+        unregister(ContentType)
+
+    ContentType.objects.create(app_label="app", model="other")
+    assert OutboxEntry.objects.count() == 1
+
+
+def test__flush_outbox_command(test_folder, send_items, capsys):
+    enqueue_removal("removed")
+    call_command("oikotie_flush_outbox", output_dir=str(test_folder))
+    assert "0 updates, 1 removals" in capsys.readouterr().out
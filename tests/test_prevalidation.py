@@ -0,0 +1,100 @@
+import pytest
+from django.test import override_settings
+from lxml import etree
+
+from django_oikotie.enums import ApartmentType
+from django_oikotie.oikotie import create_apartments, write_feed
+from django_oikotie.prevalidation import RecordInvalid, check_record, validate_record
+from django_oikotie.quarantine import Quarantine
+
+from .factories.apartment import ApartmentFactory, MinimalApartmentFactory
+from .factories.housing_company import HousingCompanyFactory
+
+
+@pytest.mark.parametrize(
+    "factory", [ApartmentFactory, MinimalApartmentFactory, HousingCompanyFactory]
+)
+def test__validate_record__valid(factory):
+    for item in factory.build_batch(5):
+        assert validate_record(item) == []
+
+
+def test__validate_record__errors():
+    apartment = ApartmentFactory.build(
+        key=None, type="KT", street_address=12345, latitude=90.5
+    )
+    apartment.city.value = 1
+    apartment.pictures[1].url = None
+
+    assert validate_record(apartment) == [
+        "type must be a ApartmentType, not 'KT'",
+        "key is required",
+        "street_address must be a str, not int",
+        "city.value must be a str, not int",
+        "latitude must be between -90 and 90, not 90.5",
+        "pictures[1].url is required",
+    ]
+
+
+def test__validate_record__lists_and_literals():
+    housing_company = HousingCompanyFactory.build()
+    housing_company.apartment.types = [ApartmentType.ROW_HOUSE, "KT"]
+    assert validate_record(housing_company) == [
+        "apartment.types[1] must be a ApartmentType, not 'KT'"
+    ]
+
+    apartment = ApartmentFactory.build()
+    apartment.estate_agent_rating.value = 6
+    (error,) = validate_record(apartment)
+    assert error == "estate_agent_rating.value must be one of (1, 2, 3, 4, 5), not 6"
+
+
+def test__check_record():
+    apartment = MinimalApartmentFactory.build(key=None)
+    with pytest.raises(RecordInvalid) as e:
+        check_record(apartment)
+    assert e.value.errors == ["key is required"]
+    check_record(MinimalApartmentFactory.build())
+
+
+@override_settings(OIKOTIE_COMPANY_NAME="ATT", OIKOTIE_ENTRYPOINT="test")
+@pytest.mark.parametrize("jobs", [1, 2])
+def test__write_feed__prevalidate(tmp_path, jobs):
+    apartments = MinimalApartmentFactory.build_batch(4)
+    apartments[1].latitude = 200
+    file = tmp_path / "feed.xml"
+
+    # Without prevalidation the out of range latitude is written as is
+    write_feed(file, "Apartments", apartments, jobs=jobs)
+    assert len(etree.parse(str(file)).getroot()) == 4
+
+    with pytest.raises(RecordInvalid):
+        write_feed(file, "Apartments", apartments, jobs=jobs, prevalidate=True)
+
+    with Quarantine(tmp_path / "quarantine.jsonl") as quarantine:
+        write_feed(
+            file,
+            "Apartments",
+            apartments,
+            jobs=jobs,
+            shard_size=2,
+            quarantine=quarantine,
+            prevalidate=True,
+        )
+    assert len(etree.parse(str(file)).getroot()) == 3
+    assert quarantine.count == 1
+
+
+@override_settings(OIKOTIE_COMPANY_NAME="ATT", OIKOTIE_ENTRYPOINT="test")
+def test__create_apartments__prevalidate(tmp_path):
+    apartments = MinimalApartmentFactory.build_batch(3)
+    apartments[2].key = None
+
+    with pytest.raises(RecordInvalid):
+        create_apartments(apartments, tmp_path, prevalidate=True)
+
+    with Quarantine(tmp_path / "quarantine.jsonl") as quarantine:
+        filename = create_apartments(
+            apartments, tmp_path, quarantine=quarantine, prevalidate=True
+        )
+    assert len(etree.parse(str(tmp_path / filename)).getroot()) == 2
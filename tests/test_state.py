@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+
+from django_oikotie.enums import ApartmentAction
+from django_oikotie.oikotie import (
+    remove_apartment_keys,
+    send_items,
+    update_apartments,
+    write_feed,
+)
+from django_oikotie.state import PushStateStore
+
+from .factories.apartment import MinimalApartmentFactory
+
+pytestmark = pytest.mark.usefixtures("feed_settings")
+
+
+@pytest.fixture
+def feed_settings():
+    with override_settings(OIKOTIE_COMPANY_NAME="ATT", OIKOTIE_ENTRYPOINT="test"):
+        yield
+
+
+@pytest.fixture
+def store(test_folder):
+    with PushStateStore(str(test_folder / "state.sqlite3")) as store:
+        yield store
+
+
+def test__push_state_store__upsert_and_sorted_iteration(store):
+    pushed_at = datetime(2021, 1, 2, 3, 4, tzinfo=timezone.utc)
+    store.upsert_many([("b", "1"), ("c", "2"), ("a", "3")], "APT1.xml", pushed_at)
+    store.upsert_many([("b", "4")], "UPDATEAPT1.xml")
+
+    assert list(store.iter_hashes()) == [("a", "3"), ("b", "4"), ("c", "2")]
+    assert len(store) == 3
+    record = store.get("a")
+    assert (record.hash, record.pushed_at, record.filename) == (
+        "3",
+        pushed_at,
+        "APT1.xml",
+    )
+    assert store.get("b").filename == "UPDATEAPT1.xml"
+    assert store.get("d") is None
+
+    store.delete_many(["a", "c"])
+    assert [record.key for record in store.iter_records()] == ["b"]
+
+
+def test__push_state_store__bulk_upsert(store):
+    keys = [f"{i:07d}" for i in range(50000)]
+    store.upsert_many(((key, "hash") for key in reversed(keys)), "APT.xml")
+    assert [key for key, _ in store.iter_hashes()] == keys
+
+
+def test__push_state_store__record_file(store, test_folder):
+    apartments = MinimalApartmentFactory.build_batch(3)
+    write_feed(str(test_folder / "APT.xml"), "Apartments", apartments)
+    store.record_file(str(test_folder / "APT.xml"), "APT.xml")
+    hashes = dict(store.iter_hashes())
+    assert sorted(hashes) == sorted(apartment.key for apartment in apartments)
+
+    # The action attribute doesn't change the hash
+    filename = update_apartments(apartments[:1], file_path=test_folder)
+    store.record_file(str(test_folder / filename), filename)
+    assert dict(store.iter_hashes()) == hashes
+    assert store.get(apartments[0].key).filename == filename
+
+    filename = remove_apartment_keys([apartments[1].key], test_folder)
+    store.record_file(str(test_folder / filename), filename)
+    assert apartments[1].key not in dict(store.iter_hashes())
+
+
+def test__send_items__records_pushed_state(store, test_folder):
+    apartments = MinimalApartmentFactory.build_batch(2)
+    filename = update_apartments(apartments, ApartmentAction.UPDATE, test_folder)
+
+    with mock.patch("django_oikotie.oikotie.get_session"):
+        send_items(test_folder, filename, state_store=store)
+
+    assert {record.filename for record in store.iter_records()} == {filename}
+    assert len(store) == 2
+
+
+def test__send_items__failed_upload_is_not_recorded(store, test_folder):
+    filename = update_apartments(
+        MinimalApartmentFactory.build_batch(2), file_path=test_folder
+    )
+
+    with mock.patch("django_oikotie.oikotie.get_session") as get_session:
+        get_session.return_value.storbinary.side_effect = EOFError
+        with pytest.raises(EOFError):
+            send_items(test_folder, filename, state_store=store)
+
+    assert len(store) == 0
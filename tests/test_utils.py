@@ -0,0 +1,93 @@
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List, Optional, Union
+
+import pytest
+
+from django_oikotie.utils import (
+    format_date,
+    format_decimal,
+    format_decimals,
+    is_required_field,
+    truncate_text,
+    unwrap_optional,
+)
+
+
+@pytest.mark.parametrize(
+    "value,n,pad,expected",
+    (
+        (Decimal("1.2345"), 2, False, "1.23"),
+        (123.4567, 2, False, "123.45"),
+        (123.4567, 2, True, "123.45"),
+        (1.5, 2, False, "1.5"),
+        (1.5, 2, True, "1.50"),
+        (5, 2, False, "5.0"),
+        (0.29, 2, False, "0.29"),
+        (60.1733244, 5, True, "60.17332"),
+        (-1.2399, 2, False, "-1.23"),
+        (-0.001, 2, True, "0.00"),
+        (Decimal("12345678901234567890.129"), 2, False, "12345678901234567890.12"),
+    ),
+)
+def test__format_decimal(value, n, pad, expected):
+    assert format_decimal(value, n, pad=pad) == expected
+
+
+def test__format_decimals():
+    values = [Decimal("1.239"), None, 2.5, Decimal("1.239")]
+    assert format_decimals(values, 2) == ["1.23", None, "2.5", "1.23"]
+    assert format_decimals(values, 2, pad=True) == ["1.23", None, "2.50", "1.23"]
+
+
+def test__format_date():
+    assert format_date(date(2020, 1, 2), "%d.%m.%Y") == "02.01.2020"
+    assert format_date(date(2020, 1, 2), "%Y%m%d") == "20200102"
+    assert format_date(datetime(2020, 1, 2, 12, 5), "%d.%m.%Y %H:%M") == (
+        "02.01.2020 12:05"
+    )
+
+
+def test__format_date__time_zones_are_not_mixed():
+    utc = datetime(2020, 1, 1, 12, 0, tzinfo=timezone.utc)
+    helsinki = utc.astimezone(timezone(timedelta(hours=2)))
+    assert format_date(utc, "%H:%M") == "12:00"
+    assert format_date(helsinki, "%H:%M") == "14:00"
+
+
+@pytest.mark.parametrize(
+    "value,max_length,expected",
+    (
+        ("abcdef", 3, "abc"),
+        ("abc", 10, "abc"),
+        ("a\x00b\x0bc\ufffed", None, "abcd"),
+        # "e" followed by a combining acute accent is never split
+        ("abe\u0301", 3, "ab"),
+        ("abe\u0301", 4, "abe\u0301"),
+        # Zero width joiner sequences are kept together
+        ("a\U0001f469\u200d\U0001f4bb", 3, "a"),
+        # Surrogate pairs are joined, lone surrogates removed
+        ("a\ud83d\ude00b\ud800", None, "a\U0001f600b"),
+        ("a\ud83d\ude00b", 2, "a\U0001f600"),
+    ),
+)
+def test__truncate_text(value, max_length, expected):
+    assert truncate_text(value, max_length) == expected
+
+
+def test__unwrap_optional():
+    assert unwrap_optional(Optional[int]) is int
+    assert unwrap_optional(Optional[List[int]]) == List[int]
+    assert unwrap_optional(Union[int, str, None]) == Union[int, str, None]
+    assert unwrap_optional(str) is str
+
+
+def test__is_required_field():
+    @dataclass
+    class Model:
+        a: int
+        b: int = 1
+        c: List[int] = field(default_factory=list)
+
+    assert [is_required_field(f) for f in fields(Model)] == [True, False, False]
@@ -0,0 +1,186 @@
+import os
+import threading
+from io import StringIO
+from multiprocessing import AuthenticationError
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from django_oikotie import worker_pool
+from django_oikotie.oikotie import serialize_items, write_feed
+from django_oikotie.worker_pool import (
+    RemotePool,
+    WorkerPool,
+    connect_pool,
+    get_pool,
+    make_server,
+)
+from tests.utils import get_tests_base_path
+
+from .factories.apartment import MinimalApartmentFactory
+
+APARTMENTS = MinimalApartmentFactory.build_batch(7)
+
+AUTHKEY = b"test"
+
+SCHEMA_DIR = os.path.join(get_tests_base_path(), "schemas")
+TEST_FILES_DIR = os.path.join(get_tests_base_path(), "test_files")
+
+
+def get_apartments():
+    return iter(APARTMENTS)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    # The workers are forked with the settings of the test
+    with override_settings(OIKOTIE_SCHEMA_DIR=SCHEMA_DIR):
+        with WorkerPool(jobs=2) as pool:
+            yield pool
+
+
+@pytest.fixture(scope="module")
+def server_address(pool):
+    server = make_server(pool, ("127.0.0.1", 0), AUTHKEY)
+
+    def serve():
+        try:
+            server.serve_forever()
+        except SystemExit:
+            pass
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield server.address
+    server.stop_event.set()
+
+
+def _read_test_file(name):
+    with open(os.path.join(TEST_FILES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def _feed(file_path, **kwargs):
+    write_feed(file_path, "Apartments", APARTMENTS, shard_size=3, **kwargs)
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def test__worker_pool__serialize(pool):
+    fragment, failures = pool.serialize(APARTMENTS)
+
+    assert fragment == serialize_items(APARTMENTS)
+    assert failures == []
+
+
+def test__worker_pool__serialize_tolerant(pool):
+    broken = MinimalApartmentFactory.build(street_address=12345)
+
+    fragment, failures = pool.serialize([broken, *APARTMENTS], tolerant=True)
+
+    assert fragment == serialize_items(APARTMENTS)
+    assert [failure[0] for failure in failures] == [broken.key]
+
+
+def test__worker_pool__validate(pool):
+    assert pool.validate("oikotie-apartments-batch.rng", _read_test_file("valid.xml"))
+
+    valid, errors = pool.validate(
+        "oikotie-apartments-batch.rng", _read_test_file("invalid.xml")
+    )
+    assert valid is False
+    assert errors
+
+
+def test__write_feed__worker_pool(pool, tmp_path):
+    assert _feed(tmp_path / "pool.xml", pool=pool) == _feed(tmp_path / "local.xml")
+
+
+def test__remote_pool(server_address, tmp_path):
+    with connect_pool(server_address, AUTHKEY) as remote:
+        assert remote.jobs == 2
+        assert remote.serialize(APARTMENTS)[0] == serialize_items(APARTMENTS)
+        assert remote.validate(
+            "oikotie-apartments-batch.rng", _read_test_file("valid.xml")
+        ) == (True, "")
+        assert _feed(tmp_path / "remote.xml", pool=remote) == _feed(
+            tmp_path / "local.xml"
+        )
+
+
+def test__remote_pool__wrong_authkey(server_address):
+    with pytest.raises(AuthenticationError):
+        RemotePool(server_address, b"wrong")
+
+
+def test__remote_pool__not_running(pool):
+    server = make_server(pool, ("127.0.0.1", 0), AUTHKEY)
+    address = server.address
+    server.listener.close()
+
+    with pytest.raises(ConnectionError):
+        connect_pool(address, AUTHKEY)
+
+
+def test__worker_pool__default_authkey_is_not_secret_key():
+    authkey = worker_pool._get_authkey()
+
+    assert authkey
+    assert authkey != settings.SECRET_KEY.encode()
+
+
+def test__make_server__non_loopback_address_needs_authkey(pool):
+    with pytest.raises(ImproperlyConfigured):
+        make_server(pool, ("0.0.0.0", 0))
+
+    with override_settings(OIKOTIE_WORKER_POOL_AUTHKEY=AUTHKEY):
+        server = make_server(pool, ("0.0.0.0", 0))
+    server.listener.close()
+
+
+def test__get_pool__is_started_once():
+    with mock.patch.object(worker_pool, "_pool", None):
+        with mock.patch.object(WorkerPool, "start", autospec=True) as start:
+            start.side_effect = lambda pool: pool
+            pool = get_pool(jobs=3)
+
+            assert get_pool() is pool
+    assert pool.jobs == 3
+    start.assert_called_once_with(pool)
+
+
+@override_settings(
+    OIKOTIE_COMPANY_NAME="ATT",
+    OIKOTIE_ENTRYPOINT="test",
+    OIKOTIE_APARTMENTS_PROVIDER="tests.test_worker_pool.get_apartments",
+    OIKOTIE_WORKER_POOL_AUTHKEY=AUTHKEY,
+)
+def test__oikotie_push__worker_pool(server_address, test_folder):
+    out = StringIO()
+    with override_settings(OIKOTIE_WORKER_POOL_ADDRESS=server_address):
+        call_command(
+            "oikotie_push",
+            "--worker-pool",
+            "--dry-run",
+            "--output-dir",
+            str(test_folder),
+            stdout=out,
+        )
+
+    (filename,) = os.listdir(test_folder)
+    with open(os.path.join(test_folder, filename), "rb") as f:
+        assert serialize_items(APARTMENTS) in f.read()
+    assert f"{filename}: 7 items" in out.getvalue()
+
+
+@override_settings(
+    OIKOTIE_APARTMENTS_PROVIDER="tests.test_worker_pool.get_apartments",
+    OIKOTIE_WORKER_POOL_ADDRESS=("127.0.0.1", 1),
+)
+def test__oikotie_push__worker_pool_not_running(test_folder):
+    with pytest.raises(CommandError, match="not running"):
+        call_command("oikotie_push", "--worker-pool", "--output-dir", str(test_folder))
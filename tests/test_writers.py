@@ -0,0 +1,174 @@
+from unittest import mock
+from xml.etree.ElementTree import ElementTree
+
+import pytest
+from django.test import override_settings
+from lxml import etree
+
+from django_oikotie.enums import ApartmentAction
+from django_oikotie.oikotie import (
+    create_apartments,
+    create_housing_companies,
+    update_apartments,
+    write_feed,
+)
+from django_oikotie.writers import FeedWriter, IncrementalWriter, get_writer
+
+from .factories.apartment import ApartmentFactory, MinimalApartmentFactory
+from .factories.housing_company import HousingCompanyFactory
+
+WRITERS = [
+    "django_oikotie.writers.FeedWriter",
+    "django_oikotie.writers.IncrementalWriter",
+]
+
+APARTMENTS = sorted(
+    ApartmentFactory.build_batch(3)
+    + MinimalApartmentFactory.build_batch(3)
+    + [MinimalApartmentFactory.build(street_address="\u00c4yri\u00e4istie 1 & 2")],
+    key=lambda apartment: apartment.key,
+)
+HOUSING_COMPANIES = HousingCompanyFactory.build_batch(3)
+
+
+def _legacy_write(file, root_name, elements):
+    """The stdlib ElementTree.write path the builders used to take."""
+    root = etree.Element(root_name)
+    for element in elements:
+        root.append(element)
+    ElementTree(root).write(file, encoding="utf-8", xml_declaration=True)
+
+
+def _build(builder, folder, writer):
+    with override_settings(OIKOTIE_FEED_WRITER=writer), mock.patch(
+        "django_oikotie.oikotie.get_filename", return_value="feed.xml"
+    ):
+        builder(folder)
+    return (folder / "feed.xml").read_bytes()
+
+
+BUILDERS = {
+    "create_apartments": lambda folder: create_apartments(APARTMENTS, folder),
+    "create_apartments_checkpointed": lambda folder: create_apartments(
+        APARTMENTS, folder, folder / "checkpoint", checkpoint_interval=2
+    ),
+    "update_apartments": lambda folder: update_apartments(
+        APARTMENTS, ApartmentAction.UPDATE, folder
+    ),
+    "write_feed": lambda folder: write_feed(
+        folder / "feed.xml", "Apartments", APARTMENTS
+    ),
+    "write_feed_parallel": lambda folder: write_feed(
+        folder / "feed.xml", "Apartments", APARTMENTS, jobs=2, shard_size=2
+    ),
+}
+
+
+@pytest.mark.parametrize("writer", WRITERS)
+def test__writers__apartment_builders_are_byte_identical(tmp_path, writer):
+    outputs = {}
+    for name, builder in BUILDERS.items():
+        folder = tmp_path / name
+        folder.mkdir()
+        outputs[name] = _build(builder, folder, writer)
+
+    reference = outputs.pop("create_apartments")
+    assert reference.startswith(b"<?xml version='1.0' encoding='utf-8'?>\n")
+    assert "\u00c4yri\u00e4istie 1 &amp; 2".encode() in reference
+    assert outputs.pop("update_apartments") != reference
+    assert all(output == reference for output in outputs.values())
+
+
+@pytest.mark.parametrize(
+    "builder,root_name,items,overrides",
+    [
+        (
+            lambda folder: create_apartments(APARTMENTS, folder),
+            "Apartments",
+            APARTMENTS,
+            {},
+        ),
+        (
+            lambda folder: update_apartments(
+                APARTMENTS, ApartmentAction.REMOVE, folder
+            ),
+            "Apartments",
+            APARTMENTS,
+            {"overrides": {"action": ApartmentAction.REMOVE}},
+        ),
+        (
+            lambda folder: create_housing_companies(HOUSING_COMPANIES, folder),
+            "housing-companies",
+            HOUSING_COMPANIES,
+            {},
+        ),
+    ],
+)
+def test__writers__match_each_other_and_legacy_output(
+    tmp_path, builder, root_name, items, overrides
+):
+    outputs = []
+    for i, writer in enumerate(WRITERS):
+        folder = tmp_path / str(i)
+        folder.mkdir()
+        outputs.append(_build(builder, folder, writer))
+    assert outputs[0] == outputs[1]
+
+    legacy = tmp_path / "legacy.xml"
+    _legacy_write(legacy, root_name, [item.to_etree(**overrides) for item in items])
+    # ElementTree.write puts a space before the slash of empty elements
+    assert outputs[0] == legacy.read_bytes().replace(b" />", b"/>")
+
+
+def test__writers__empty_elements_differ_from_legacy_output(tmp_path):
+    element = etree.Element("Apartment")
+    etree.SubElement(element, "Estate", type="E")
+    _legacy_write(tmp_path / "legacy.xml", "Apartments", [element])
+    with FeedWriter(tmp_path / "feed.xml", "Apartments") as writer:
+        writer.write(element)
+
+    assert (
+        (tmp_path / "legacy.xml")
+        .read_bytes()
+        .endswith(b'<Apartment><Estate type="E" /></Apartment></Apartments>')
+    )
+    assert (
+        (tmp_path / "feed.xml")
+        .read_bytes()
+        .endswith(b'<Apartment><Estate type="E"/></Apartment></Apartments>')
+    )
+
+
+@pytest.mark.parametrize("writer_class", [FeedWriter, IncrementalWriter])
+def test__writers__fragments_and_empty_feed(tmp_path, writer_class):
+    with writer_class(tmp_path / "empty.xml", "Apartments"):
+        pass
+    assert (tmp_path / "empty.xml").read_bytes() == (
+        b"<?xml version='1.0' encoding='utf-8'?>\n<Apartments></Apartments>"
+    )
+
+    with writer_class(tmp_path / "feed.xml", "Apartments") as writer:
+        writer.write(etree.Element("A"))
+        writer.write_fragment(b"<B/>")
+        writer.write(etree.Element("C"))
+    assert (
+        (tmp_path / "feed.xml")
+        .read_bytes()
+        .endswith(b"<Apartments><A/><B/><C/></Apartments>")
+    )
+
+
+@pytest.mark.parametrize("writer_class", [FeedWriter, IncrementalWriter])
+def test__writers__no_closing_tag_after_error(tmp_path, writer_class):
+    with pytest.raises(RuntimeError):
+        with writer_class(tmp_path / "feed.xml", "Apartments") as writer:
+            writer.write(etree.Element("A"))
+            raise RuntimeError
+    assert not (tmp_path / "feed.xml").read_bytes().endswith(b"</Apartments>")
+
+
+def test__get_writer(tmp_path):
+    assert isinstance(get_writer(tmp_path / "feed.xml", "A"), IncrementalWriter)
+    with override_settings(OIKOTIE_FEED_WRITER="django_oikotie.writers.FeedWriter"):
+        writer = get_writer(tmp_path / "feed.xml", "A")
+    assert type(writer) is FeedWriter